@@ -0,0 +1,671 @@
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import typer
+from datetime import datetime
+from pathlib import Path
+from typing_extensions import Annotated
+from .completion import COMPLETE_VAR, write_name_cache
+from .paths import APP_NAME, DATA_DIR_VAR, STORAGE_VAR
+
+
+bench_app = typer.Typer()
+
+
+@bench_app.callback()
+def main():
+    """Benchmarks for deep-breath-cli (run with python -m deep_breath_cli.bench)."""
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the q-th percentile (0-100) of the values, nearest rank."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+@contextlib.contextmanager
+def temporary_home():
+    """Point HOME to an empty directory for the block, yield its path.
+
+    The config directory is pinned under it, whatever overrides are set.
+    """
+    names = ("HOME", DATA_DIR_VAR, STORAGE_VAR)
+    saved = {name: os.environ.get(name) for name in names}
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        os.environ[DATA_DIR_VAR] = str(Path(home) / ".config" / APP_NAME)
+        os.environ.pop(STORAGE_VAR, None)
+        try:
+            yield home
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+def time_command(args: list[str], env: dict[str, str], runs: int) -> list[float]:
+    """Run a command several times and return each wall time in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, env=env, stdout=subprocess.DEVNULL, check=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def format_timings(label: str, timings: list[float]) -> str:
+    """Format min, median and p99 of a list of timings."""
+    return (
+        f"  {label:<18} min {min(timings):7.1f} ms"
+        f"  p50 {percentile(timings, 50):7.1f} ms"
+        f"  p99 {percentile(timings, 99):7.1f} ms"
+    )
+
+
+@bench_app.command("completion")
+def completion(
+    runs: Annotated[int, typer.Option(help="Number of runs per variant.")] = 30,
+    presets: Annotated[
+        int, typer.Option(help="Number of custom presets in the cache.")
+    ] = 50,
+):
+    """Measure the latency of completing 'breath start --pattern <TAB>'."""
+    package = __package__
+    with temporary_home() as home:
+        config_dir = Path(home) / ".config" / APP_NAME
+        config_dir.mkdir(parents=True)
+        names = {"4-7-8": "built-in", "4-4-4-4": "built-in"}
+        names.update({f"custom-{i}": "custom" for i in range(presets)})
+        write_name_cache(config_dir, names)
+
+        env = dict(
+            os.environ,
+            COMP_WORDS="breath start --pattern ",
+            COMP_CWORD="3",
+        )
+        env[COMPLETE_VAR] = "complete_bash"
+        variants = {
+            "python startup": "pass",
+            "fast path": f"from {package}.launcher import main; main()",
+            "full CLI": f"from {package}.breath import app; app(prog_name='breath')",
+        }
+        print(f"Completion latency over {runs} runs:")
+        results = {}
+        for label, code in variants.items():
+            results[label] = time_command([sys.executable, "-c", code], env, runs)
+            print(format_timings(label, results[label]))
+
+    overhead = percentile(results["fast path"], 50) - percentile(
+        results["python startup"], 50
+    )
+    print(f"\nFast path cost on top of interpreter startup: {overhead:.1f} ms (p50)")
+
+
+@bench_app.command("prompt")
+def prompt(
+    runs: Annotated[int, typer.Option(help="Number of runs per variant.")] = 30,
+    sessions: Annotated[
+        int, typer.Option(help="Number of sessions in the stats file.")
+    ] = 5000,
+):
+    """Measure the latency of 'breath stats --prompt' in a shell prompt."""
+    from .prompt import fast_prompt
+    from .stats import StatsManager
+
+    package = __package__
+    argv = "import sys; sys.argv = ['breath', 'stats', '--prompt']"
+    with temporary_home() as home:
+        env = dict(os.environ)
+        now = int(time.time())
+        StatsManager().add_sessions(
+            [
+                {
+                    "date": datetime.fromtimestamp(now - i * 3600).strftime("%Y-%m-%d"),
+                    "start": now - i * 3600,
+                    "end": now - i * 3600 + 120,
+                    "pattern": "4-7-8",
+                    "cycles": 4,
+                    "duration_seconds": 76,
+                }
+                for i in range(sessions)
+            ]
+        )
+        config_dir = Path(home) / ".config" / APP_NAME
+
+        variants = {
+            "python startup": "pass",
+            "fast path": f"{argv}; from {package}.launcher import main; main()",
+            "full CLI": f"{argv}; from {package}.breath import app; app(prog_name='breath')",
+        }
+        print(f"'breath stats --prompt' over {runs} runs, {sessions} sessions:")
+        results = {}
+        for label, code in variants.items():
+            results[label] = time_command([sys.executable, "-c", code], env, runs)
+            print(format_timings(label, results[label]))
+
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            fast_prompt(["stats", "--prompt"], config_dir)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    overhead = percentile(results["fast path"], 50) - percentile(
+        results["python startup"], 50
+    )
+    print(f"\nReading the summary in-process: {min(timings) * 1000:.0f} µs")
+    print(f"Fast path cost on top of interpreter startup: {overhead:.1f} ms (p50)")
+
+
+@bench_app.command("report")
+def report(
+    days: Annotated[
+        int, typer.Option(help="Days of history, 3 sessions a day.")
+    ] = 3650,
+):
+    """Measure a full report build against an update after one new session."""
+    from .report import ReportBuilder
+    from .stats import StatsManager
+
+    with temporary_home() as home:
+        now = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        sessions = []
+        for day in range(days):
+            start = int(now.timestamp()) - day * 86400
+            for offset in (0, 3600, 7200):
+                sessions.append(
+                    {
+                        "date": datetime.fromtimestamp(start).strftime("%Y-%m-%d"),
+                        "start": start + offset,
+                        "end": start + offset + 76,
+                        "pattern": "4-7-8",
+                        "cycles": 4,
+                        "duration_seconds": 76,
+                    }
+                )
+        StatsManager().add_sessions(sessions)
+        config_dir = Path(home) / ".config" / APP_NAME
+        builder = ReportBuilder(Path(home) / "report", config_dir)
+
+        start = time.perf_counter()
+        full = builder.build(full=True)
+        full_ms = (time.perf_counter() - start) * 1000
+        StatsManager().add_session("box", 4, 60)
+        start = time.perf_counter()
+        update = builder.build()
+        update_ms = (time.perf_counter() - start) * 1000
+
+    print(f"Report over {len(sessions)} sessions ({full['months']} months):")
+    print(f"  full build    {full_ms:8.1f} ms  {len(full['written'])} months written")
+    print(
+        f"  after 1 more  {update_ms:8.1f} ms  {len(update['written'])} month written"
+    )
+
+
+@bench_app.command("import")
+def import_(
+    sessions: Annotated[
+        int, typer.Option(help="Number of CSV rows to import.")
+    ] = 200_000,
+    years: Annotated[
+        int, typer.Option(help="Years of history to spread them over.")
+    ] = 20,
+):
+    """Measure a CSV import of date-only sessions, then of the same file again.
+
+    Rows come in no particular order, as in exports merged from several
+    machines, so every day is looked up again and again.
+    """
+    import csv
+    import random
+    from .index import day_timestamp
+    from .importer import _is_valid_date
+    from .stats import StatsManager
+
+    with temporary_home() as home:
+        now = int(time.time())
+        step = max(years * 365 * 86400 // sessions, 1)
+        csv_file = Path(home) / "sessions.csv"
+        with open(csv_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Date", "Pattern", "Cycles", "Duration (seconds)"])
+            rows = list(range(sessions))
+            random.Random(0).shuffle(rows)
+            for i in rows:
+                date = datetime.fromtimestamp(now - i * step).strftime("%Y-%m-%d")
+                writer.writerow([date, ("4-7-8", "4-4-4-4", "box")[i % 3], 4, 76])
+
+        timings = []
+        for _ in range(2):
+            # Cold caches for the first import, as in a new process
+            day_timestamp.cache_clear()
+            _is_valid_date.cache_clear()
+            with contextlib.redirect_stdout(io.StringIO()):
+                manager = StatsManager()
+                start = time.perf_counter()
+                added = manager.import_stats(str(csv_file))
+                timings.append((time.perf_counter() - start, added))
+        days = day_timestamp.cache_info().currsize
+
+    print(f"Import of {sessions} CSV rows over {days} days:")
+    for label, (took, added) in zip(("first", "again"), timings):
+        print(
+            f"  {label:<6} {took * 1000:8.1f} ms  {sessions / took:9.0f} rows/s"
+            f"  {added} added"
+        )
+
+
+def _time_load(runs: int) -> float:
+    """Return the best time to construct a StatsManager, in milliseconds."""
+    from .stats import StatsManager
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        StatsManager()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+@bench_app.command("vacuum")
+def vacuum(
+    sessions: Annotated[
+        int, typer.Option(help="Number of sessions to record.")
+    ] = 200_000,
+    years: Annotated[
+        int, typer.Option(help="Years of history to spread them over.")
+    ] = 5,
+    keep_days: Annotated[int, typer.Option(help="Retention period in days.")] = 365,
+    runs: Annotated[int, typer.Option(help="Loads timed per measurement.")] = 3,
+):
+    """Measure stats.json size and load time before and after compaction."""
+    from .stats import StatsManager
+
+    with temporary_home() as home:
+        now = int(time.time())
+        step = max(years * 365 * 86400 // sessions, 1)
+        starts = [now - i * step for i in range(sessions)]
+        StatsManager().add_sessions(
+            [
+                {
+                    "date": datetime.fromtimestamp(start).strftime("%Y-%m-%d"),
+                    "start": start,
+                    "end": start + 76,
+                    "pattern": ("4-7-8", "4-4-4-4", "box")[i % 3],
+                    "cycles": 4,
+                    "duration_seconds": 76,
+                }
+                for i, start in enumerate(starts)
+            ]
+        )
+        stats_file = Path(home) / ".config" / APP_NAME / "stats.json"
+        original = stats_file.with_suffix(".orig")
+        shutil.copyfile(stats_file, original)
+
+        print(f"{sessions} sessions over {years} years, keeping {keep_days} days:")
+        rows = [("raw", stats_file.stat().st_size, _time_load(runs), 0.0)]
+        for granularity in ("day", "month"):
+            shutil.copyfile(original, stats_file)
+            manager = StatsManager()
+            start = time.perf_counter()
+            manager.vacuum(keep_days, granularity)
+            took = (time.perf_counter() - start) * 1000
+            rows.append(
+                (granularity, stats_file.stat().st_size, _time_load(runs), took)
+            )
+
+    for label, size, load, took in rows:
+        vacuum_time = f"  vacuum {took:8.1f} ms" if took else ""
+        print(
+            f"  {label:<6} {size / 1024 / 1024:8.2f} MB  load {load:8.1f} ms{vacuum_time}"
+        )
+
+
+class CountingFile:
+    """A text file wrapper that counts the bytes written through it."""
+
+    def __init__(self, file):
+        """Initialize the wrapper around an open text file."""
+        self.file = file
+        self.written = 0
+
+    def write(self, text: str) -> int:
+        """Write text and count its encoded size."""
+        self.written += len(text.encode())
+        return self.file.write(text)
+
+    def __getattr__(self, name: str):
+        """Delegate everything else (flush, isatty, fileno) to the file."""
+        return getattr(self.file, name)
+
+
+def _measure_render(variant: str, cycles: int, fps: int, tty) -> tuple[float, int]:
+    """Run 4-7-8 cycles, return the CPU seconds and bytes written."""
+    import asyncio
+    from rich.console import Console
+    from rich.progress import track
+    from .breath import PATTERNS
+    from .engine import SessionEngine
+    from .render import TerminalRenderer
+
+    out = CountingFile(tty)
+    start = time.process_time()
+    if variant == "rich":
+        # What 'breath start' did before: one step a second, refreshed by rich
+        console = Console(file=out)
+        for _ in range(cycles):
+            for duration, message in PATTERNS["4-7-8"]:
+                for _ in track(range(duration), message, console=console):
+                    time.sleep(1)
+    else:
+        engine = SessionEngine(PATTERNS["4-7-8"], cycles)
+        asyncio.run(engine.run(TerminalRenderer(fps, out)))
+    return time.process_time() - start, out.written
+
+
+@bench_app.command("render")
+def render(
+    cycles: Annotated[int, typer.Option(help="4-7-8 cycles (19s) per variant.")] = 1,
+    fps: Annotated[
+        list[int] | None,
+        typer.Option(help="Target frame rates to measure (default 10 20 30 60)."),
+    ] = None,
+):
+    """Measure CPU time and bytes per session-minute of the progress animation."""
+    import pty
+
+    if fps is None:
+        fps = [10, 20, 30, 60]
+
+    master, slave = pty.openpty()
+    # Something has to read the terminal, outside of the measured process
+    reader = subprocess.Popen(
+        ["cat"], stdin=master, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    variants = [("rich.progress 1 step/s", "rich", 0)]
+    variants += [(f"renderer {rate} fps", "diff", rate) for rate in fps]
+    seconds = cycles * 19
+    print(f"{cycles} cycles of 4-7-8 ({seconds}s) per variant, to a pseudo-terminal:")
+    try:
+        with open(slave, "w", encoding="utf-8", closefd=False) as tty:
+            for label, variant, rate in variants:
+                cpu, written = _measure_render(variant, cycles, rate, tty)
+                per_minute = 60 / seconds
+                print(
+                    f"  {label:<24} CPU {cpu * per_minute * 1000:7.1f} ms/min"
+                    f" ({cpu / seconds:6.2%})"
+                    f"  {written * per_minute / 1024:7.1f} KB/min"
+                )
+    finally:
+        os.close(slave)
+        reader.terminate()
+        os.close(master)
+
+
+def group_load(address: str, clients: int, steps: list, cycles: int) -> dict:
+    """Run a hosted session followed by many clients, return what they saw.
+
+    The host runs on its own event loop in a thread, so its CPU time is
+    measured apart from the clients'. Each client records the events it
+    received and how long each one took to arrive.
+    """
+    import asyncio
+    import json
+    import threading
+    from .engine import SessionEngine
+    from .group import GroupHost, connect
+
+    host = GroupHost(SessionEngine(steps, cycles), "load")
+    everyone_in = threading.Event()
+    result: dict = {}
+
+    def run_host() -> None:
+        start = time.thread_time()
+        asyncio.run(host.run(address, start=everyone_in.wait))
+        result["host_cpu"] = time.thread_time() - start
+
+    async def follow(latencies: list[float]) -> list[str]:
+        reader, writer = await connect(address)
+        events = []
+        while line := await reader.readline():
+            message = json.loads(line)
+            latencies.append(time.time() - message["time"])
+            events.append(message["event"])
+        writer.close()
+        return events
+
+    async def run_clients() -> list[list[str]]:
+        latencies: list[float] = []
+        result["latencies"] = latencies
+        while not os.path.exists(address) and ":" not in address:
+            await asyncio.sleep(0.01)
+        # Connect in batches so the listen backlog never overflows
+        tasks = []
+        for first in range(0, clients, 64):
+            batch = range(first, min(first + 64, clients))
+            tasks += [asyncio.create_task(follow(latencies)) for _ in batch]
+            while len(host.clients) < len(tasks):
+                await asyncio.sleep(0.01)
+        everyone_in.set()
+        return await asyncio.gather(*tasks)
+
+    thread = threading.Thread(target=run_host)
+    thread.start()
+    wall = time.perf_counter()
+    result["events"] = asyncio.run(run_clients())
+    thread.join()
+    result["wall"] = time.perf_counter() - wall
+    result["broadcasts"] = host.broadcasts
+    result["dropped"] = host.dropped
+    return result
+
+
+@bench_app.command("group")
+def group(
+    clients: Annotated[
+        list[int] | None,
+        typer.Option(help="Numbers of joined clients to measure (default 10 100 500)."),
+    ] = None,
+    cycles: Annotated[int, typer.Option(help="Cycles of 1s phases per run.")] = 2,
+):
+    """Measure fan-out latency and host CPU of a group session."""
+    if clients is None:
+        clients = [10, 100, 500]
+    steps = [[1, "In"], [1, "Hold"], [1, "Out"], [1, "Hold"]]
+    print(f"{cycles} cycles of four 1s phases, host and clients on one machine:")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in clients:
+            result = group_load(str(Path(tmp) / "group.sock"), count, steps, cycles)
+            latencies = [latency * 1000 for latency in result["latencies"]]
+            sent = result["broadcasts"] * count
+            print(
+                f"  {count:5d} clients  p50 {percentile(latencies, 50):6.2f} ms"
+                f"  p99 {percentile(latencies, 99):6.2f} ms"
+                f"  host CPU {result['host_cpu'] / result['wall']:6.2%}"
+                f" ({result['host_cpu'] / sent * 1e6:5.1f} µs/message)"
+                f"  dropped {result['dropped']}"
+            )
+
+
+LOAD_PATTERNS = {
+    "4-7-8": [(4, "In"), (7, "Hold"), (8, "Out")],
+    "4-4-4-4": [(4, "In"), (4, "Hold"), (4, "Out"), (4, "Hold")],
+    "quick": [(1, "In"), (2, "Out")],
+}
+
+
+def record_load(worker: int, procs: int, count: int, base: int) -> dict:
+    """Run and record sessions in one process of the load benchmark.
+
+    Sessions run on a simulated clock, so only recording takes time. Each
+    gets its own start second, interleaved with the other processes.
+    """
+    import asyncio
+    from .context import get_context
+    from .engine import SessionEngine, SimulatedClock
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        manager = get_context().stats
+    names = list(LOAD_PATTERNS)
+    latencies = []
+    submitted: dict[str, int] = {}
+    started = time.monotonic()
+    for i in range(count):
+        pattern = names[(worker + i) % len(names)]
+        engine = SessionEngine(
+            LOAD_PATTERNS[pattern], 1 + i % 4, clock=SimulatedClock()
+        )
+        summary = asyncio.run(engine.run())
+        start_at = base + i * procs + worker
+        start = time.perf_counter()
+        manager.add_session(
+            pattern,
+            summary["cycles"],
+            summary["duration_seconds"],
+            start_at,
+            start_at + summary["duration_seconds"],
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        submitted[pattern] = submitted.get(pattern, 0) + 1
+    return {
+        "latencies": latencies,
+        "submitted": submitted,
+        "started": started,
+        "finished": time.monotonic(),
+        "total_sessions": manager.data["total_sessions"],
+        "patterns_used": manager.data["patterns_used"],
+    }
+
+
+@bench_app.command("load")
+def load(
+    procs: Annotated[int, typer.Option(help="Processes recording at once.")] = 4,
+    sessions: Annotated[
+        int, typer.Option(help="Sessions recorded in all, split between them.")
+    ] = 2000,
+    storage: Annotated[
+        str,
+        typer.Option(help="'file' (one shared stats.json) or 'memory' (per process)."),
+    ] = "file",
+):
+    """Record sessions from many processes, check that none was lost."""
+    from concurrent.futures import ProcessPoolExecutor
+    from .context import AppContext
+
+    if storage not in ("file", "memory"):
+        print("Error: storage must be 'file' or 'memory'.")
+        raise typer.Exit(code=1)
+    shares = [sessions // procs + (w < sessions % procs) for w in range(procs)]
+    # A month back, so sessions never end in the future
+    base = int(time.time()) - 30 * 86400
+    with temporary_home() as home:
+        if storage == "memory":
+            os.environ[STORAGE_VAR] = "memory"
+        with ProcessPoolExecutor(max_workers=procs) as executor:
+            futures = [
+                executor.submit(record_load, worker, procs, share, base)
+                for worker, share in enumerate(shares)
+            ]
+            results = [future.result() for future in futures]
+
+        config_dir = Path(home) / ".config" / APP_NAME
+        sizes = {
+            name: os.path.getsize(config_dir / name)
+            for name in ("stats.json", "sessions.idx", "sessions.log")
+            if (config_dir / name).exists()
+        }
+        if storage == "memory":
+            total = sum(result["total_sessions"] for result in results)
+            patterns: dict[str, int] = {}
+            for result in results:
+                for name, count in result["patterns_used"].items():
+                    patterns[name] = patterns.get(name, 0) + count
+        else:
+            with contextlib.redirect_stdout(io.StringIO()):
+                data = AppContext().stats.data
+            total, patterns = data["total_sessions"], data["patterns_used"]
+
+    submitted: dict[str, int] = {}
+    for result in results:
+        for name, count in result["submitted"].items():
+            submitted[name] = submitted.get(name, 0) + count
+    latencies = [latency for result in results for latency in result["latencies"]]
+    wall = max(r["finished"] for r in results) - min(r["started"] for r in results)
+
+    print(
+        f"Recorded {sessions} sessions from {procs} processes "
+        f"({storage} storage) in {wall:.2f}s:"
+    )
+    print(f"  throughput  {sessions / wall:8.1f} sessions/s")
+    print(
+        f"  write       p50 {percentile(latencies, 50):8.2f} ms"
+        f"  p99 {percentile(latencies, 99):8.2f} ms"
+    )
+    for name, size in sizes.items():
+        print(
+            f"  {name:<12} {size / 1024:8.1f} KB  ({size / sessions:.0f} bytes/session)"
+        )
+    patterns = {name: count for name, count in patterns.items() if count}
+    ok = total == sessions and patterns == submitted
+    print(
+        f"  total_sessions {total} and patterns_used {patterns}: "
+        f"{'match' if ok else 'MISMATCH, expected ' + str(submitted)}"
+    )
+    if not ok:
+        raise typer.Exit(code=1)
+
+
+@bench_app.command("startup")
+def startup(
+    runs: Annotated[int, typer.Option(help="Number of runs per variant.")] = 20,
+):
+    """Measure cold starts of the trivial commands, manifest vs full CLI."""
+    from .stats import StatsManager
+
+    package = __package__
+    cases = {
+        "breath --help": (["--help"], {}),
+        "breath stats --help": (["stats", "--help"], {}),
+        "breath --version": (["--version"], {}),
+        "breath stats --prompt": (["stats", "--prompt"], {}),
+        "breath st<TAB>": (
+            [],
+            {
+                COMPLETE_VAR: "complete_bash",
+                "COMP_WORDS": "breath st",
+                "COMP_CWORD": "1",
+            },
+        ),
+    }
+    with temporary_home():
+        with contextlib.redirect_stdout(io.StringIO()):
+            StatsManager().add_session("4-7-8", 4, 76)
+        base = [sys.executable, "-c", "pass"]
+        print(f"Cold start over {runs} runs:")
+        print(
+            format_timings("python startup", time_command(base, dict(os.environ), runs))
+        )
+        for label, (args, extra) in cases.items():
+            env = dict(os.environ, **extra)
+            argv = f"import sys; sys.argv = {['breath', *args]!r}"
+            variants = {
+                "full CLI": f"{argv}; from {package}.breath import app; app(prog_name='breath')",
+                "launcher": f"{argv}; from {package}.launcher import main; main()",
+            }
+            # A first full run writes the manifest (and the help screen) once
+            time_command([sys.executable, "-c", variants["launcher"]], env, 1)
+            print(f"{label}:")
+            for variant, code in variants.items():
+                timings = time_command([sys.executable, "-c", code], env, runs)
+                print(format_timings(variant, timings))
+
+
+if __name__ == "__main__":
+    bench_app()
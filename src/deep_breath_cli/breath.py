@@ -1,11 +1,47 @@
-import os
+from . import profiling
+import asyncio
+import contextlib
+import io
 import time
 import typer
+from pathlib import Path
+from typing import Callable, Coroutine
 from rich.console import Console
-from rich.progress import track
+from rich.table import Table
+from rich.text import Text
 from typing_extensions import Annotated
+from .checkpoint import CheckpointLog, recover_sessions
+from .completion import match_names, read_name_cache
+from .context import AppContext, get_context, set_context
+from .engine import SessionEngine
+from .fsck import StatsChecker
+from .group import GROUP_SOCKET, GroupClient, GroupHost
+from .hooks import EventBus, load_hooks
+from .manifest import version_text
+from .merge import (
+    build_stats,
+    deduplicate,
+    find_stats_files,
+    format_report,
+    merge_stats_files,
+)
+from .metrics import MetricsExporter
 from .presets import PresetManager
-from .stats import StatsManager
+from .prompt import (
+    PROMPT_FORMAT,
+    format_prompt,
+    prompt_summary,
+    read_prompt_summary,
+    write_prompt_summary,
+)
+from .render import DEFAULT_FPS, TerminalRenderer, phase_label
+from .report import FORMATS as REPORT_FORMATS, ReportBuilder
+from .retention import retention_policy
+from .stats import STATS_FILE, dump_stats
+from .timeline import describe_steps
+from .watch import watch_stats
+
+profiling.mark_imports_done()
 
 
 PATTERNS: dict[str, list[tuple[int, str]]] = {
@@ -24,30 +60,118 @@ PATTERNS: dict[str, list[tuple[int, str]]] = {
 
 
 app = typer.Typer()
+stats_app = typer.Typer()
+app.add_typer(stats_app, name="stats")
+
+
+def _print_version(value: bool) -> None:
+    """Print the version and exit."""
+    if value:
+        print(version_text())
+        raise typer.Exit()
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    version: Annotated[
+        bool,
+        typer.Option(
+            "--version",
+            callback=_print_version,
+            is_eager=True,
+            help="Show the version and exit.",
+        ),
+    ] = False,
+    profile: Annotated[
+        bool,
+        typer.Option("--profile", help="Print a timing breakdown of the command."),
+    ] = False,
+    profile_output: Annotated[
+        str,
+        typer.Option(
+            "--profile-output",
+            help="Also write a .pstats (cProfile) or .json (Chrome trace) file.",
+        ),
+    ] = "",
+):
+    """A command-line tool designed to help you relax from your terminal."""
+    if profile or profile_output:
+        profiling.enable(profile_output)
+        ctx.call_on_close(profiling.finish)
+
+    # Each command starts from a fresh context, loaded at most once
+    context = AppContext()
+    set_context(context)
+    if not ctx.resilient_parsing and context.storage.persistent:
+        recovered = recover_sessions(
+            context.config_dir,
+            lambda session: _recorder(session["pattern"])(session),
+        )
+        if recovered:
+            print(f"Recovered {recovered} interrupted session(s) from checkpoints.")
+
+    metrics = MetricsExporter.from_env(context.config_dir)
+    if metrics is not None:
+        command = ctx.invoked_subcommand or "breath"
+        ctx.call_on_close(
+            lambda: metrics.observe_command(
+                command, time.perf_counter() - profiling.PROCESS_START
+            )
+        )
+
+
+def _preset_names() -> dict[str, str]:
+    """Return preset names and their type for shell completion."""
+    names = read_name_cache(get_context().config_dir)
+    if names is None:
+        # Completion output goes to the shell, so keep load messages out of it
+        with contextlib.redirect_stdout(io.StringIO()):
+            all_presets = get_context().presets.get_all_presets()
+        names = {name: preset_type for name, (_, preset_type) in all_presets.items()}
+    return names
 
 
-def breath_phase(duration: int, message: str):
-    """Breathing phase with a message."""
-    for value in track(range(duration), description=message):
-        time.sleep(1)
+def complete_pattern(incomplete: str) -> list[tuple[str, str]]:
+    """Complete the name of any preset."""
+    return match_names(_preset_names(), incomplete)
+
+
+def complete_custom_pattern(incomplete: str) -> list[tuple[str, str]]:
+    """Complete the name of a custom preset."""
+    return match_names(_preset_names(), incomplete, custom_only=True)
 
 
 @app.command()
-def presets():
+def presets(
+    limit: Annotated[
+        int, typer.Option(min=0, help="Patterns shown per page (0 for all).")
+    ] = 50,
+    offset: Annotated[int, typer.Option(min=0, help="Number of patterns to skip.")] = 0,
+):
     """Display available breathing patterns."""
     console = Console()
     console.print("Available breathing patterns:", style="bold")
-    preset_manager: PresetManager = PresetManager()
-    all_presets: dict[str, tuple[list[tuple[int, str]], str]] = (
-        preset_manager.get_all_presets()
-    )
+    page, total = get_context().presets.get_presets_page(offset, limit)
+
+    table = Table(box=None, pad_edge=False)
+    table.add_column("Pattern")
+    table.add_column("Phases")
+    table.add_column("Type", style="dim")
+    separator = Text(", ", style="white")
+    for pattern, phases, preset_type in page:
+        labels = [phase_label(step) for step in describe_steps(phases)]
+        table.add_row(Text(pattern), separator.join(labels), preset_type)
+    # The whole page goes out in a single write
+    console.print(table)
 
-    for pattern, (phases, preset_type) in all_presets.items():
-        phases_display: list = []
-        for duration, message in phases:
-            phases_display.append(f"{duration}s {message}")
-        phases_str = "[white], ".join(phases_display)
-        console.print(f"  {pattern}: {phases_str} [white]({preset_type})")
+    if len(page) < total:
+        shown = f"{offset + 1}-{offset + len(page)}" if page else "none"
+        console.print(f"\nShowing {shown} of {total} patterns.", style="dim")
+        if offset + len(page) < total:
+            console.print(
+                f"Use --offset {offset + len(page)} for the next page.", style="dim"
+            )
     console.print(
         "\nYou can use these patterns with the --pattern option.", style="dim"
     )
@@ -56,40 +180,249 @@ def presets():
 @app.command("create-pattern")
 def create_pattern(name: str):
     """Create a new breathing pattern interactively."""
-    preset_manager = PresetManager()
+    preset_manager = get_context().presets
     preset_manager.create_interactive_preset(name)
 
 
 @app.command("delete-pattern")
-def delete_pattern(name: str):
+def delete_pattern(
+    name: Annotated[str, typer.Argument(autocompletion=complete_custom_pattern)],
+):
     """Delete a custom breathing pattern."""
-    preset_manager = PresetManager()
+    preset_manager = get_context().presets
     preset_manager.delete_preset(name)
 
 
 @app.command("modify-pattern")
-def modify_pattern(name: str):
+def modify_pattern(
+    name: Annotated[str, typer.Argument(autocompletion=complete_custom_pattern)],
+):
     """Modify an existing custom breathing pattern."""
-    preset_manager = PresetManager()
+    preset_manager = get_context().presets
     preset_manager.modify_preset(name)
 
 
-@app.command("stats")
+@stats_app.callback(invoke_without_command=True)
 def stats(
+    ctx: typer.Context,
     detailed: Annotated[
         bool,
         typer.Option("--detailed", "-d", help="Show detailed stats with charts"),
     ] = False,
+    by_hour: Annotated[
+        bool,
+        typer.Option("--by-hour", help="Show sessions by hour of day"),
+    ] = False,
+    by_weekday: Annotated[
+        bool,
+        typer.Option("--by-weekday", help="Show sessions by day of week"),
+    ] = False,
+    by_month: Annotated[
+        bool,
+        typer.Option("--by-month", help="Show sessions per month over the last year"),
+    ] = False,
+    patterns: Annotated[
+        bool,
+        typer.Option(
+            "--patterns", help="Show sessions, cycles and durations per pattern"
+        ),
+    ] = False,
+    watch: Annotated[
+        bool,
+        typer.Option("--watch", "-w", help="Keep refreshing as sessions are added"),
+    ] = False,
+    interval: Annotated[
+        float,
+        typer.Option(help="Seconds between checks for new sessions with --watch"),
+    ] = 1.0,
+    prompt: Annotated[
+        bool,
+        typer.Option(
+            "--prompt", help="Print a one-line summary for a shell prompt, fast"
+        ),
+    ] = False,
+    prompt_format: Annotated[
+        str,
+        typer.Option(
+            help="Template of --prompt, using {streak}, {today} and {minutes}"
+        ),
+    ] = PROMPT_FORMAT,
 ):
     """Display breathing session statistics."""
-    stats_manager = StatsManager()
-    if detailed:
+    if ctx.invoked_subcommand is not None:
+        return
+    if prompt:
+        context = get_context()
+        if context.storage.persistent:
+            summary = read_prompt_summary(context.config_dir)
+        else:
+            summary = None
+        if summary is None:
+            # Stats written before prompt summaries existed: compute it once
+            with contextlib.redirect_stdout(io.StringIO()):
+                data = context.stats.data
+            if context.storage.persistent:
+                write_prompt_summary(context.config_dir, data)
+                summary = read_prompt_summary(context.config_dir)
+            else:
+                figures = prompt_summary(data)
+                summary = {
+                    "streak": figures["streak"],
+                    "today": figures["today"],
+                    "minutes": figures["total_seconds"] // 60,
+                }
+        try:
+            print(format_prompt(summary, prompt_format))
+        except (KeyError, IndexError, ValueError) as e:
+            print(f"Error in prompt format: {e}")
+            raise typer.Exit(code=1)
+        return
+    if watch:
+        watch_stats(interval)
+        return
+    stats_manager = get_context().stats
+    if by_hour or by_weekday or by_month or patterns:
+        if patterns:
+            print(stats_manager.get_patterns_stats())
+        if by_hour:
+            print(stats_manager.get_hours_stats())
+        if by_weekday:
+            print(stats_manager.get_weekdays_stats())
+        if by_month:
+            print(stats_manager.get_months_stats())
+    elif detailed:
         print(stats_manager.get_detailed_stats())
     else:
         print(stats_manager.get_display_stats())
         print("\nUse 'breath stats --detailed' for charts and advanced analytics.")
 
 
+@stats_app.command("merge")
+def stats_merge(
+    source: Annotated[
+        str, typer.Argument(help="A directory or glob pattern of stats files.")
+    ],
+    output_path: Annotated[
+        str,
+        typer.Option("--output", "-o", help="Write the merged stats to this file."),
+    ] = "",
+    workers: Annotated[
+        int,
+        typer.Option(
+            "--workers", "-w", help="Number of worker processes (0 = all cores)."
+        ),
+    ] = 0,
+):
+    """Merge many stats files into one fleet report."""
+    paths = find_stats_files(source)
+    if not paths:
+        print(f"No stats files found in '{source}'.")
+        raise typer.Exit(code=1)
+
+    # Sessions are kept to count those found in several files only once
+    partial = deduplicate(merge_stats_files(paths, workers, keep_sessions=True))
+    print(format_report(partial))
+
+    if output_path:
+        # Fields first and sessions last, so merging the output streams it
+        with open(output_path, "w") as f:
+            f.write(dump_stats(build_stats(partial)))
+        print(f"\nMerged stats written to: {output_path}")
+
+
+@stats_app.command("vacuum")
+def stats_vacuum(
+    keep_days: Annotated[
+        int | None,
+        typer.Option(
+            "--keep-days", help="Keep raw sessions for this many days (default 365)."
+        ),
+    ] = None,
+    granularity: Annotated[
+        str,
+        typer.Option(
+            "--granularity", help="Compact older sessions per 'day' or per 'month'."
+        ),
+    ] = "",
+):
+    """Compact old sessions into daily or monthly records to reclaim space.
+
+    The options are saved as the retention policy used by later runs.
+    """
+    stats_manager = get_context().stats
+    size_before = stats_manager.storage.size(STATS_FILE)
+    try:
+        compacted = stats_manager.vacuum(keep_days, granularity)
+    except ValueError as e:
+        print(f"Error: {e}")
+        raise typer.Exit(code=1)
+
+    policy = retention_policy(stats_manager.data)
+    size_after = stats_manager.storage.size(STATS_FILE)
+    print(
+        f"Compacted {compacted} sessions older than {policy['keep_days']} days "
+        f"into per-{policy['granularity']} records."
+    )
+    print(f"stats.json: {size_before / 1024:.1f} KB -> {size_after / 1024:.1f} KB")
+
+
+@stats_app.command("fsck")
+def stats_fsck(
+    repair: Annotated[
+        bool,
+        typer.Option("--repair", help="Rewrite the aggregates that do not match."),
+    ] = False,
+    workers: Annotated[
+        int,
+        typer.Option(
+            "--workers", "-w", help="Number of worker processes (0 = all cores)."
+        ),
+    ] = 0,
+):
+    """Check totals, patterns, streaks and rollups against the raw sessions."""
+    storage = get_context().storage
+    stats_file = storage.path(STATS_FILE)
+    if not stats_file.exists():
+        print(f"Stats file not found: {stats_file}")
+        raise typer.Exit(code=1)
+
+    checker = StatsChecker(stats_file, storage)
+    start = time.perf_counter()
+    try:
+        checker.scan(workers)
+    except (OSError, ValueError) as e:
+        print(f"Error checking stats file: {e}")
+        raise typer.Exit(code=1)
+    partial = checker.partial
+    print(
+        f"Checked {partial['total_sessions']} sessions "
+        f"in {time.perf_counter() - start:.2f}s."
+    )
+    if partial["invalid"]:
+        print(f"Ignored {partial['invalid']} sessions that could not be read.")
+
+    mismatches = checker.find_mismatches()
+    if not mismatches:
+        print("All aggregates match the sessions.")
+        return
+    print("Mismatched aggregates:")
+    for mismatch in mismatches:
+        print(f"  {mismatch}")
+    if not repair:
+        print("\nRun 'breath stats fsck --repair' to rewrite them.")
+        raise typer.Exit(code=1)
+
+    try:
+        repaired = checker.repair()
+    except OSError as e:
+        print(f"Error repairing stats file: {e}")
+        raise typer.Exit(code=1)
+    if not repaired:
+        print("\nThe stats file changed during the check, nothing was rewritten.")
+        raise typer.Exit(code=1)
+    print(f"\nAggregates rewritten in: {stats_file}")
+
+
 @app.command("export-stats")
 def export_stats(
     format: Annotated[
@@ -103,18 +436,84 @@ def export_stats(
     ] = "",
 ):
     """Export breathing session statistics."""
-    stats_manager = StatsManager()
+    stats_manager = get_context().stats
     stats_manager.export_stats(format, output_path)
 
 
+@app.command("import-stats")
+def import_stats(
+    input_path: Annotated[
+        str,
+        typer.Argument(help="A json, csv or ndjson export, optionally gzipped."),
+    ],
+    format: Annotated[
+        str,
+        typer.Option(
+            "--format", "-f", help="Force the input format (json, csv or ndjson)."
+        ),
+    ] = "",
+):
+    """Import breathing session statistics exported with export-stats."""
+    stats_manager = get_context().stats
+    stats_manager.import_stats(input_path, format)
+
+
+@app.command()
+def report(
+    output_dir: Annotated[
+        Path, typer.Option("--output", "-o", help="Directory to write the report to.")
+    ],
+    format: Annotated[
+        list[str] | None,
+        typer.Option(
+            "--format",
+            "-f",
+            help="Page format (html or md), repeatable (default both).",
+        ),
+    ] = None,
+    full: Annotated[
+        bool,
+        typer.Option("--full", help="Recompute every month instead of new ones"),
+    ] = False,
+):
+    """Write a static HTML/Markdown report, updating only months with new sessions."""
+    if format is None:
+        format = list(REPORT_FORMATS)
+    unknown = set(format) - set(REPORT_FORMATS)
+    if unknown:
+        print(f"Error: unknown format {', '.join(sorted(unknown))}, use html or md.")
+        raise typer.Exit(code=1)
+    builder = ReportBuilder(output_dir, get_context().config_dir, tuple(set(format)))
+    try:
+        result = builder.build(full)
+    except OSError as e:
+        print(f"Error writing report: {e}")
+        raise typer.Exit(code=1)
+    how = "Rebuilt" if result["rebuilt"] else "Updated"
+    print(
+        f"{how} report in {output_dir}: {len(result['written'])} of"
+        f" {result['months']} months written."
+    )
+
+
 @app.command("start")
 def breath(
     cycle: Annotated[
         int, typer.Option(help="The number of cycle you want to breathe.")
     ] = 4,
     pattern: Annotated[
-        str, typer.Option(help="The pattern you want to breath with.")
+        str,
+        typer.Option(
+            help="The pattern you want to breath with.",
+            autocompletion=complete_pattern,
+        ),
     ] = "4-7-8",
+    fps: Annotated[
+        int,
+        typer.Option(
+            help="Target frame rate of the animation, lowered on slow terminals."
+        ),
+    ] = DEFAULT_FPS,
 ):
     """Main function to start the breathing cycle."""
     print("Hello from deep-breathe-cli!")
@@ -125,7 +524,17 @@ def breath(
     print(f"Starting a breathing cycle of {cycle} cycles...")
     time.sleep(2)
 
-    preset_manager: PresetManager = PresetManager()
+    pattern, engine = _load_engine(pattern, cycle)
+    _run_session(
+        pattern,
+        engine,
+        lambda record: engine.run(TerminalRenderer(fps), record, keyboard=True),
+    )
+
+
+def _load_engine(pattern: str, cycle: int) -> tuple[str, SessionEngine]:
+    """Return the pattern actually used and an engine running it."""
+    preset_manager: PresetManager = get_context().presets
     all_presets: dict[str, tuple[list[tuple[int, str]], str]] = (
         preset_manager.get_all_presets()
     )
@@ -134,24 +543,169 @@ def breath(
         print(f"Pattern '{pattern}' not found. Using default pattern '4-7-8'.")
         pattern = "4-7-8"
 
-    for cycle_number in range(cycle):
-        os.system("clear")  # Clear the console for better visibility
-        print(f"Cycle {cycle_number + 1} of {cycle}:")
-        phases, _ = all_presets[pattern]
-        for duration, message in phases:
-            breath_phase(duration, message)
-        os.system("clear")
-
-    # Caclulate session duration
     phases, _ = all_presets[pattern]
-    pattern_duration = sum(duration for duration, _ in phases)
-    total_duration = cycle * pattern_duration
+    try:
+        return pattern, SessionEngine(phases, cycle)
+    except ValueError as e:
+        print(f"Error in pattern '{pattern}': {e}")
+        raise typer.Exit(code=1)
+
+
+def _recorder(pattern: str) -> Callable[[dict], None]:
+    """Return a callback saving a session of the pattern to the stats file."""
+
+    def record(session: dict) -> None:
+        get_context().stats.add_session(
+            pattern,
+            session["cycles"],
+            session["duration_seconds"],
+            session["started_at"],
+            session["ended_at"],
+        )
+
+    return record
+
 
-    stats_manager = StatsManager()
-    stats_manager.add_session(pattern, cycle, total_duration)
+def _run_session(
+    pattern: str,
+    engine: SessionEngine,
+    session: Callable[[Callable[[dict], None]], Coroutine],
+) -> None:
+    """Run a session with hooks and checkpoints, and report how it ended.
+
+    session is given the callback that records the session in the stats.
+    """
+    config_dir = get_context().config_dir
+    bus = EventBus(load_hooks(config_dir), {"pattern": pattern})
+    checkpoints = CheckpointLog(config_dir, pattern)
+    # Sessions kept in memory are lost with the process anyway
+    durable = get_context().storage.persistent
+    save = _recorder(pattern)
+
+    def emit(event: str, payload: dict) -> None:
+        bus.emit(event, payload)
+        if durable:
+            checkpoints.observe(event, payload)
+
+    def record(session: dict) -> None:
+        save(session)
+        if durable:
+            checkpoints.finish()
+
+    engine.events = emit
+    try:
+        summary = asyncio.run(session(record))
+    except KeyboardInterrupt:
+        print(f"Session interrupted after {round(engine.breathing_seconds)} seconds.")
+        raise typer.Exit(code=130)
+    finally:
+        checkpoints.close()
+        bus.close()
+        metrics = MetricsExporter.from_env(config_dir)
+        if metrics is not None and bus.hooks:
+            metrics.observe_hooks(bus.hooks)
+    if summary["status"] == "stopped":
+        print(f"Session stopped after {summary['duration_seconds']} seconds.")
+        return
     print("Cycle complete! Take a moment to relax.")
 
 
+@app.command()
+def host(
+    cycle: Annotated[
+        int, typer.Option(help="The number of cycle you want to breathe.")
+    ] = 4,
+    pattern: Annotated[
+        str,
+        typer.Option(
+            help="The pattern you want to breath with.",
+            autocompletion=complete_pattern,
+        ),
+    ] = "4-7-8",
+    listen: Annotated[
+        str,
+        typer.Option(
+            help="Unix socket path or host:port to listen on (default: a socket in the config directory)."
+        ),
+    ] = "",
+    fps: Annotated[
+        int,
+        typer.Option(
+            help="Target frame rate of the animation, lowered on slow terminals."
+        ),
+    ] = DEFAULT_FPS,
+):
+    """Lead a group session that terminals joined with 'breath join' follow."""
+    if cycle < 1:
+        print("Cycle must be at least 1. Setting to 1.")
+        cycle = 1
+    pattern, engine = _load_engine(pattern, cycle)
+    address = listen or str(get_context().config_dir / GROUP_SOCKET)
+    print(f"Hosting '{pattern}' for {cycle} cycles. To join: breath join {address}")
+
+    def wait_for_participants() -> None:
+        input("Press Enter to start the session for everyone...")
+
+    try:
+        _run_session(
+            pattern,
+            engine,
+            # Built once the hooks are listening, to pass the events on
+            lambda record: GroupHost(engine, pattern).run(
+                address,
+                TerminalRenderer(fps),
+                record,
+                keyboard=True,
+                start=wait_for_participants,
+            ),
+        )
+    except OSError as e:
+        print(f"Error hosting session on {address}: {e}")
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def join(
+    address: Annotated[
+        str,
+        typer.Argument(
+            help="Unix socket path or host:port of the host (default: the local socket)."
+        ),
+    ] = "",
+    fps: Annotated[
+        int,
+        typer.Option(
+            help="Target frame rate of the animation, lowered on slow terminals."
+        ),
+    ] = DEFAULT_FPS,
+):
+    """Follow a session led with 'breath host', in step with the host."""
+    address = address or str(get_context().config_dir / GROUP_SOCKET)
+    client = GroupClient()
+
+    def greet(message: dict) -> None:
+        print(f"Joined the '{message['pattern']}' session on {address}.")
+        if message["status"] == "ready":
+            print("Waiting for the host to start...")
+
+    try:
+        session = asyncio.run(client.run(address, TerminalRenderer(fps), greet))
+    except OSError as e:
+        print(f"Error joining session on {address}: {e}")
+        raise typer.Exit(code=1)
+    except KeyboardInterrupt:
+        session = client.session()
+    if client.skipped:
+        print(f"Skipped {client.skipped} damaged messages from the host.")
+    # Less than a second breathed is not worth a session
+    if client.pattern is not None and session["duration_seconds"] >= 1:
+        _recorder(client.pattern)(session)
+    if session["status"] == "finished":
+        print("Cycle complete! Take a moment to relax.")
+    else:
+        print(f"Left the session after {session['duration_seconds']} seconds.")
+
+
 if __name__ == "__main__":
     # typer.run(main)
     app()
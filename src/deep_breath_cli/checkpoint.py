@@ -0,0 +1,231 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+try:
+    import fcntl
+except ImportError:  # Windows: the log is used without locking
+    fcntl = None
+
+
+CHECKPOINT_FILE = "checkpoints.log"
+# Seconds records wait to be written together with the ones that follow
+COMMIT_DELAY = 0.5
+
+
+def _process_alive(pid: int) -> bool:
+    """Return True if another running process has this pid."""
+    if pid == os.getpid():
+        # Left by an earlier session of this very process
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+@contextlib.contextmanager
+def _locked(f):
+    """Hold an exclusive lock on an open file for the block."""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield f
+    finally:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class CheckpointLog:
+    """Write-ahead log of the progress of a running session.
+
+    The session is logged when it starts, at the start of each phase,
+    after each completed cycle and once it is saved in the stats. Records are buffered and a background
+    thread writes and fsyncs whatever accumulated in one go (a group
+    commit), so the engine never waits on the disk. If the process dies
+    (closed SSH connection, kill, crash), the next command finds the
+    session unfinished and records the cycles it had completed and the
+    time breathed up to its last record.
+    """
+
+    def __init__(self, config_dir: Path, pattern: str):
+        """Initialize the log of one session of a pattern."""
+        self.log_file = config_dir / CHECKPOINT_FILE
+        self.pattern = pattern
+        self.session = f"{os.getpid()}-{time.time_ns()}"
+        self.commits = 0
+        self._buffer: list[str] = []
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+        self._closing = threading.Event()
+        self._file = None
+        self._thread: threading.Thread | None = None
+
+    def _append(self, record: dict[str, Any]) -> None:
+        """Queue a record for the next commit."""
+        line = json.dumps({"session": self.session, **record}) + "\n"
+        with self._lock:
+            self._buffer.append(line)
+        self._pending.set()
+
+    def observe(self, event: str, payload: dict[str, Any]) -> None:
+        """Log the engine events that mark progress; must not block."""
+        if event == "session_start":
+            if self._thread is None:
+                self._start()
+            self._append(
+                {
+                    "type": "begin",
+                    "pid": os.getpid(),
+                    "pattern": self.pattern,
+                    "started_at": int(time.time()),
+                }
+            )
+        elif event in ("phase_change", "cycle_complete"):
+            # Phase starts keep the part of an unfinished cycle
+            self._append(
+                {
+                    "type": "cycle" if event == "cycle_complete" else "phase",
+                    "duration_seconds": payload["duration_seconds"],
+                    "at": int(time.time()),
+                }
+            )
+
+    def finish(self) -> None:
+        """Mark the session as saved in the stats, and commit now."""
+        self._append({"type": "end"})
+        self.commit()
+
+    def _start(self) -> None:
+        """Open the log and start the commit thread."""
+        try:
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.log_file, "a")
+        except OSError as e:
+            print(f"Error opening checkpoint log: {e}")
+            return
+        self._thread = threading.Thread(
+            target=self._work, name="checkpoints", daemon=True
+        )
+        self._thread.start()
+
+    def commit(self) -> None:
+        """Write and fsync every buffered record at once."""
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        if not lines or self._file is None:
+            return
+        try:
+            with _locked(self._file) as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            self.commits += 1
+        except OSError as e:
+            print(f"Error writing checkpoint log: {e}")
+
+    def _work(self) -> None:
+        """Commit records in groups until close()."""
+        while not self._closing.is_set():
+            self._pending.wait()
+            # Let the records that follow closely join this commit
+            self._closing.wait(COMMIT_DELAY)
+            self._pending.clear()
+            self.commit()
+
+    def close(self) -> None:
+        """Commit what is left and stop the commit thread."""
+        self._closing.set()
+        self._pending.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.commit()
+        if self._file is not None:
+            self._file.close()
+
+
+def _recovered_session(
+    begin: dict[str, Any], entries: list[dict[str, Any]]
+) -> dict[str, Any] | None:
+    """Return the session an unfinished log records, None if too short."""
+    cycles = [e for e in entries if e.get("type") == "cycle"]
+    progress = [e for e in entries if e.get("type") in ("cycle", "phase")]
+    # Less than a second breathed is not worth a session
+    if not progress or progress[-1]["duration_seconds"] < 1:
+        return None
+    return {
+        "pattern": begin["pattern"],
+        "cycles": len(cycles),
+        "duration_seconds": progress[-1]["duration_seconds"],
+        "started_at": begin["started_at"],
+        "ended_at": progress[-1]["at"],
+    }
+
+
+def recover_sessions(config_dir: Path, record: Callable[[dict[str, Any]], Any]) -> int:
+    """Record the sessions a dead process left unfinished in the log.
+
+    Sessions still running in another process stay in the log, and so do
+    sessions that could not be recorded, to be tried again by the next
+    command; everything else is removed from it. Returns the number of
+    sessions recorded.
+    """
+    log_file = config_dir / CHECKPOINT_FILE
+    try:
+        if os.stat(log_file).st_size == 0:
+            return 0
+        f = open(log_file, "r+")
+    except OSError:
+        return 0
+
+    recovered = 0
+    with f, _locked(f):
+        sessions: dict[str, list[dict[str, Any]]] = {}
+        for line in f:
+            try:
+                entry = json.loads(line)
+                sessions.setdefault(entry["session"], []).append(entry)
+            except (json.JSONDecodeError, KeyError, TypeError):
+                # The last line of a process killed halfway through a write
+                continue
+
+        keep = []
+        for entries in sessions.values():
+            begin = next((e for e in entries if e.get("type") == "begin"), None)
+            if begin is None or any(e.get("type") == "end" for e in entries):
+                continue
+            try:
+                alive = _process_alive(begin["pid"])
+                session = _recovered_session(begin, entries)
+            except (KeyError, TypeError):
+                # A damaged record: nothing can be recovered from it
+                continue
+            if alive:
+                keep.extend(entries)
+                continue
+            if session is None:
+                continue
+            try:
+                record(session)
+            except Exception as e:
+                # Never in the way of the command about to run, tried again later
+                print(f"Error recovering an interrupted session: {e}")
+                keep.extend(entries)
+                continue
+            recovered += 1
+
+        f.seek(0)
+        f.truncate()
+        f.write("".join(json.dumps(entry) + "\n" for entry in keep))
+        f.flush()
+        os.fsync(f.fileno())
+    return recovered
@@ -0,0 +1,174 @@
+import os
+
+
+# This module runs on every TAB press, so it must only use cheap stdlib modules
+NAME_CACHE = "preset_names.txt"
+COMPLETE_VAR = "_BREATH_COMPLETE"
+
+# Global options that consume the next word
+GLOBAL_VALUE_OPTIONS = {"--profile-output"}
+# Commands whose single argument is the name of a custom preset
+CUSTOM_NAME_COMMANDS = {"delete-pattern", "modify-pattern"}
+
+
+def write_name_cache(config_dir, names: dict[str, str]) -> None:
+    """Write preset names and their type ("built-in" or "custom") to the cache."""
+    from .metrics import write_textfile
+
+    text = "".join(f"{name}\t{kind}\n" for name, kind in names.items())
+    write_textfile(config_dir / NAME_CACHE, text)
+
+
+def read_name_cache(config_dir) -> dict[str, str] | None:
+    """Return the cached preset names, or None if there is no cache yet."""
+    try:
+        with open(os.path.join(config_dir, NAME_CACHE), "r") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    names = {}
+    for line in lines:
+        name, _, kind = line.partition("\t")
+        names[name] = kind
+    return names
+
+
+def match_names(
+    names: dict[str, str], incomplete: str, custom_only: bool = False
+) -> list[tuple[str, str]]:
+    """Return the (name, type) pairs that start with what was typed."""
+    return [
+        (name, kind)
+        for name, kind in names.items()
+        if name.startswith(incomplete) and (kind == "custom" or not custom_only)
+    ]
+
+
+def split_arg_string(string: str) -> list[str]:
+    """Split a command line like the shell would, tolerating open quotes."""
+    if not any(char in string for char in "\"'\\"):
+        return string.split()
+    # shlex pulls in re and enum, only pay for it when quoting is involved
+    import shlex
+
+    lex = shlex.shlex(string, posix=True)
+    lex.whitespace_split = True
+    lex.commenters = ""
+    words = []
+    try:
+        for token in lex:
+            words.append(token)
+    except ValueError:
+        # The word being typed has an unclosed quote, keep what was read
+        words.append(lex.token)
+    return words
+
+
+def completion_args(shell: str, environ) -> tuple[list[str], str]:
+    """Return the words before the cursor and the word being completed.
+
+    This follows how each shell script generated by typer passes the
+    command line: bash uses COMP_WORDS/COMP_CWORD, zsh and fish send the
+    line up to the cursor in _TYPER_COMPLETE_ARGS.
+    """
+    if shell == "bash":
+        words = split_arg_string(environ.get("COMP_WORDS", ""))
+        cword = int(environ.get("COMP_CWORD", "0"))
+        incomplete = words[cword] if cword < len(words) else ""
+        return words[1:cword], incomplete
+
+    line = environ.get("_TYPER_COMPLETE_ARGS", "")
+    args = split_arg_string(line)[1:]
+    if args and not line.endswith(" "):
+        return args[:-1], args[-1]
+    return args, ""
+
+
+def name_slot(args: list[str], incomplete: str) -> str | None:
+    """Tell which preset names belong at the cursor.
+
+    Returns "all" after 'start --pattern', "custom" for the argument of
+    delete-pattern and modify-pattern, and None anywhere else.
+    """
+    if incomplete.startswith("-"):
+        return None
+
+    i = 0
+    while i < len(args) and args[i].startswith("-"):
+        i += 2 if args[i] in GLOBAL_VALUE_OPTIONS else 1
+    if i >= len(args):
+        return None
+    command, rest = args[i], args[i + 1 :]
+
+    if command == "start" and rest and rest[-1] == "--pattern":
+        return "all"
+    if command in CUSTOM_NAME_COMMANDS and all(arg.startswith("-") for arg in rest):
+        return "custom"
+    return None
+
+
+def completion_lines(shell: str, items: list[tuple[str, str]]) -> list[str]:
+    """Format each completion exactly like typer's completion classes do."""
+    if shell == "bash":
+        return [name for name, _ in items]
+    if shell == "fish":
+        return [f"{name}\t{kind}" for name, kind in items]
+
+    def escape(s: str) -> str:
+        return (
+            s.replace('"', '""')
+            .replace("'", "''")
+            .replace("$", "\\$")
+            .replace("`", "\\`")
+            .replace(":", r"\\:")
+        )
+
+    return [f'"{escape(name)}":"{escape(kind)}"' for name, kind in items]
+
+
+def join_completions(shell: str, lines: list[str]) -> str:
+    """Join completion lines into the output typer prints for the shell."""
+    if shell != "zsh":
+        return "\n".join(lines)
+    if not lines:
+        return "_files"
+    return "_arguments '*: :((" + "\n".join(lines) + "))'"
+
+
+def fast_complete(environ, config_dir, manifest=None) -> tuple[str | None, int] | None:
+    """Answer a completion from the name cache or the command manifest.
+
+    Preset names come from the cache, command and option names from the
+    manifest. Returns the text to print and the exit code, or None when
+    neither knows the answer and the full CLI has to give it.
+    """
+    instruction, _, shell = environ.get(COMPLETE_VAR, "").partition("_")
+    if instruction != "complete" or shell not in ("bash", "zsh", "fish"):
+        return None
+
+    args, incomplete = completion_args(shell, environ)
+    if incomplete.startswith("-") and "=" in incomplete:
+        # --pattern=4- completes the value after the equal sign
+        option, _, incomplete = incomplete.partition("=")
+        args = args + [option]
+    slot = name_slot(args, incomplete)
+    if slot is not None:
+        names = read_name_cache(config_dir)
+        if names is None:
+            return None
+        items = match_names(names, incomplete, custom_only=slot == "custom")
+        lines = completion_lines(shell, items)
+    elif manifest is not None:
+        lines = manifest.complete(args, incomplete, shell)
+        if lines is None:
+            return None
+    else:
+        return None
+
+    if shell == "fish":
+        action = environ.get("_TYPER_COMPLETE_FISH_ACTION", "")
+        if action == "is-args":
+            return None, 0 if lines else 1
+        if action != "get-args" or not lines:
+            return "", 0
+    return join_completions(shell, lines), 0
@@ -0,0 +1,63 @@
+import os
+from pathlib import Path
+from .paths import STORAGE_VAR
+from .presets import PresetManager
+from .stats import StatsManager
+from .storage import FileStorage, MemoryStorage, resolve_config_dir
+
+
+class AppContext:
+    """Paths, storage and managers shared by everything a command does.
+
+    The config directory is resolved once, and the stats and presets are
+    loaded on first use, then reused instead of being read again by every
+    function that needs them. BREATH_STORAGE=memory keeps everything in
+    memory.
+    """
+
+    def __init__(self, config_dir: Path | None = None, storage=None):
+        """Initialize the context without reading or creating anything."""
+        self.config_dir = config_dir or resolve_config_dir()
+        if storage is None:
+            if os.environ.get(STORAGE_VAR) == "memory":
+                storage = MemoryStorage()
+            else:
+                storage = FileStorage(self.config_dir)
+        self.storage = storage
+        self._stats: StatsManager | None = None
+        self._presets: PresetManager | None = None
+
+    @property
+    def stats(self) -> StatsManager:
+        """Return the stats manager, loading the stats the first time."""
+        if self._stats is None:
+            self._stats = StatsManager(self)
+        return self._stats
+
+    @property
+    def presets(self) -> PresetManager:
+        """Return the preset manager, loading the presets the first time."""
+        if self._presets is None:
+            self._presets = PresetManager(self)
+        return self._presets
+
+
+_current: AppContext | None = None
+
+
+def get_context() -> AppContext:
+    """Return the context of the process, created on first use.
+
+    A new one is created if the config directory no longer resolves to the
+    same place (HOME or the environment changed, as between tests).
+    """
+    global _current
+    if _current is None or _current.config_dir != resolve_config_dir():
+        _current = AppContext()
+    return _current
+
+
+def set_context(context: AppContext) -> None:
+    """Make a context the one of the process."""
+    global _current
+    _current = context
@@ -0,0 +1,349 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable
+from .render import phase_label
+from .timeline import Timeline, TimedPhase
+
+try:
+    import termios
+    import tty
+except ImportError:  # Windows: sessions run without keyboard commands
+    termios = None
+
+
+# Single key presses understood while a session runs
+KEYS = {"p": "pause", "r": "resume", "s": "skip", "q": "stop"}
+# Seconds between two redraws, for renderers that do not set an interval
+RENDER_INTERVAL = 0.1
+
+
+class MonotonicClock:
+    """Wall time for real sessions."""
+
+    def now(self) -> float:
+        """Return the current time in seconds."""
+        return time.monotonic()
+
+    async def wait(self, event: asyncio.Event, timeout: float | None) -> bool:
+        """Wait for the event or the timeout, return True if the event is set."""
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except TimeoutError:
+            return False
+        return True
+
+
+class SimulatedClock:
+    """A clock that jumps straight to the next deadline, for tests.
+
+    Actions scheduled with at() run when the clock reaches their time, so
+    key presses can be replayed at exact points of a session.
+    """
+
+    def __init__(self, start: float = 0.0):
+        """Initialize the clock at a start time."""
+        self.time = start
+        self._actions: list[tuple[float, int, Callable[[], Any]]] = []
+        self._order = itertools.count()
+
+    def now(self) -> float:
+        """Return the simulated time in seconds."""
+        return self.time
+
+    def at(self, when: float, action: Callable[[], Any]) -> None:
+        """Run an action once the clock reaches the given time."""
+        heapq.heappush(self._actions, (when, next(self._order), action))
+
+    async def wait(self, event: asyncio.Event, timeout: float | None) -> bool:
+        """Advance through scheduled actions until the event or the timeout."""
+        # Let the other tasks run, as a real wait would
+        await asyncio.sleep(0)
+        deadline = float("inf") if timeout is None else self.time + timeout
+        while not event.is_set():
+            if not self._actions or self._actions[0][0] > deadline:
+                if timeout is None:
+                    raise RuntimeError("Nothing left to wake a paused session")
+                self.time = deadline
+                return False
+            when, _, action = heapq.heappop(self._actions)
+            self.time = max(self.time, when)
+            action()
+        return True
+
+
+class SessionEngine:
+    """Run the cycles and phases of a breathing session on an event loop.
+
+    The timing loop only waits on its clock, so drawing the progress bar
+    (in a worker thread), reading keys and saving the session never delay
+    a phase transition. Time spent paused is not counted as breathing.
+    """
+
+    def __init__(
+        self,
+        steps: list[Any],
+        cycles: int,
+        clock: Any = None,
+        events: Callable[[str, dict[str, Any]], Any] | None = None,
+        start: float = 0.0,
+    ):
+        """Initialize the engine with a preset's steps and a cycle count.
+
+        events, if given, is called with each lifecycle event and its payload
+        and must not block (see EventBus.emit). start is an offset in
+        seconds to begin the session from. Raises ValueError if the steps
+        do not compile.
+        """
+        self.timeline = Timeline(steps, cycles)
+        self.cycles = cycles
+        self.start = start
+        self.clock = clock or MonotonicClock()
+        self.events = events
+        # Called with the name of each command run from a key press
+        self.on_command: Callable[[str], Any] | None = None
+        self.completed_cycles = 0
+        self.breathing_seconds = 0.0
+        self.paused = False
+        self.stopped = False
+        self.keyboard = False
+        self.status = "ready"
+        self.started_at = 0
+        # Phase, seconds counted in it and when the clock last started, as
+        # one tuple so the render thread never sees half an update
+        first = self.timeline.locate(start) or self.timeline.locate(0)
+        self._position: tuple[TimedPhase, float, float | None] = (first, 0.0, None)
+        self._skip = False
+        self._wake: asyncio.Event | None = None
+
+    def _emit(self, event: str, payload: dict[str, Any]) -> None:
+        """Hand a lifecycle event to the listener, if any."""
+        if self.events is not None:
+            self.events(event, payload)
+
+    def _notify(self) -> None:
+        """Wake the timing loop so it sees a command."""
+        if self._wake is not None:
+            self._wake.set()
+
+    def pause(self) -> None:
+        """Stop counting time until resume()."""
+        self.paused = True
+        self._notify()
+
+    def resume(self) -> None:
+        """Continue a paused session."""
+        self.paused = False
+        self._notify()
+
+    def skip(self) -> None:
+        """End the current phase now."""
+        self._skip = True
+        self._notify()
+
+    def stop(self) -> None:
+        """End the session now, keeping the time breathed so far."""
+        self.stopped = True
+        self._notify()
+
+    def handle_key(self, key: str) -> None:
+        """Run the command bound to a key, ignoring other keys."""
+        command = KEYS.get(key.lower())
+        if command is not None:
+            getattr(self, command)()
+            if self.on_command is not None:
+                self.on_command(command)
+
+    def _elapsed(self, position: tuple[TimedPhase, float, float | None]) -> float:
+        """Return the seconds spent in the phase of a position."""
+        _, elapsed, running_since = position
+        if running_since is None:
+            return elapsed
+        return elapsed + self.clock.now() - running_since
+
+    def offset(self) -> float:
+        """Return where the session is on its timeline, in seconds."""
+        position = self._position
+        return position[0].start + min(self._elapsed(position), position[0].duration)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return what the renderer needs to draw the current state."""
+        position = self._position
+        phase = position[0]
+        return {
+            "cycle": phase.cycle,
+            "cycles": self.cycles,
+            "phase": phase.index,
+            "message": phase.message,
+            "duration": phase.duration,
+            "elapsed": min(self._elapsed(position), phase.duration),
+            "paused": self.paused,
+            "keyboard": self.keyboard,
+        }
+
+    def summary(self) -> dict[str, Any]:
+        """Return the session as it should be recorded."""
+        return {
+            "cycles": self.completed_cycles,
+            "duration_seconds": round(self.breathing_seconds),
+            "started_at": self.started_at,
+            "ended_at": int(time.time()),
+            "status": self.status,
+        }
+
+    async def _time_phase(self, phase: TimedPhase, skipped: float = 0.0) -> None:
+        """Wait until the phase has run for its duration, or is skipped.
+
+        skipped is the part of the phase that lies before the start offset.
+        """
+        duration = phase.duration
+        elapsed = skipped
+        self._position = (phase, elapsed, None)
+        try:
+            while elapsed < duration and not self._skip and not self.stopped:
+                self._wake.clear()
+                if self.paused:
+                    await self.clock.wait(self._wake, None)
+                    continue
+                self._position = (phase, elapsed, self.clock.now())
+                try:
+                    await self.clock.wait(self._wake, duration - elapsed)
+                finally:
+                    elapsed = min(self._elapsed(self._position), duration)
+                    self._position = (phase, elapsed, None)
+        finally:
+            # Also reached on cancellation, so a partial phase still counts
+            self.breathing_seconds += elapsed - skipped
+            self._skip = False
+
+    def _complete_cycle(self, cycle: int) -> None:
+        """Count a cycle that ended during this run."""
+        self.completed_cycles += 1
+        self._emit(
+            "cycle_complete",
+            {"cycle": cycle + 1, "duration_seconds": round(self.breathing_seconds)},
+        )
+
+    async def _time_session(self) -> None:
+        """Go through the phases of the timeline, generated as they come."""
+        previous = None
+        for phase in self.timeline.phases(self.start):
+            if previous is not None and phase.cycle != previous.cycle:
+                self._complete_cycle(previous.cycle)
+            self._emit(
+                "phase_change",
+                {
+                    "cycle": phase.cycle + 1,
+                    "phase": phase.index + 1,
+                    "message": phase_label(phase.message).plain,
+                    "duration": phase.duration,
+                    # Breathed so far, as in cycle_complete
+                    "duration_seconds": round(self.breathing_seconds),
+                },
+            )
+            skipped = max(self.start - phase.start, 0.0) if previous is None else 0.0
+            await self._time_phase(phase, skipped)
+            if self.stopped:
+                return
+            previous = phase
+        if previous is not None:
+            self._complete_cycle(previous.cycle)
+
+    async def _persist(
+        self, queue: asyncio.Queue, record: Callable[[dict[str, Any]], Any]
+    ) -> None:
+        """Save what the timing loop hands over, off the event loop."""
+        while (item := await queue.get()) is not None:
+            await asyncio.to_thread(record, item)
+
+    async def run(
+        self,
+        renderer: Any = None,
+        record: Callable[[dict[str, Any]], Any] | None = None,
+        keyboard: bool = False,
+    ) -> dict[str, Any]:
+        """Run the session and return its summary.
+
+        If the task is cancelled (Ctrl+C), the time breathed so far is still
+        recorded before the cancellation goes on.
+        """
+        self._wake = asyncio.Event()
+        self.started_at = int(time.time())
+        self.status = "running"
+        done = threading.Event()
+        queue: asyncio.Queue = asyncio.Queue()
+        persist = render = None
+        if record is not None:
+            persist = asyncio.create_task(self._persist(queue, record))
+        with keyboard_commands(self) if keyboard else contextlib.nullcontext():
+            if renderer is not None:
+                render = asyncio.create_task(
+                    asyncio.to_thread(render_loop, renderer, self.snapshot, done)
+                )
+            try:
+                self._emit("session_start", {"cycles": self.cycles})
+                await self._time_session()
+                self.status = "stopped" if self.stopped else "finished"
+            except asyncio.CancelledError:
+                self.status = "cancelled"
+                raise
+            finally:
+                done.set()
+                self._emit("session_complete", self.summary())
+                # Let the last frame finish so messages from saving go below it
+                if render is not None:
+                    await render
+                # Less than a second breathed is not worth a session
+                if self.breathing_seconds >= 1:
+                    queue.put_nowait(self.summary())
+                queue.put_nowait(None)
+                if persist is not None:
+                    await persist
+        return self.summary()
+
+
+def render_loop(
+    renderer: Any, snapshot: Callable[[], dict[str, Any]], done: threading.Event
+) -> None:
+    """Redraw snapshots until done is set.
+
+    This runs in its own thread for the whole session: a slow terminal
+    only blocks it, never the timing, and a frame costs no event loop
+    round trip.
+    """
+    # The renderer sets its own pace, slower on a slow terminal
+    renderer.draw(snapshot())
+    while not done.wait(getattr(renderer, "interval", RENDER_INTERVAL)):
+        renderer.draw(snapshot())
+    renderer.draw(snapshot())
+    renderer.close()
+
+
+@contextlib.contextmanager
+def keyboard_commands(engine: SessionEngine):
+    """Send key presses on the terminal to the engine while in the block."""
+    if termios is None or not sys.stdin.isatty():
+        yield
+        return
+    fd = sys.stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    loop = asyncio.get_running_loop()
+
+    def on_input() -> None:
+        for key in os.read(fd, 32).decode(errors="ignore"):
+            engine.handle_key(key)
+
+    # Keys arrive without Enter and are not echoed; Ctrl+C still interrupts
+    tty.setcbreak(fd)
+    loop.add_reader(fd, on_input)
+    engine.keyboard = True
+    try:
+        yield
+    finally:
+        loop.remove_reader(fd)
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
@@ -0,0 +1,333 @@
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import reduce
+from pathlib import Path
+from typing import Any
+from .merge import current_streak, longest_streak
+from .metrics import write_textfile
+from .prompt import PROMPT_FILE
+from .retention import archive_daily, archive_dates, archive_totals
+from .sketch import add_to_pattern_stats, merge_pattern_stats
+from .stats import (
+    LOCK_FILE,
+    add_to_time_rollups,
+    dump_fields,
+    dump_stats,
+    empty_time_rollups,
+    fill_timestamps,
+)
+from .storage import FileStorage
+
+
+# How dump_stats lays out the sessions array, one session per line
+SESSIONS_OPEN = b',\n  "sessions": [\n'
+FILE_TAIL = b"\n  ]\n}\n"
+# Bytes read at a time while looking for the sessions array or copying it
+BLOCK_SIZE = 1 << 20
+# Bytes of session lines decoded at once, which bounds memory per worker
+CHUNK_SIZE = 8 << 20
+
+
+def _empty_partial() -> dict[str, Any]:
+    """Return the neutral element of the combine step."""
+    return {
+        "total_sessions": 0,
+        "total_time_seconds": 0,
+        "patterns_used": {},
+        "daily": {},
+        "rollups": empty_time_rollups(),
+        "pattern_stats": {},
+        "invalid": 0,
+    }
+
+
+def summarize_sessions(partial: dict[str, Any], sessions: list[Any]) -> None:
+    """Add sessions to a partial, counting the ones that cannot be used."""
+    daily = partial["daily"]
+    patterns_used = partial["patterns_used"]
+    for session in sessions:
+        try:
+            date = session["date"]
+            pattern = session["pattern"]
+            duration = int(session["duration_seconds"])
+            cycles = int(session.get("cycles", 0))
+            fill_timestamps(session)
+            add_to_time_rollups(partial["rollups"], session)
+        except (KeyError, TypeError, ValueError, OverflowError, OSError):
+            partial["invalid"] += 1
+            continue
+        daily[date] = daily.get(date, 0) + 1
+        patterns_used[pattern] = patterns_used.get(pattern, 0) + 1
+        partial["total_time_seconds"] += duration
+        partial["total_sessions"] += 1
+        add_to_pattern_stats(
+            partial["pattern_stats"],
+            {"pattern": pattern, "duration_seconds": duration, "cycles": cycles},
+        )
+
+
+def summarize_range(path: Path, start: int, end: int) -> dict[str, Any]:
+    """Map step: summarize the session lines that begin in [start, end)."""
+    partial = _empty_partial()
+    with open(path, "rb") as f:
+        # Move to the first line that begins at or after start
+        f.seek(start - 1)
+        f.readline()
+        position = f.tell()
+        if position >= end:
+            return partial
+        chunk = f.read(end - position)
+        if not chunk.endswith(b"\n"):
+            chunk += f.readline()
+
+    lines = chunk.rstrip().rstrip(b",")
+    try:
+        # Decoding the whole chunk as one array is much faster than line by line
+        sessions = json.loads(b"[" + lines + b"]")
+    except ValueError:
+        sessions = []
+        for line in lines.split(b"\n"):
+            try:
+                sessions.append(json.loads(line.strip().rstrip(b",")))
+            except ValueError:
+                partial["invalid"] += 1
+    summarize_sessions(partial, sessions)
+    return partial
+
+
+def combine(left: dict[str, Any], right: dict[str, Any]) -> dict[str, Any]:
+    """Reduce step: merge two partials into a new one."""
+    merged = _empty_partial()
+    for partial in (left, right):
+        for key in ("total_sessions", "total_time_seconds", "invalid"):
+            merged[key] += partial[key]
+        for key in ("patterns_used", "daily"):
+            for name, count in partial[key].items():
+                merged[key][name] = merged[key].get(name, 0) + count
+        for key, counts in partial["rollups"].items():
+            merged["rollups"][key] = [
+                a + b for a, b in zip(merged["rollups"][key], counts)
+            ]
+        merge_pattern_stats(merged["pattern_stats"], partial["pattern_stats"])
+    return merged
+
+
+def _summarize_ranges(path: Path, ranges: list[tuple[int, int]]) -> dict[str, Any]:
+    """Summarize several ranges in one worker to keep IPC small."""
+    return reduce(
+        combine,
+        (summarize_range(path, start, end) for start, end in ranges),
+        _empty_partial(),
+    )
+
+
+def archive_partial(archive: dict[str, Any]) -> dict[str, Any]:
+    """Turn the archive of compacted sessions into a partial."""
+    partial = _empty_partial() | archive_totals(archive)
+    # Month records only know which days were active, not how many sessions
+    partial["daily"] = dict.fromkeys(archive_dates(archive), 0) | archive_daily(archive)
+    partial["rollups"] = {
+        key: list(counts) for key, counts in archive["rollups"].items()
+    }
+    # Archives written before pattern stats existed have none
+    merge_pattern_stats(partial["pattern_stats"], archive.get("pattern_stats", {}))
+    return partial
+
+
+def _describe(stored: Any, expected: Any) -> str:
+    """Describe how a stored value differs from the recomputed one."""
+    if isinstance(stored, list) and isinstance(expected, list):
+        if len(stored) != len(expected):
+            return f"{len(stored)} buckets stored, {len(expected)} expected"
+        differing = sum(1 for a, b in zip(stored, expected) if a != b)
+        return f"{differing} of {len(expected)} buckets differ"
+    if isinstance(stored, dict) and isinstance(expected, dict):
+        return "differs from the sessions"
+    if stored is None:
+        return f"missing, {expected} in sessions"
+    if expected is None:
+        return f"{stored} stored, none in sessions"
+    return f"{stored} stored, {expected} in sessions"
+
+
+class StatsChecker:
+    """Check the aggregates of a stats file against its raw sessions.
+
+    Files written by dump_stats keep one session per line after the
+    aggregates, so the sessions are split into byte ranges that worker
+    processes decode and summarize on their own. A repair rewrites the
+    aggregates and copies the session lines untouched.
+    """
+
+    def __init__(self, stats_file: Path, storage: FileStorage | None = None):
+        """Initialize the checker for a stats file."""
+        self.stats_file = stats_file
+        # Holds the lock every save of the stats file takes
+        self.storage = storage or FileStorage(stats_file.parent)
+        self.fields: dict[str, Any] = {}
+        self.partial = _empty_partial()
+        self.body: tuple[int, int] | None = None
+        self._stamp: tuple[int, int] | None = None
+
+    def _find_body(self) -> tuple[dict[str, Any], tuple[int, int]] | None:
+        """Return the aggregates and the byte range of the session lines.
+
+        Returns None if the file is not laid out by dump_stats.
+        """
+        size = os.path.getsize(self.stats_file)
+        with open(self.stats_file, "rb") as f:
+            f.seek(max(size - len(FILE_TAIL), 0))
+            if f.read() != FILE_TAIL:
+                return None
+            f.seek(0)
+            # The aggregates come first; an archive can make them span blocks
+            head = b""
+            position = -1
+            while position < 0:
+                block = f.read(BLOCK_SIZE)
+                if not block:
+                    return None
+                search_from = max(len(head) - len(SESSIONS_OPEN), 0)
+                head += block
+                position = head.find(SESSIONS_OPEN, search_from)
+        try:
+            fields = json.loads(head[:position] + b"\n}")
+        except ValueError:
+            return None
+        start = position + len(SESSIONS_OPEN)
+        return fields, (start, size - len(FILE_TAIL))
+
+    def scan(self, workers: int = 0) -> None:
+        """Recompute the aggregates from the sessions."""
+        stat = os.stat(self.stats_file)
+        self._stamp = (stat.st_size, stat.st_mtime_ns)
+        layout = self._find_body()
+        if layout is None:
+            # Older or hand-edited files are loaded whole and checked in one pass
+            with open(self.stats_file, "r") as f:
+                data = json.load(f)
+            sessions = data.pop("sessions")
+            self.fields, self.body = data, None
+            self.partial = _empty_partial()
+            summarize_sessions(self.partial, sessions)
+            return
+
+        self.fields, self.body = layout
+        start, end = self.body
+        workers = workers or os.cpu_count() or 1
+        # A few chunks per worker keeps the pool busy until the end
+        step = max(min((end - start) // (workers * 4), CHUNK_SIZE), 1)
+        ranges = [(i, min(i + step, end)) for i in range(start, end, step)]
+        if workers == 1 or len(ranges) < 2:
+            self.partial = _summarize_ranges(self.stats_file, ranges)
+            return
+        batches = [ranges[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = executor.map(
+                _summarize_ranges, [self.stats_file] * len(batches), batches
+            )
+            self.partial = reduce(combine, partials, _empty_partial())
+
+    def expected_fields(self) -> dict[str, Any]:
+        """Return the aggregates as they should be, given the sessions."""
+        partial = self.partial
+        if "archive" in self.fields:
+            # Compacted sessions still count in every aggregate
+            partial = combine(partial, archive_partial(self.fields["archive"]))
+        dates = set(partial["daily"])
+        # Keep patterns listed with zero sessions, like the default stats do
+        patterns_used = dict.fromkeys(self.fields.get("patterns_used", {}), 0)
+        patterns_used.update(partial["patterns_used"])
+        # The current streak is computed on the day the file is saved, which
+        # is not recorded: it is the run ending on the last active day, or 0
+        # if the file was saved on a later day
+        last_day = max(dates, default=None)
+        current = current_streak(dates, last_day) if last_day else 0
+        stored = self.fields.get("streaks")
+        today = datetime.now().strftime("%Y-%m-%d")
+        saved_later = last_day is not None and last_day < today
+        if saved_later and isinstance(stored, dict) and stored.get("current") == 0:
+            current = 0
+        return {
+            "total_sessions": partial["total_sessions"],
+            "total_time_seconds": partial["total_time_seconds"],
+            "patterns_used": patterns_used,
+            "streaks": {
+                "current": current,
+                "longest": longest_streak(dates),
+            },
+            "rollups": partial["rollups"],
+            "pattern_stats": partial["pattern_stats"],
+        }
+
+    def find_mismatches(self) -> list[str]:
+        """List every stored aggregate that differs from the sessions."""
+        mismatches = []
+        for key, expected in self.expected_fields().items():
+            if key not in self.fields:
+                mismatches.append(f"{key}: missing")
+                continue
+            stored = self.fields[key]
+            if not (isinstance(stored, dict) and isinstance(expected, dict)):
+                if stored != expected:
+                    mismatches.append(f"{key}: {_describe(stored, expected)}")
+                continue
+            for name in sorted(stored.keys() | expected.keys()):
+                if stored.get(name) != expected.get(name):
+                    description = _describe(stored.get(name), expected.get(name))
+                    mismatches.append(f"{key}.{name}: {description}")
+        return mismatches
+
+    def repair(self) -> bool:
+        """Rewrite the aggregates atomically, return False if the file changed.
+
+        The stats lock is held from the check to the replacement, so that no
+        session can be saved in between and then lost.
+        """
+        with self.storage.lock(LOCK_FILE):
+            stat = os.stat(self.stats_file)
+            if (stat.st_size, stat.st_mtime_ns) != self._stamp:
+                return False
+            self._rewrite()
+            self._drop_prompt_summary()
+        return True
+
+    def _rewrite(self) -> None:
+        """Replace the stats file with the expected aggregates."""
+        fields = self.fields | self.expected_fields()
+
+        if self.body is None:
+            with open(self.stats_file, "r") as f:
+                data = json.load(f)
+            data.update(fields)
+            write_textfile(self.stats_file, dump_stats(data))
+            return
+
+        start, end = self.body
+        header = "{\n" + ",\n".join(dump_fields(fields))
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.stats_file.parent, prefix=f".{self.stats_file.name}."
+        )
+        try:
+            with os.fdopen(fd, "wb") as out, open(self.stats_file, "rb") as f:
+                out.write(header.encode() + SESSIONS_OPEN)
+                f.seek(start)
+                remaining = end - start
+                while remaining > 0:
+                    block = f.read(min(remaining, BLOCK_SIZE))
+                    if not block:
+                        raise OSError("stats file was truncated during repair")
+                    out.write(block)
+                    remaining -= len(block)
+                out.write(FILE_TAIL)
+            os.replace(tmp_path, self.stats_file)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+
+    def _drop_prompt_summary(self) -> None:
+        """Remove the prompt summary, recomputed from the repaired file later."""
+        (self.stats_file.parent / PROMPT_FILE).unlink(missing_ok=True)
@@ -0,0 +1,260 @@
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+from .engine import SessionEngine, render_loop
+
+
+GROUP_SOCKET = "group.sock"
+# Seconds between two ticks, which correct the drift of the clients
+TICK_INTERVAL = 1.0
+# Bytes a client may leave unread before it is dropped
+MAX_CLIENT_BUFFER = 64 * 1024
+# Seconds given to the clients to read the last events
+CLOSE_TIMEOUT = 2.0
+
+
+def parse_address(address: str) -> tuple[str, Any]:
+    """Return ("tcp", (host, port)) for host:port, ("unix", path) otherwise."""
+    host, _, port = address.rpartition(":")
+    if port.isdigit() and "/" not in address:
+        return "tcp", (host or "127.0.0.1", int(port))
+    return "unix", Path(address).expanduser()
+
+
+class GroupHost:
+    """Run one session and broadcast its progress to every joined terminal.
+
+    The host engine is the only timer. Each event and a tick every second
+    go out as one JSON line, encoded once and written to every client
+    without waiting for it, so a client that stops reading only loses its
+    own connection.
+    """
+
+    def __init__(self, engine: SessionEngine, pattern: str):
+        """Initialize the host around the engine of the shared session."""
+        self.engine = engine
+        self.pattern = pattern
+        self.clients: set[asyncio.StreamWriter] = set()
+        self.dropped = 0
+        self.broadcasts = 0
+        # Lifecycle events still go to whoever listened before (hooks)
+        self._forward = engine.events
+        engine.events = self._on_event
+        engine.on_command = lambda command: self._defer("tick", {})
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _breathed(self) -> float:
+        """Return the seconds breathed so far, the current phase included."""
+        seconds = self.engine.breathing_seconds
+        if self.engine.status == "running":
+            seconds += self.engine.snapshot()["elapsed"]
+        return seconds
+
+    def message(self, event: str, payload: dict[str, Any]) -> bytes:
+        """Encode an event with the state a client needs to draw it."""
+        return (
+            json.dumps(
+                {
+                    "event": event,
+                    "pattern": self.pattern,
+                    "status": self.engine.status,
+                    "frame": self.engine.snapshot(),
+                    "breathed": self._breathed(),
+                    "time": time.time(),
+                    **payload,
+                }
+            )
+            + "\n"
+        ).encode()
+
+    def broadcast(self, event: str, payload: dict[str, Any]) -> None:
+        """Send an event to every client, dropping the ones that lag behind."""
+        line = self.message(event, payload)
+        self.broadcasts += 1
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                self.dropped += 1
+                self.clients.discard(writer)
+                writer.transport.abort()
+            else:
+                writer.write(line)
+
+    def _defer(self, event: str, payload: dict[str, Any]) -> None:
+        """Broadcast once the engine has moved to the state of the event."""
+        # phase_change is emitted just before the engine enters the phase
+        if self._loop is not None:
+            self._loop.call_soon(self.broadcast, event, payload)
+
+    def _on_event(self, event: str, payload: dict[str, Any]) -> None:
+        """Broadcast a lifecycle event and pass it on."""
+        self._defer(event, payload)
+        if self._forward is not None:
+            self._forward(event, payload)
+
+    async def _accept(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Greet a client, then keep it until it leaves."""
+        writer.write(self.message("hello", {}))
+        self.clients.add(writer)
+        try:
+            # Clients send nothing: this only returns once they are gone
+            await reader.read()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    async def _tick(self) -> None:
+        """Broadcast the state at a steady pace."""
+        while True:
+            await asyncio.sleep(TICK_INTERVAL)
+            self.broadcast("tick", {})
+
+    async def run(
+        self,
+        address: str,
+        renderer: Any = None,
+        record: Callable[[dict[str, Any]], Any] | None = None,
+        keyboard: bool = False,
+        start: Callable[[], Any] | None = None,
+    ) -> dict[str, Any]:
+        """Listen on the address, run the session and return its summary.
+
+        start, if given, is called in a thread before the session begins
+        (to wait for the participants) while clients can already join.
+        """
+        self._loop = asyncio.get_running_loop()
+        kind, target = parse_address(address)
+        if kind == "tcp":
+            server = await asyncio.start_server(self._accept, *target)
+        else:
+            # A socket left by a host that crashed
+            target.unlink(missing_ok=True)
+            server = await asyncio.start_unix_server(self._accept, target)
+        ticker = None
+        try:
+            if start is not None:
+                await asyncio.to_thread(start)
+            ticker = asyncio.create_task(self._tick())
+            return await self.engine.run(renderer, record, keyboard)
+        finally:
+            if ticker is not None:
+                ticker.cancel()
+            server.close()
+            # Deferred broadcasts of the last events go out first
+            await asyncio.sleep(0)
+            closing = []
+            for writer in list(self.clients):
+                writer.close()
+                closing.append(asyncio.ensure_future(writer.wait_closed()))
+            if closing:
+                await asyncio.wait(closing, timeout=CLOSE_TIMEOUT)
+            if kind == "unix":
+                target.unlink(missing_ok=True)
+
+
+async def connect(
+    address: str,
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Open a connection to a host."""
+    kind, target = parse_address(address)
+    if kind == "tcp":
+        return await asyncio.open_connection(*target)
+    return await asyncio.open_unix_connection(target)
+
+
+class GroupClient:
+    """Follow a hosted session and draw it locally.
+
+    The client keeps no timer of its own: between two messages it moves
+    the last frame on by the time since it arrived, and each message puts
+    it back in step with the host.
+    """
+
+    def __init__(self):
+        """Initialize a client that has not heard from a host yet."""
+        self.pattern: str | None = None
+        # Last frame and when it arrived, as one tuple for the render thread
+        self._state: tuple[dict[str, Any], float] | None = None
+        self.completed_cycles = 0
+        self.joined_breathed: float | None = None
+        self.breathed = 0.0
+        self.started_at = 0
+        self.started = False
+        self.finished = False
+        # Lines from the host that could not be read
+        self.skipped = 0
+
+    def receive(self, message: dict[str, Any]) -> None:
+        """Update the state from a message of the host."""
+        self.pattern = message["pattern"]
+        self._state = (message["frame"], time.monotonic())
+        if message["status"] == "running":
+            if self.joined_breathed is None:
+                self.joined_breathed = message["breathed"]
+                self.started_at = int(time.time())
+            self.breathed = message["breathed"]
+            self.started = True
+        if message["event"] == "cycle_complete":
+            self.completed_cycles += 1
+        elif message["event"] == "session_complete":
+            self.breathed = message["duration_seconds"]
+            self.finished = True
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the last frame, moved on to now unless the host paused."""
+        last, received_at = self._state
+        frame = dict(last)
+        if not frame["paused"] and not self.finished:
+            moved = frame["elapsed"] + time.monotonic() - received_at
+            frame["elapsed"] = min(moved, frame["duration"])
+        return frame
+
+    def session(self) -> dict[str, Any]:
+        """Return the part of the session breathed here, as it is recorded."""
+        return {
+            "cycles": self.completed_cycles,
+            "duration_seconds": round(self.breathed - (self.joined_breathed or 0)),
+            "started_at": self.started_at,
+            "ended_at": int(time.time()),
+            "status": "finished" if self.finished else "left",
+        }
+
+    async def run(
+        self,
+        address: str,
+        renderer: Any = None,
+        on_hello: Callable[[dict[str, Any]], Any] | None = None,
+    ) -> dict[str, Any]:
+        """Follow the session until it ends or the host goes away."""
+        reader, writer = await connect(address)
+        done = threading.Event()
+        render = None
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                    self.receive(message)
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    # The next message puts the client back in step anyway
+                    self.skipped += 1
+                    continue
+                if message["event"] == "hello" and on_hello is not None:
+                    on_hello(message)
+                if render is None and renderer is not None and self.started:
+                    render = asyncio.create_task(
+                        asyncio.to_thread(render_loop, renderer, self.snapshot, done)
+                    )
+                if self.finished:
+                    break
+        finally:
+            done.set()
+            if render is not None:
+                await render
+            writer.close()
+        return self.session()
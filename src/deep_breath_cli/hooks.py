@@ -0,0 +1,161 @@
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import Any, Callable
+from . import profiling
+from .metrics import LATENCY_BUCKETS, Histogram
+
+
+EVENTS = ("session_start", "phase_change", "cycle_complete", "session_complete")
+HOOKS_FILE = "hooks.json"
+# Python hooks are registered under this entry point group
+ENTRY_POINT_GROUP = "deep_breath_cli.hooks"
+# Events waiting per hook; past that, new events are dropped for that hook
+QUEUE_SIZE = 64
+# Seconds a shell hook may run, and that close() waits for pending events
+HOOK_TIMEOUT = 10.0
+
+
+def run_command(command: str, event: str, payload: dict[str, Any]) -> None:
+    """Run a shell hook with the event in $BREATH_EVENT and JSON on stdin."""
+    subprocess.run(
+        command,
+        shell=True,
+        input=json.dumps(payload),
+        text=True,
+        env=dict(os.environ, BREATH_EVENT=event),
+        stdout=subprocess.DEVNULL,
+        timeout=HOOK_TIMEOUT,
+        check=True,
+    )
+
+
+class Hook:
+    """A callable subscribed to some events (all of them if events is None)."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[str, dict[str, Any]], Any],
+        events: set[str] | None = None,
+    ):
+        """Initialize the hook with a name used in reports."""
+        self.name = name
+        self.func = func
+        self.events = events
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.failures = 0
+        self.dropped = 0
+        self.queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.thread: threading.Thread | None = None
+
+    def wants(self, event: str) -> bool:
+        """Return True if the hook subscribed to the event."""
+        return self.events is None or event in self.events
+
+
+def load_hooks(config_dir: Path) -> list[Hook]:
+    """Load shell hooks from hooks.json and Python hooks from entry points.
+
+    hooks.json maps an event name to a list of shell commands. An entry
+    point must be a callable taking the event name and its payload, and
+    receives every event.
+    """
+    hooks = []
+    hooks_file = config_dir / HOOKS_FILE
+    if hooks_file.exists():
+        try:
+            with open(hooks_file, "r") as f:
+                config = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error loading hooks file: {e}")
+            config = {}
+        if not isinstance(config, dict):
+            print("Ignoring hooks file: expected an object of event names")
+            config = {}
+        for event, commands in config.items():
+            if event not in EVENTS:
+                print(f"Unknown hook event '{event}', expected one of: {EVENTS}")
+                continue
+            if not isinstance(commands, list):
+                print(f"Ignoring hooks of '{event}': expected a list of commands")
+                continue
+            for command in commands:
+                if not isinstance(command, str):
+                    print(f"Ignoring hook of '{event}': {command!r} is not a command")
+                    continue
+                hooks.append(
+                    Hook(
+                        command,
+                        lambda e, p, command=command: run_command(command, e, p),
+                        {event},
+                    )
+                )
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            hooks.append(Hook(entry_point.name, entry_point.load()))
+        except Exception as e:
+            print(f"Error loading hook '{entry_point.name}': {e}")
+    return hooks
+
+
+class EventBus:
+    """Deliver session events to hooks without blocking the emitter.
+
+    Each hook has its own bounded queue and worker thread, so a slow hook
+    only delays (and eventually drops) its own events, in order, while
+    emit() returns at once. Every call is timed per hook.
+    """
+
+    def __init__(self, hooks: list[Hook], context: dict[str, Any] | None = None):
+        """Initialize the bus with hooks and fields added to every payload."""
+        self.hooks = hooks
+        self.context = context or {}
+        for hook in hooks:
+            hook.thread = threading.Thread(
+                target=self._work, args=(hook,), name=f"hook {hook.name}", daemon=True
+            )
+            hook.thread.start()
+
+    def emit(self, event: str, payload: dict[str, Any]) -> None:
+        """Queue an event for every hook subscribed to it."""
+        payload = self.context | payload | {"event": event, "time": time.time()}
+        for hook in self.hooks:
+            if not hook.wants(event):
+                continue
+            try:
+                hook.queue.put_nowait((event, payload))
+            except queue.Full:
+                hook.dropped += 1
+
+    def _work(self, hook: Hook) -> None:
+        """Run a hook on its queued events until close()."""
+        while (item := hook.queue.get()) is not None:
+            event, payload = item
+            start = time.perf_counter()
+            try:
+                with profiling.span(f"hook {hook.name}"):
+                    hook.func(event, payload)
+            except Exception as e:
+                hook.failures += 1
+                print(f"Error in hook '{hook.name}' ({event}): {e}")
+            finally:
+                hook.latency.observe(time.perf_counter() - start)
+
+    def close(self, timeout: float = HOOK_TIMEOUT) -> None:
+        """Let the hooks finish their queued events, waiting at most timeout."""
+        deadline = time.monotonic() + timeout
+        for hook in self.hooks:
+            try:
+                hook.queue.put(None, timeout=max(deadline - time.monotonic(), 0))
+            except queue.Full:
+                # The thread is a daemon, it will not keep the CLI alive
+                continue
+        for hook in self.hooks:
+            hook.thread.join(max(deadline - time.monotonic(), 0))
@@ -0,0 +1,141 @@
+import csv
+import gzip
+import json
+from functools import cache
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Iterator
+from .index import assign_ids
+from .loader import SessionStream
+
+
+BATCH_SIZE = 10_000
+FORMATS = ("json", "csv", "ndjson")
+
+# CSV headers written by export-stats, mapped to session keys
+CSV_COLUMNS = {
+    "Date": "date",
+    "Pattern": "pattern",
+    "Cycles": "cycles",
+    "Duration (seconds)": "duration_seconds",
+    "Start": "start",
+    "End": "end",
+    "Id": "id",
+}
+
+
+def detect_format(path: Path) -> str:
+    """Guess the import format from the file name, ignoring a .gz suffix."""
+    suffixes = [suffix.lower() for suffix in path.suffixes]
+    if suffixes and suffixes[-1] == ".gz":
+        suffixes = suffixes[:-1]
+    suffix = suffixes[-1].lstrip(".") if suffixes else ""
+    if suffix == "jsonl":
+        return "ndjson"
+    return suffix
+
+
+def _open_text(path: Path) -> IO[str]:
+    """Open a plain or gzip-compressed text file."""
+    if path.suffix.lower() == ".gz":
+        return gzip.open(path, "rt", newline="")
+    return open(path, "r", newline="")
+
+
+@cache
+def _is_valid_date(value: str) -> bool:
+    """Check a YYYY-MM-DD date, cached because imports repeat the same days."""
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return False
+    return True
+
+
+def validate_session(raw: dict[str, Any]) -> dict[str, Any] | None:
+    """Return a clean session dict, or None if the row is not a valid session."""
+    try:
+        session = {
+            "date": str(raw["date"]),
+            "pattern": str(raw["pattern"]),
+            "cycles": int(raw["cycles"]),
+            "duration_seconds": int(raw["duration_seconds"]),
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not session["pattern"] or not _is_valid_date(session["date"]):
+        return None
+    if session["cycles"] < 1 or session["duration_seconds"] < 0:
+        return None
+    if raw.get("id"):
+        session["id"] = str(raw["id"])
+    try:
+        start, end = int(raw["start"]), int(raw["end"])
+    except (KeyError, TypeError, ValueError):
+        return session
+    session["start"], session["end"] = start, end
+    if raw.get("approximate"):
+        session["approximate"] = True
+    return session
+
+
+class SessionReader:
+    """Stream sessions out of an exported file in validated batches."""
+
+    def __init__(self, path: Path, format: str = ""):
+        """Initialize the reader, detecting the format if none is given."""
+        self.path = path
+        self.format = format or detect_format(path)
+        if self.format not in FORMATS:
+            raise ValueError(
+                f"Unsupported format '{self.format}'. Use json, csv or ndjson."
+            )
+        self.invalid_rows = 0
+        self.errors: list[str] = []
+        self._occurrences: dict[tuple, int] = {}
+
+    def _rows(self, f: IO[str]) -> Iterator[tuple[int, Any]]:
+        """Yield (row number, raw row) pairs for the detected format."""
+        if self.format == "json":
+            # Stream the sessions array instead of loading the whole export
+            stream = SessionStream(f)
+            yield from enumerate(stream, 1)
+            if stream.error:
+                self.errors.append(f"Stopped reading: {stream.error}")
+        elif self.format == "ndjson":
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_number, None
+        else:
+            header = f.readline()
+            delimiter = ";" if ";" in header else ","
+            columns = [
+                CSV_COLUMNS.get(name.strip(), name.strip())
+                for name in next(csv.reader([header], delimiter=delimiter))
+            ]
+            for line_number, row in enumerate(csv.reader(f, delimiter=delimiter), 2):
+                yield line_number, dict(zip(columns, row))
+
+    def batches(self, batch_size: int = BATCH_SIZE) -> Iterator[list[dict[str, Any]]]:
+        """Yield lists of valid sessions with ids, counting the rows skipped."""
+        batch: list[dict[str, Any]] = []
+        with _open_text(self.path) as f:
+            for row_number, raw in self._rows(f):
+                session = validate_session(raw) if isinstance(raw, dict) else None
+                if session is None:
+                    self.invalid_rows += 1
+                    if len(self.errors) < 10:
+                        self.errors.append(f"Row {row_number}: invalid session")
+                    continue
+                batch.append(session)
+                if len(batch) >= batch_size:
+                    assign_ids(batch, self._occurrences)
+                    yield batch
+                    batch = []
+        if batch:
+            assign_ids(batch, self._occurrences)
+            yield batch
@@ -0,0 +1,158 @@
+import hashlib
+from datetime import datetime
+from functools import cache
+from pathlib import Path
+from typing import Any, Iterable
+from .storage import FileStorage
+
+
+DIGEST_SIZE = 8
+
+
+def session_id(session: dict[str, Any], timestamp: int, occurrence: int = 0) -> str:
+    """Build a stable session id from a timestamp and a content hash."""
+    content = (
+        f"{session['date']}|{session['pattern']}|{session['cycles']}|"
+        f"{session['duration_seconds']}|{timestamp}|{occurrence}"
+    )
+    content_hash = hashlib.blake2b(content.encode(), digest_size=DIGEST_SIZE)
+    return f"{timestamp}-{content_hash.hexdigest()}"
+
+
+# Unbounded: a long history shuffled across machines revisits every day
+@cache
+def day_timestamp(date: str) -> int:
+    """Return the epoch time of the start of a day, cached for bulk imports."""
+    return int(datetime.strptime(date, "%Y-%m-%d").timestamp())
+
+
+def new_session_id(session: dict[str, Any]) -> str:
+    """Build the id of a session from its start time."""
+    return session_id(session, session["start"])
+
+
+def assign_ids(
+    sessions: Iterable[dict[str, Any]], occurrences: dict[tuple, int] | None = None
+) -> int:
+    """Give an id to every session that lacks one, return how many were set.
+
+    Legacy sessions only know their date, so the timestamp is the start of
+    that day and identical sessions on the same day are told apart by their
+    position among each other. Running this twice on the same data (or on
+    the same exported file) always yields the same ids. Pass the same
+    occurrences dict to keep counting across batches of one file.
+    """
+    if occurrences is None:
+        occurrences = {}
+    assigned = 0
+    for session in sessions:
+        if "id" in session:
+            continue
+        key = (
+            session["date"],
+            session["pattern"],
+            session["cycles"],
+            session["duration_seconds"],
+        )
+        occurrence = occurrences.get(key, 0)
+        occurrences[key] = occurrence + 1
+        session["id"] = session_id(session, day_timestamp(session["date"]), occurrence)
+        assigned += 1
+    return assigned
+
+
+def _digest(session_id: str) -> bytes:
+    """Hash a session id down to the fixed-size digest stored in the index."""
+    return hashlib.blake2b(session_id.encode(), digest_size=DIGEST_SIZE).digest()
+
+
+class SessionIndex:
+    """Compact on-disk set of session ids, stored as fixed-size digests.
+
+    The file is a flat sequence of 8-byte digests, appended to as sessions
+    are recorded. It is loaded lazily into a set, so membership checks are
+    O(1) per record.
+    """
+
+    def __init__(self, index_file: Path, storage=None):
+        """Initialize the index without reading it yet.
+
+        storage defaults to the files of the directory of index_file.
+        """
+        self.index_file = index_file
+        self.storage = storage or FileStorage(index_file.parent)
+        self._name = index_file.name
+        self._digests: set[bytes] | None = None
+        self._pending: list[bytes] = []
+
+    def _load(self) -> set[bytes]:
+        """Read every digest from disk."""
+        if self._digests is None:
+            try:
+                with self.storage.open(self._name, "rb") as f:
+                    raw = f.read()
+            except OSError:
+                raw = b""
+            self._digests = {
+                raw[i : i + DIGEST_SIZE] for i in range(0, len(raw), DIGEST_SIZE)
+            }
+        return self._digests
+
+    def is_stale(self, session_count: int) -> bool:
+        """Tell whether the file no longer matches the number of sessions."""
+        size = self.storage.size(self._name)
+        indexed = size // DIGEST_SIZE + len(self._pending)
+        return indexed != session_count
+
+    def __contains__(self, session_id: str) -> bool:
+        return _digest(session_id) in self._load()
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def add(self, session_id: str) -> bool:
+        """Add an id, return False if it was already indexed."""
+        digest = _digest(session_id)
+        digests = self._load()
+        if digest in digests:
+            return False
+        digests.add(digest)
+        self._pending.append(digest)
+        return True
+
+    def mark(self) -> int:
+        """Return the point rollback() goes back to."""
+        return len(self._pending)
+
+    def rollback(self, mark: int) -> None:
+        """Forget the ids added since mark(), as long as they are not flushed."""
+        for digest in self._pending[mark:]:
+            self._digests.discard(digest)
+        del self._pending[mark:]
+
+    def flush(self) -> None:
+        """Append the digests added since the last flush."""
+        if not self._pending:
+            return
+        try:
+            with self.storage.open(self._name, "ab") as f:
+                f.write(b"".join(self._pending))
+            self._pending.clear()
+        except OSError as e:
+            print(f"Error saving session index: {e}")
+
+    def rebuild(self, session_ids: Iterable[str]) -> None:
+        """Rewrite the whole index from a list of session ids."""
+        self._digests = set()
+        self._pending = []
+        ordered = []
+        for sid in session_ids:
+            digest = _digest(sid)
+            if digest not in self._digests:
+                self._digests.add(digest)
+                ordered.append(digest)
+        try:
+            with self.storage.open(self._name, "wb") as f:
+                f.write(b"".join(ordered))
+        except OSError as e:
+            print(f"Error saving session index: {e}")
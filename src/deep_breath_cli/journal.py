@@ -0,0 +1,124 @@
+import json
+import os
+from pathlib import Path
+from typing import Any
+from .storage import FileStorage
+
+
+# Size past which the journal starts over, about 8000 sessions
+JOURNAL_LIMIT = 1 << 20
+
+
+def read_head(journal_file: Path) -> str:
+    """Return the first line of the journal, which changes when it is reset."""
+    try:
+        with open(journal_file, "rb") as f:
+            return f.readline().decode(errors="replace")
+    except OSError:
+        return ""
+
+
+class SessionJournal:
+    """Append-only log of recorded sessions, one JSON object per line.
+
+    stats.json is rewritten as a whole on every save, so readers that want
+    to follow new sessions (like 'breath stats --watch') tail this file
+    instead and only read the bytes appended since their last check. The
+    sessions are all in stats.json, so once the journal would outgrow
+    max_size it is started over, and readers reload everything.
+    """
+
+    def __init__(self, journal_file: Path, storage=None, max_size=JOURNAL_LIMIT):
+        """Initialize the journal for the given file.
+
+        storage defaults to the files of the directory of journal_file.
+        """
+        self.journal_file = journal_file
+        self.storage = storage or FileStorage(journal_file.parent)
+        self.max_size = max_size
+        self._name = journal_file.name
+
+    def append(self, sessions: list[dict[str, Any]]) -> None:
+        """Append sessions to the journal in a single write."""
+        if not sessions:
+            return
+        encode = json.JSONEncoder().encode
+        lines = "".join(encode(session) + "\n" for session in sessions)
+        try:
+            if self.size() + len(lines) <= self.max_size:
+                with self.storage.open(self._name, "a") as f:
+                    f.write(lines)
+            else:
+                # A new file: its first line tells readers it was reset
+                self.storage.write_text(
+                    self._name, lines if len(lines) <= self.max_size else ""
+                )
+        except OSError as e:
+            print(f"Error writing session journal: {e}")
+
+    def truncate(self) -> None:
+        """Empty the journal, readers following it will reload everything."""
+        try:
+            with self.storage.open(self._name, "w"):
+                pass
+        except OSError as e:
+            print(f"Error truncating session journal: {e}")
+
+    def size(self) -> int:
+        """Return the current size of the journal in bytes."""
+        return self.storage.size(self._name)
+
+
+class JournalTail:
+    """Follow a session journal, reading only what was appended."""
+
+    def __init__(self, journal_file: Path, offset: int = 0, head: str | None = None):
+        """Initialize the tail at a byte offset of the journal.
+
+        head is the first line of the journal the offset was taken in, read
+        now if not given.
+        """
+        self.journal_file = journal_file
+        self.offset = offset
+        self.head = read_head(journal_file) if head is None else head
+        self._partial = b""
+
+    def poll(self) -> list[dict[str, Any]] | None:
+        """Return the sessions appended since the last poll.
+
+        Returns None when the journal was reset (truncated, or started over
+        and maybe grown past the offset since), in which case the caller has
+        to reload everything.
+        """
+        try:
+            size = os.stat(self.journal_file).st_size
+        except OSError:
+            size = 0
+        if size == self.offset:
+            return []
+        head = read_head(self.journal_file)
+        # An empty journal had no first line to compare
+        if size < self.offset or (self.head and head != self.head):
+            self.offset = size
+            self.head = head
+            self._partial = b""
+            return None
+        self.head = head
+
+        with open(self.journal_file, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+        self.offset += len(chunk)
+
+        # A writer may be halfway through a line, keep it for the next poll
+        lines = (self._partial + chunk).split(b"\n")
+        self._partial = lines.pop()
+        sessions = []
+        for line in lines:
+            try:
+                session = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(session, dict):
+                sessions.append(session)
+        return sessions
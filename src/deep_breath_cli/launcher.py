@@ -0,0 +1,45 @@
+import os
+import sys
+from .completion import COMPLETE_VAR, fast_complete
+from .manifest import CommandManifest, run_cli
+from .paths import STORAGE_VAR, config_dir_path
+from .prompt import fast_prompt
+
+
+def main() -> None:
+    """Entry point of the breath command.
+
+    Completions are answered straight from the preset name cache and the
+    command manifest, 'stats --prompt' from the prompt summary, and
+    --version and --help from the manifest, without importing typer, rich
+    or plotext. Everything else runs the full CLI, which keeps the
+    manifest up to date.
+    """
+    config_dir = config_dir_path()
+    # In memory mode nothing is read from or written to the config directory
+    on_disk = os.environ.get(STORAGE_VAR) != "memory"
+    manifest = CommandManifest.load(config_dir) if on_disk else None
+    if COMPLETE_VAR in os.environ:
+        result = fast_complete(os.environ, config_dir, manifest)
+        if result is not None:
+            output, code = result
+            if output is not None:
+                sys.stdout.write(output + "\n")
+            sys.exit(code)
+    elif "--prompt" in sys.argv:
+        output = fast_prompt(sys.argv[1:], config_dir)
+        if output is not None:
+            sys.stdout.write(output + "\n")
+            sys.exit(0)
+    elif manifest is not None:
+        output = manifest.answer(sys.argv[1:])
+        if output is not None:
+            sys.stdout.write(output)
+            sys.exit(0)
+
+    from .breath import app
+
+    if on_disk:
+        run_cli(app, config_dir)
+    else:
+        app()
@@ -0,0 +1,124 @@
+import json
+import re
+from typing import IO, Any, Iterator
+
+
+CHUNK_SIZE = 1 << 16
+# A single session never comes close to this, so failing to decode with this
+# much data buffered means the record itself is broken
+MAX_RECORD_SIZE = 1 << 20
+
+SESSIONS_KEY = re.compile(r'"sessions"\s*:\s*\[')
+SEPARATORS = " \t\r\n,"
+
+
+class SessionStream:
+    """Incrementally parse the sessions array of a stats file.
+
+    Sessions are decoded one at a time from a sliding buffer, so memory stays
+    bounded by the chunk size rather than the size of the document. If the
+    file is damaged, iteration stops at the corruption point after yielding
+    every valid session before it, and the reason is kept in ``error``.
+    """
+
+    def __init__(self, f: IO[str], chunk_size: int = CHUNK_SIZE):
+        """Initialize the stream over an open text file."""
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.eof = False
+        self.complete = False
+        self.error: str | None = None
+        self.count = 0
+
+    def _fill(self) -> bool:
+        """Read one more chunk, return False at the end of the file."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def _find_sessions(self) -> int:
+        """Return the position just after the opening bracket of sessions."""
+        while True:
+            match = SESSIONS_KEY.search(self.buffer)
+            if match:
+                return match.end()
+            # Keep a tail in case the key is split across two chunks
+            self.buffer = self.buffer[-64:]
+            if not self._fill():
+                return -1
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        pos = self._find_sessions()
+        if pos < 0:
+            self.error = "no sessions array found"
+            return
+
+        while True:
+            # Skip separators between records, reading more when needed
+            while pos < len(self.buffer) and self.buffer[pos] in SEPARATORS:
+                pos += 1
+            if pos >= len(self.buffer):
+                self.buffer, pos = "", 0
+                if not self._fill():
+                    self.error = "unexpected end of file"
+                    return
+                continue
+            if self.buffer[pos] == "]":
+                self.complete = True
+                return
+
+            try:
+                session, end = self.decoder.raw_decode(self.buffer, pos)
+            except json.JSONDecodeError as e:
+                # The record may just be cut by the chunk boundary
+                if len(self.buffer) - pos < MAX_RECORD_SIZE and self._fill():
+                    continue
+                self.error = f"corrupt session after {self.count} valid ones: {e.msg}"
+                return
+
+            if not isinstance(session, dict):
+                self.error = f"corrupt session after {self.count} valid ones"
+                return
+            self.count += 1
+            yield session
+
+            pos = end
+            # Drop what has been consumed so the buffer stays small
+            if pos > self.chunk_size:
+                self.buffer, pos = self.buffer[pos:], 0
+
+
+def read_fields(f: IO[str], chunk_size: int = CHUNK_SIZE) -> dict[str, Any] | None:
+    """Parse the top-level fields written before the sessions array.
+
+    dump_stats writes the sessions last, so this reads every other field
+    without going through the sessions. Returns None if there is no sessions
+    array or the fields before it cannot be decoded.
+    """
+    text = ""
+    start = 0
+    while True:
+        match = SESSIONS_KEY.search(text, start)
+        if match:
+            break
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return None
+        # Only rescan a tail in case the key is split across two chunks
+        start = max(len(text) - 64, 0)
+        text += chunk
+    head = text[: match.start()].rstrip()
+    if head.endswith(","):
+        head = head[:-1]
+    try:
+        fields = json.loads(head + "}")
+    except json.JSONDecodeError:
+        return None
+    return fields if isinstance(fields, dict) else None
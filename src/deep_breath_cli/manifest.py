@@ -0,0 +1,351 @@
+import os
+import sys
+
+
+# Read on every run of the breath command, so only cheap stdlib modules here
+MANIFEST_FILE = "cli_manifest.txt"
+MANIFEST_VERSION = "1"
+HELP_OPTION = "--help"
+VERSION_OPTION = "--version"
+# Help screens kept, one per command and terminal layout
+HELP_LIMIT = 64
+# Environment variables rich and typer read to lay out and colour the help
+HELP_ENV = (
+    "COLUMNS",
+    "LINES",
+    "TERMINAL_WIDTH",
+    "TERM",
+    "COLORTERM",
+    "NO_COLOR",
+    "FORCE_COLOR",
+    "PY_COLORS",
+    "GITHUB_ACTIONS",
+    "TTY_COMPATIBLE",
+    "TTY_INTERACTIVE",
+    "_TYPER_FORCE_DISABLE_TERMINAL",
+)
+SHELLS = ("bash", "zsh", "fish")
+
+
+def version_text() -> str:
+    """Return what 'breath --version' prints."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return f"deep-breath-cli {version('deep-breath-cli')}"
+    except PackageNotFoundError:
+        return "deep-breath-cli (not installed)"
+
+
+def _escape(value: str) -> str:
+    """Keep a value on one line of the manifest."""
+    return value.encode("unicode_escape").decode("ascii")
+
+
+def _unescape(value: str) -> str:
+    """Read back a value written by _escape."""
+    return value.encode("ascii").decode("unicode_escape")
+
+
+def _stamp(path: str) -> str:
+    """Return a value that changes whenever the file is rewritten."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ""
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def help_path(args: list[str]) -> list[str] | None:
+    """Return the command words of 'breath [COMMAND...] --help', else None."""
+    if not args or args[-1] != HELP_OPTION:
+        return None
+    path = args[:-1]
+    if any(word.startswith("-") for word in path):
+        return None
+    return path
+
+
+def help_key(path: list[str], environ=None) -> str:
+    """Identify a help screen by command and by how the terminal lays it out."""
+    environ = os.environ if environ is None else environ
+    size = None
+    # The streams rich asks for the terminal size, in its order
+    for fd in (0, 1, 2):
+        try:
+            size = os.get_terminal_size(fd)
+            break
+        except (OSError, ValueError):
+            continue
+    try:
+        isatty = sys.stdout.isatty()
+    except (AttributeError, ValueError):
+        isatty = False
+    fields = [
+        os.path.basename(sys.argv[0]),
+        " ".join(path),
+        str(isatty),
+        f"{size.columns}x{size.lines}" if size else "",
+    ] + [environ.get(name, "") for name in HELP_ENV]
+    return "|".join(fields)
+
+
+class CommandManifest:
+    """What the breath command answers without building the typer app.
+
+    Generated from the click command tree after a full run: the version,
+    the command names, the command and option completions preformatted for
+    each shell, and the help screens printed so far. It is discarded as
+    soon as the interpreter, the commands or typer and rich change.
+    """
+
+    def __init__(self):
+        """Initialize an empty manifest."""
+        self.interpreter = sys.executable
+        self.sources: dict[str, str] = {}
+        self.version = ""
+        self.commands: dict[str, list[str]] = {}
+        self.completions: dict[str, list[dict[str, str]]] = {}
+        self.help: dict[str, str] = {}
+
+    @classmethod
+    def load(cls, config_dir) -> "CommandManifest | None":
+        """Read the manifest, None if missing, damaged or out of date."""
+        try:
+            with open(os.path.join(config_dir, MANIFEST_FILE), "r") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return None
+        manifest = cls()
+        try:
+            if lines[0] != f"manifest\t{MANIFEST_VERSION}":
+                return None
+            for line in lines[1:]:
+                kind, *fields = line.split("\t")
+                fields = [_unescape(field) for field in fields]
+                if kind == "interpreter":
+                    manifest.interpreter = fields[0]
+                elif kind == "source":
+                    manifest.sources[fields[0]] = fields[1]
+                elif kind == "version":
+                    manifest.version = fields[0]
+                elif kind == "command":
+                    manifest.commands[fields[0]] = fields[1:]
+                elif kind == "complete":
+                    path, value, *lines_ = fields
+                    item = dict(zip(("value",) + SHELLS, [value] + lines_))
+                    manifest.completions.setdefault(path, []).append(item)
+                elif kind == "help":
+                    manifest.help[fields[0]] = fields[1]
+        except (IndexError, ValueError, UnicodeError):
+            return None
+        if not manifest.is_current():
+            return None
+        return manifest
+
+    def is_current(self) -> bool:
+        """Tell whether the CLI is still the one the manifest describes."""
+        if self.interpreter != sys.executable or not self.sources:
+            return False
+        return all(_stamp(path) == stamp for path, stamp in self.sources.items())
+
+    def save(self, config_dir) -> None:
+        """Write the manifest atomically."""
+        from pathlib import Path
+        from .metrics import write_textfile
+
+        lines = [f"manifest\t{MANIFEST_VERSION}"]
+
+        def add(kind: str, *fields: str) -> None:
+            lines.append("\t".join([kind, *(_escape(field) for field in fields)]))
+
+        add("interpreter", self.interpreter)
+        for path, stamp in self.sources.items():
+            add("source", path, stamp)
+        add("version", self.version)
+        for path, names in self.commands.items():
+            add("command", path, *names)
+        for path, items in self.completions.items():
+            for item in items:
+                add("complete", path, item["value"], *(item[s] for s in SHELLS))
+        for key, text in list(self.help.items())[-HELP_LIMIT:]:
+            add("help", key, text)
+        config_dir = Path(config_dir)
+        config_dir.mkdir(parents=True, exist_ok=True)
+        write_textfile(config_dir / MANIFEST_FILE, "\n".join(lines) + "\n")
+
+    def resolve(self, words: list[str]) -> str | None:
+        """Return the key of a command path, None if it is not a command."""
+        path = ""
+        for word in words:
+            if word not in self.commands.get(path, ()):
+                return None
+            path = f"{path} {word}".strip()
+        return path
+
+    def answer(self, args: list[str]) -> str | None:
+        """Return the output of a --version or --help run, None if unknown."""
+        if args == [VERSION_OPTION] and self.version:
+            return self.version + "\n"
+        words = help_path(args)
+        if words is None or self.resolve(words) is None:
+            return None
+        return self.help.get(help_key(words))
+
+    def complete(
+        self, args: list[str], incomplete: str, shell: str
+    ) -> list[str] | None:
+        """Return the completion lines of a command or option name.
+
+        Only the words after the command path are completed here, exactly
+        as click would; None means the full CLI has to answer (an option
+        was given, or a command argument is being completed).
+        """
+        path = self.resolve(args)
+        if path is None or "=" in incomplete:
+            return None
+        is_group = bool(self.commands.get(path))
+        if not incomplete.startswith("-") and not is_group:
+            return None
+        options = incomplete and not incomplete[0].isalnum()
+        return [
+            item[shell]
+            for item in self.completions.get(path, ())
+            if item["value"].startswith(incomplete)
+            and (options or not item["value"].startswith("-"))
+        ]
+
+
+class _Capture:
+    """Text buffer that looks like the terminal to rich."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.parts: list[str] = []
+
+    def write(self, text: str) -> int:
+        self.parts.append(text)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def __getattr__(self, name: str):
+        # isatty, encoding and fileno decide colours and width
+        return getattr(self.stream, name)
+
+
+def manifest_sources() -> list[str]:
+    """Return the files whose change makes the manifest out of date.
+
+    Commands, their help and their defaults come from every module of the
+    package, and their rendering from typer, click and rich. The installed
+    metadata of each distribution is stamped too: its path changes with
+    the version, so an upgrade is noticed even if the modules kept theirs.
+    """
+    import importlib
+    import typer
+    import rich
+    from importlib import metadata
+    from typer import main as typer_main
+
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = [
+        os.path.join(package_dir, name)
+        for name in sorted(os.listdir(package_dir))
+        if name.endswith(".py")
+    ]
+    # Vendored by recent typer versions, a dependency of older ones
+    click = getattr(typer_main, "_click", None) or importlib.import_module("click")
+    paths += [typer.__file__, click.__file__, rich.__file__]
+    for name in ("deep-breath-cli", "typer", "click", "rich"):
+        try:
+            files = metadata.distribution(name).files or []
+        except metadata.PackageNotFoundError:
+            continue
+        paths += [str(file.locate()) for file in files if file.name == "METADATA"]
+    return paths
+
+
+def build_manifest(command) -> CommandManifest:
+    """Describe a click command tree, without any help screen yet."""
+    from typer import _completion_classes
+
+    prog_name = os.path.basename(sys.argv[0])
+    classes = {
+        "bash": _completion_classes.BashComplete,
+        "zsh": _completion_classes.ZshComplete,
+        "fish": _completion_classes.FishComplete,
+    }
+    completers = {
+        shell: cls(command, {}, prog_name, "_BREATH_COMPLETE")
+        for shell, cls in classes.items()
+    }
+
+    result = CommandManifest()
+    for path in manifest_sources():
+        result.sources[path] = _stamp(path)
+    result.version = version_text()
+
+    def walk(cmd, ctx, path: str) -> None:
+        names = cmd.list_commands(ctx) if hasattr(cmd, "list_commands") else []
+        result.commands[path] = names
+        items = cmd.shell_complete(ctx, "") + cmd.shell_complete(ctx, "-")
+        result.completions[path] = [
+            {"value": item.value}
+            | {shell: completers[shell].format_completion(item) for shell in SHELLS}
+            for item in items
+        ]
+        for name in names:
+            sub = cmd.get_command(ctx, name)
+            sub_ctx = sub.make_context(name, [], parent=ctx, resilient_parsing=True)
+            walk(sub, sub_ctx, f"{path} {name}".strip())
+
+    walk(command, command.make_context(prog_name, [], resilient_parsing=True), "")
+    return result
+
+
+def render_help(command, words: list[str]) -> str:
+    """Return what 'breath WORDS --help' prints on this terminal."""
+    import contextlib
+
+    prog_name = os.path.basename(sys.argv[0])
+    ctx = command.make_context(prog_name, [], resilient_parsing=True)
+    for word in words:
+        command = command.get_command(ctx, word)
+        ctx = command.make_context(word, [], parent=ctx, resilient_parsing=True)
+    capture = _Capture(sys.stdout)
+    with contextlib.redirect_stdout(capture):
+        # Like the --help option: rich prints the help, then the text is echoed
+        text = ctx.get_help()
+    return "".join(capture.parts) + text + "\n"
+
+
+def run_cli(app, config_dir) -> None:
+    """Run the full CLI, then bring the manifest up to date.
+
+    After a successful run, the manifest is generated again if the CLI
+    changed, and the help screen just printed is added to it.
+    """
+    import typer
+
+    manifest = CommandManifest.load(config_dir)
+    try:
+        app()
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            raise
+        words = help_path(sys.argv[1:])
+        if manifest is not None and words is None:
+            raise
+        command = typer.main.get_command(app)
+        if manifest is None:
+            manifest = build_manifest(command)
+        if words is not None and manifest.resolve(words) is not None:
+            manifest.help[help_key(words)] = render_help(command, words)
+        try:
+            manifest.save(config_dir)
+        except OSError:
+            # Only a cache: the next full run tries again
+            pass
+        raise
@@ -0,0 +1,338 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from functools import reduce
+from pathlib import Path
+from typing import Any
+from .index import assign_ids
+from .loader import SessionStream, read_fields
+from .retention import archive_daily, archive_dates, archive_totals, merge_periods
+from .sketch import (
+    add_to_pattern_stats,
+    build_pattern_stats,
+    format_pattern_stats,
+    merge_pattern_stats,
+)
+
+
+def find_stats_files(source: str) -> list[Path]:
+    """Resolve a directory or a glob pattern into a sorted list of stats files."""
+    path = Path(source)
+    if path.is_dir():
+        return sorted(p for p in path.rglob("*.json") if p.is_file())
+    return sorted(
+        Path(p) for p in glob.glob(source, recursive=True) if os.path.isfile(p)
+    )
+
+
+def _empty_partial() -> dict[str, Any]:
+    """Return the neutral element of the combine step."""
+    return {
+        "files": 0,
+        "total_sessions": 0,
+        "total_time_seconds": 0,
+        "patterns_used": {},
+        "pattern_stats": {},
+        "daily": {},
+        "longest_streaks": {},
+        "current_streaks": {},
+        "sessions": [],
+        "archives": [],
+        "errors": [],
+    }
+
+
+def _add_counts(target: dict, source: dict) -> None:
+    """Add the counters of source into target, key by key."""
+    for key, value in source.items():
+        target[key] = target.get(key, 0) + value
+
+
+def longest_streak(dates: set[str]) -> int:
+    """Return the longest run of consecutive days found in a set of dates."""
+    longest = 0
+    for day in dates:
+        current_date = datetime.strptime(day, "%Y-%m-%d").date()
+        # Only start counting at the first day of a run
+        if (current_date - timedelta(days=1)).strftime("%Y-%m-%d") in dates:
+            continue
+        run = 0
+        while current_date.strftime("%Y-%m-%d") in dates:
+            run += 1
+            current_date += timedelta(days=1)
+        longest = max(longest, run)
+    return longest
+
+
+def current_streak(dates: set[str], today: str | None = None) -> int:
+    """Return the run of consecutive days ending today (or on another day)."""
+    streak = 0
+    if today is None:
+        current_date = datetime.now().date()
+    else:
+        current_date = datetime.strptime(today, "%Y-%m-%d").date()
+    while current_date.strftime("%Y-%m-%d") in dates:
+        streak += 1
+        current_date -= timedelta(days=1)
+    return streak
+
+
+def _count_session(partial: dict[str, Any], session: dict[str, Any]) -> None:
+    """Count a raw session in a partial."""
+    daily, patterns_used = partial["daily"], partial["patterns_used"]
+    daily[session["date"]] = daily.get(session["date"], 0) + 1
+    patterns_used[session["pattern"]] = patterns_used.get(session["pattern"], 0) + 1
+    partial["total_time_seconds"] += session["duration_seconds"]
+    partial["total_sessions"] += 1
+    add_to_pattern_stats(partial["pattern_stats"], session)
+
+
+def _count_archive(partial: dict[str, Any], archive: dict[str, Any]) -> None:
+    """Count the sessions of an archive in a partial."""
+    totals = archive_totals(archive)
+    dates = archive_dates(archive)
+    partial["total_sessions"] += totals["total_sessions"]
+    partial["total_time_seconds"] += totals["total_time_seconds"]
+    _add_counts(partial["patterns_used"], totals["patterns_used"])
+    # Days of month records are active, but their session counts are unknown
+    _add_counts(partial["daily"], dict.fromkeys(dates, 0) | archive_daily(archive))
+    # Archives written before pattern stats existed have none
+    merge_pattern_stats(partial["pattern_stats"], archive.get("pattern_stats", {}))
+
+
+def _add_archive(partial: dict[str, Any], archive: dict[str, Any]) -> None:
+    """Count the archived sessions of a file in its partial."""
+    _count_archive(partial, archive)
+    partial["archives"].append(
+        {
+            "periods": archive["periods"],
+            "rollups": archive["rollups"],
+            "pattern_stats": archive.get("pattern_stats", {}),
+        }
+    )
+
+
+def summarize_file(path: Path, keep_sessions: bool = False) -> dict[str, Any]:
+    """Map step: reduce a single stats file to a mergeable partial."""
+    partial = _empty_partial()
+    sessions = []
+    try:
+        # Sessions are streamed, a file never has to fit in memory at once
+        with open(path, "r", errors="replace") as f:
+            fields = read_fields(f) or {}
+            f.seek(0)
+            stream = SessionStream(f)
+            for session in stream:
+                _count_session(partial, session)
+                if keep_sessions:
+                    sessions.append(session)
+    except (OSError, KeyError, TypeError) as e:
+        return _empty_partial() | {"errors": [f"{path}: {e}"]}
+
+    if stream.error:
+        if stream.count == 0:
+            return _empty_partial() | {"errors": [f"{path}: {stream.error}"]}
+        # Keep what could be salvaged, but say the file was damaged
+        partial["errors"].append(f"{path}: partially read, {stream.error}")
+
+    archive = fields.get("archive")
+    if isinstance(archive, dict):
+        # Sessions compacted by 'breath stats vacuum' still count
+        try:
+            _add_archive(partial, archive)
+        except (KeyError, TypeError, AttributeError) as e:
+            partial["errors"].append(f"{path}: unreadable archive, {e}")
+
+    partial["files"] = 1
+    # Streaks are per file (per user), so they merge as distributions
+    dates = set(partial["daily"])
+    partial["longest_streaks"] = {str(longest_streak(dates)): 1}
+    partial["current_streaks"] = {str(current_streak(dates)): 1}
+    if keep_sessions:
+        # Ids are assigned per file so re-merging the same file is idempotent
+        assign_ids(sessions)
+        partial["sessions"] = sessions
+    return partial
+
+
+def combine(left: dict[str, Any], right: dict[str, Any]) -> dict[str, Any]:
+    """Reduce step: merge two partials into a new one."""
+    merged = _empty_partial()
+    for partial in (left, right):
+        merged["files"] += partial["files"]
+        merged["total_sessions"] += partial["total_sessions"]
+        merged["total_time_seconds"] += partial["total_time_seconds"]
+        for key in ("patterns_used", "daily", "longest_streaks", "current_streaks"):
+            _add_counts(merged[key], partial[key])
+        merge_pattern_stats(merged["pattern_stats"], partial["pattern_stats"])
+        merged["sessions"].extend(partial["sessions"])
+        merged["archives"].extend(partial["archives"])
+        merged["errors"].extend(partial["errors"])
+    return merged
+
+
+def _summarize_batch(paths: list[Path], keep_sessions: bool) -> dict[str, Any]:
+    """Summarize a batch of files in one worker to keep IPC small."""
+    return reduce(
+        combine,
+        (summarize_file(path, keep_sessions) for path in paths),
+        _empty_partial(),
+    )
+
+
+def merge_stats_files(
+    paths: list[Path], workers: int = 0, keep_sessions: bool = False
+) -> dict[str, Any]:
+    """Merge many stats files, parsing them in a process pool."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 2:
+        return _summarize_batch(paths, keep_sessions)
+
+    # A few batches per worker keeps the pool busy without per-file overhead
+    batch_count = min(len(paths), workers * 4)
+    batches = [paths[i::batch_count] for i in range(batch_count)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        partials = executor.map(
+            _summarize_batch, batches, [keep_sessions] * len(batches)
+        )
+        return reduce(combine, partials, _empty_partial())
+
+
+def deduplicate(partial: dict[str, Any]) -> dict[str, Any]:
+    """Count sessions found in several files (same id) only once.
+
+    The totals, pattern counts, daily counts and pattern stats of a partial
+    merged with its sessions are recomputed from the unique sessions and
+    the archives, as build_stats counts them. Streak distributions are per
+    file and stay as they are.
+    """
+    unique: dict[str, dict[str, Any]] = {}
+    for session in partial["sessions"]:
+        unique.setdefault(session["id"], session)
+    deduplicated = partial | {
+        key: _empty_partial()[key]
+        for key in (
+            "total_sessions",
+            "total_time_seconds",
+            "patterns_used",
+            "pattern_stats",
+            "daily",
+        )
+    }
+    for session in unique.values():
+        _count_session(deduplicated, session)
+    for archive in partial["archives"]:
+        _count_archive(deduplicated, archive)
+    deduplicated["sessions"] = list(unique.values())
+    deduplicated["duplicates"] = len(partial["sessions"]) - len(unique)
+    return deduplicated
+
+
+def build_stats(partial: dict[str, Any]) -> dict[str, Any]:
+    """Turn a merged partial into a regular stats.json structure.
+
+    Sessions seen in several files (same id) are only counted once, so the
+    totals are recomputed from the deduplicated sessions. Archived records
+    carry no ids, they are summed per period into the archive of the result.
+    """
+    sessions = []
+    seen: set[str] = set()
+    patterns_used: dict[str, int] = {}
+    for session in sorted(partial["sessions"], key=lambda session: session["date"]):
+        if session["id"] in seen:
+            continue
+        seen.add(session["id"])
+        sessions.append(session)
+        patterns_used[session["pattern"]] = patterns_used.get(session["pattern"], 0) + 1
+
+    dates = {session["date"] for session in sessions}
+    stats = {
+        "total_sessions": len(sessions),
+        "total_time_seconds": sum(session["duration_seconds"] for session in sessions),
+        "patterns_used": patterns_used,
+        "pattern_stats": build_pattern_stats(sessions),
+        "sessions": sessions,
+    }
+    if partial["archives"]:
+        periods = []
+        rollups = {"by_hour": [0] * 24, "by_weekday": [0] * 7}
+        pattern_stats: dict[str, Any] = {}
+        for archive in partial["archives"]:
+            periods.extend(archive["periods"])
+            for key, counts in archive["rollups"].items():
+                rollups[key] = [a + b for a, b in zip(rollups[key], counts)]
+            merge_pattern_stats(pattern_stats, archive["pattern_stats"])
+        archive = {
+            "periods": merge_periods(periods),
+            "rollups": rollups,
+            "pattern_stats": pattern_stats,
+            "indexed": 0,
+        }
+        totals = archive_totals(archive)
+        stats["total_sessions"] += totals["total_sessions"]
+        stats["total_time_seconds"] += totals["total_time_seconds"]
+        _add_counts(patterns_used, totals["patterns_used"])
+        merge_pattern_stats(stats["pattern_stats"], pattern_stats)
+        dates |= archive_dates(archive)
+        stats["archive"] = archive
+    stats["streaks"] = {
+        "current": current_streak(dates),
+        "longest": longest_streak(dates),
+    }
+    return stats
+
+
+def _format_distribution(distribution: dict[str, int]) -> str:
+    """Format a streak distribution as 'N days: M users' lines."""
+    lines = []
+    for streak, users in sorted(distribution.items(), key=lambda item: int(item[0])):
+        lines.append(f"    {streak} days: {users} users")
+    return "\n".join(lines) or "    No data"
+
+
+def format_report(partial: dict[str, Any], days: int = 7) -> str:
+    """Format a merged partial as a fleet report for the terminal."""
+    total_minutes = partial["total_time_seconds"] // 60
+    patterns = sorted(
+        partial["patterns_used"].items(), key=lambda item: item[1], reverse=True
+    )
+    patterns_str = "\n".join(
+        f"    {pattern}: {count} sessions" for pattern, count in patterns
+    )
+
+    today = datetime.now().date()
+    daily_str = "\n".join(
+        f"    {day}: {partial['daily'].get(day, 0)} sessions"
+        for day in (
+            (today - timedelta(days=i)).strftime("%Y-%m-%d")
+            for i in range(days - 1, -1, -1)
+        )
+    )
+
+    report = f"""Fleet Breathing Report
+    Files merged: {partial["files"]}
+    Total sessions: {partial["total_sessions"]}
+    Total time: {total_minutes} minutes
+Patterns used:
+{patterns_str or "    No data"}
+Sessions over the last {days} days:
+{daily_str}
+Longest streak distribution:
+{_format_distribution(partial["longest_streaks"])}
+Current streak distribution:
+{_format_distribution(partial["current_streaks"])}"""
+
+    if partial["pattern_stats"]:
+        report += "\n" + format_pattern_stats(
+            partial["pattern_stats"], partial["patterns_used"]
+        )
+    if partial.get("duplicates"):
+        report += (
+            f"\nDuplicate sessions: {partial['duplicates']} (same id in several"
+            " files, counted once)"
+        )
+    if partial["errors"]:
+        errors_str = "\n".join(f"    {error}" for error in partial["errors"])
+        report += f"\nSkipped files:\n{errors_str}"
+    return report
@@ -0,0 +1,237 @@
+import contextlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+from .storage import FileStorage
+
+
+METRICS_FILE_ENV = "BREATH_METRICS_FILE"
+LOCK_FILE = "metrics.lock"
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DRIFT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Cumulative histogram that can be stored as JSON between runs.
+
+    counts holds one cumulative count per bucket bound, plus a last slot
+    for the +Inf bucket, which is also the total number of observations.
+    """
+
+    def __init__(self, buckets: tuple[float, ...], counts=None, total=0.0):
+        """Initialize the histogram with upper bounds and optional state."""
+        self.buckets = buckets
+        self.counts = list(counts) if counts else [0] * (len(buckets) + 1)
+        self.total = total
+
+    def observe(self, value: float) -> None:
+        """Add one observation to every bucket it fits in."""
+        self.total += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.counts[-1] += 1
+
+    def merge(self, other: "Histogram") -> None:
+        """Add the observations of a histogram with the same buckets."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the JSON-serializable state."""
+        return {"counts": self.counts, "sum": self.total}
+
+    @classmethod
+    def from_dict(cls, buckets: tuple[float, ...], data: dict | None) -> "Histogram":
+        """Restore a histogram, starting over if the buckets changed."""
+        if not data or len(data["counts"]) != len(buckets) + 1:
+            return cls(buckets)
+        return cls(buckets, data["counts"], data["sum"])
+
+    def render(self, name: str, labels: str = "") -> list[str]:
+        """Format the bucket, sum and count samples."""
+        prefix = f"{labels}," if labels else ""
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        lines = [
+            f'{name}_bucket{{{prefix}le="{bound}"}} {count}'
+            for bound, count in zip(bounds, self.counts)
+        ]
+        braces = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{braces} {self.total}")
+        lines.append(f"{name}_count{braces} {self.counts[-1]}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def write_textfile(path: Path, text: str) -> None:
+    """Write a file atomically so a scraper never sees a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
+
+
+class MetricsExporter:
+    """Maintain a node_exporter textfile with session and CLI metrics.
+
+    Counters come from the stats data, while histograms are accumulated
+    across runs in a small JSON state file next to the stats.
+    """
+
+    def __init__(self, state_file: Path, prom_file: Path, storage=None):
+        """Initialize the exporter with its state and output files.
+
+        storage defaults to the files of the directory of state_file, where
+        the lock shared by every command updating the state is kept.
+        """
+        self.state_file = state_file
+        self.prom_file = prom_file
+        self.storage = storage or FileStorage(state_file.parent)
+
+    @classmethod
+    def from_env(cls, config_dir: Path) -> "MetricsExporter | None":
+        """Build an exporter if BREATH_METRICS_FILE is set, else None."""
+        prom_file = os.environ.get(METRICS_FILE_ENV)
+        if not prom_file:
+            return None
+        return cls(config_dir / "metrics.json", Path(prom_file))
+
+    def _load_state(self) -> dict[str, Any]:
+        """Load the accumulated metrics, or start from zero."""
+        try:
+            with open(self.state_file, "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {"commands": {}, "drift": None, "stats": {}}
+
+    def _save(self, state: dict[str, Any]) -> None:
+        """Persist the state and rewrite the textfile."""
+        try:
+            write_textfile(self.state_file, json.dumps(state))
+            write_textfile(self.prom_file, render_metrics(state))
+        except OSError as e:
+            print(f"Error writing metrics file: {e}")
+
+    @contextlib.contextmanager
+    def _update(self):
+        """Hold the metrics lock while the state is loaded, changed and saved.
+
+        Commands finishing at once would otherwise lose each other's
+        observations.
+        """
+        with self.storage.lock(LOCK_FILE):
+            state = self._load_state()
+            yield state
+            self._save(state)
+
+    def record_stats(self, data: dict[str, Any], drift: float | None = None) -> None:
+        """Refresh counters from the stats and observe a session's timing drift."""
+        with self._update() as state:
+            state["stats"] = {
+                "patterns_used": data["patterns_used"],
+                "total_time_seconds": data["total_time_seconds"],
+                "streaks": data["streaks"],
+            }
+            if drift is not None:
+                histogram = Histogram.from_dict(DRIFT_BUCKETS, state["drift"])
+                histogram.observe(max(drift, 0.0))
+                state["drift"] = histogram.to_dict()
+
+    def observe_command(self, command: str, seconds: float) -> None:
+        """Observe the latency of one CLI command."""
+        with self._update() as state:
+            histogram = Histogram.from_dict(
+                LATENCY_BUCKETS, state["commands"].get(command)
+            )
+            histogram.observe(seconds)
+            state["commands"][command] = histogram.to_dict()
+
+    def observe_hooks(self, hooks: list) -> None:
+        """Add the latency, failures and dropped events of a run's hooks."""
+        with self._update() as state:
+            stored = state.setdefault("hooks", {})
+            for hook in hooks:
+                previous = stored.get(hook.name, {})
+                histogram = Histogram.from_dict(
+                    LATENCY_BUCKETS, previous.get("latency")
+                )
+                histogram.merge(hook.latency)
+                stored[hook.name] = {
+                    "latency": histogram.to_dict(),
+                    "failures": previous.get("failures", 0) + hook.failures,
+                    "dropped": previous.get("dropped", 0) + hook.dropped,
+                }
+
+
+def render_metrics(state: dict[str, Any]) -> str:
+    """Format the metrics state in the Prometheus/OpenMetrics text format."""
+    stats = state.get("stats", {})
+    lines = [
+        "# HELP breath_sessions_total Breathing sessions recorded per pattern.",
+        "# TYPE breath_sessions_total counter",
+    ]
+    for pattern, count in sorted(stats.get("patterns_used", {}).items()):
+        lines.append(f'breath_sessions_total{{pattern="{_escape(pattern)}"}} {count}')
+
+    streaks = stats.get("streaks", {})
+    lines += [
+        "# HELP breath_session_seconds_total Time spent breathing.",
+        "# TYPE breath_session_seconds_total counter",
+        f"breath_session_seconds_total {stats.get('total_time_seconds', 0)}",
+        "# HELP breath_streak_current_days Current streak of consecutive days.",
+        "# TYPE breath_streak_current_days gauge",
+        f"breath_streak_current_days {streaks.get('current', 0)}",
+        "# HELP breath_streak_longest_days Longest streak of consecutive days.",
+        "# TYPE breath_streak_longest_days gauge",
+        f"breath_streak_longest_days {streaks.get('longest', 0)}",
+        "# HELP breath_command_duration_seconds Latency of breath commands.",
+        "# TYPE breath_command_duration_seconds histogram",
+    ]
+    for command, data in sorted(state.get("commands", {}).items()):
+        histogram = Histogram.from_dict(LATENCY_BUCKETS, data)
+        lines += histogram.render(
+            "breath_command_duration_seconds", f'command="{_escape(command)}"'
+        )
+
+    lines += [
+        "# HELP breath_session_drift_seconds Wall-clock time beyond the planned "
+        "session duration.",
+        "# TYPE breath_session_drift_seconds histogram",
+    ]
+    lines += Histogram.from_dict(DRIFT_BUCKETS, state.get("drift")).render(
+        "breath_session_drift_seconds"
+    )
+    hooks = sorted(state.get("hooks", {}).items())
+    lines += [
+        "# HELP breath_hook_duration_seconds Latency of session event hooks.",
+        "# TYPE breath_hook_duration_seconds histogram",
+    ]
+    for name, data in hooks:
+        histogram = Histogram.from_dict(LATENCY_BUCKETS, data["latency"])
+        lines += histogram.render(
+            "breath_hook_duration_seconds", f'hook="{_escape(name)}"'
+        )
+    for metric, key, help_text in (
+        ("breath_hook_failures_total", "failures", "Hook calls that failed."),
+        (
+            "breath_hook_dropped_events_total",
+            "dropped",
+            "Events dropped because a hook's queue was full.",
+        ),
+    ):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        for name, data in hooks:
+            lines.append(f'{metric}{{hook="{_escape(name)}"}} {data[key]}')
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,18 @@
+import os
+
+
+# Imported by the launcher on every run, so nothing but os here
+APP_NAME = "deep-breath-cli"
+DATA_DIR_VAR = "BREATH_DATA_DIR"
+STORAGE_VAR = "BREATH_STORAGE"
+
+
+def config_dir_path(environ=None, home: str | None = None) -> str:
+    """Return the config directory as a string, see resolve_config_dir()."""
+    environ = os.environ if environ is None else environ
+    if environ.get(DATA_DIR_VAR):
+        return os.path.expanduser(environ[DATA_DIR_VAR])
+    if environ.get("XDG_CONFIG_HOME"):
+        return os.path.join(environ["XDG_CONFIG_HOME"], APP_NAME)
+    home = os.path.expanduser("~") if home is None else home
+    return os.path.join(home, ".config", APP_NAME)
@@ -1,40 +1,68 @@
+import itertools
 import json
 import typer
-from pathlib import Path
+from typing import TYPE_CHECKING
+from .completion import NAME_CACHE, write_name_cache
+from .profiling import timed
+from .timeline import describe_steps
+
+if TYPE_CHECKING:
+    from .context import AppContext
+
+
+PRESETS_FILE = "presets.json"
 
 
 class PresetManager:
-    def __init__(self):
-        """Initialize the preset manager and load existing presets."""
-        self.config_dir = Path.home() / ".config" / "deep-breath-cli"
-        self.presets_file = self.config_dir / "presets.json"
+    def __init__(self, context: "AppContext | None" = None):
+        """Initialize the preset manager and load existing presets.
+
+        Without a context, the one of the process is used.
+        """
+        if context is None:
+            from .context import get_context
+
+            context = get_context()
+        self.config_dir = context.config_dir
+        self.storage = context.storage
+        self.presets_file = self.storage.path(PRESETS_FILE)
         self.custom_presets = self._load_presets()
 
+    @timed("presets.load")
     def _load_presets(self) -> dict[str, list[tuple[int, str]]]:
         """Load presets from JSON file or create default structure."""
-        if not self.presets_file.exists():
+        if not self.storage.exists(PRESETS_FILE):
             print("No custom presets found, creating an empty presets file.")
-            self.config_dir.mkdir(parents=True, exist_ok=True)
             default_data: dict = {}
             # Save default presets
-            with open(self.presets_file, "w") as f:
+            with self.storage.open(PRESETS_FILE, "w") as f:
                 json.dump(default_data, f, indent=2)
+            self._write_name_cache(default_data)
             return default_data
         else:
             # Load existing presets
             try:
-                with open(self.presets_file, "r") as f:
+                with self.storage.open(PRESETS_FILE, "r") as f:
                     data = json.load(f)
-                    # Convert JSON lists back to tuples
-                    return {
-                        name: [tuple(phase) for phase in phases]
+                    # Convert JSON lists back to tuples, ramps and repeats
+                    # stay objects
+                    presets = {
+                        name: [
+                            tuple(phase) if isinstance(phase, list) else phase
+                            for phase in phases
+                        ]
                         for name, phases in data.items()
                     }
+                # Presets saved before the name cache existed
+                if not self.storage.exists(NAME_CACHE):
+                    self._write_name_cache(presets)
+                return presets
             except (json.JSONDecodeError, IOError) as e:
                 print(f"Error loading presets file: {e}")
                 print("Creating fresh presets file.")
                 return {}
 
+    @timed("presets.save")
     def _save_presets(self) -> None:
         """Save custom presets to JSON file."""
         try:
@@ -42,11 +70,25 @@ class PresetManager:
             json_data = {
                 name: list(phases) for name, phases in self.custom_presets.items()
             }
-            with open(self.presets_file, "w") as f:
+            with self.storage.open(PRESETS_FILE, "w") as f:
                 json.dump(json_data, f, indent=2)
+            self._write_name_cache(self.custom_presets)
         except IOError as e:
             print(f"Error saving presets file: {e}")
 
+    def _write_name_cache(self, custom_presets: dict) -> None:
+        """Regenerate the preset name cache read by shell completion."""
+        if not self.storage.persistent:
+            return
+        from .breath import PATTERNS  # Importing here to avoid circular import issues
+
+        names = dict.fromkeys(PATTERNS, "built-in")
+        names.update(dict.fromkeys(custom_presets, "custom"))
+        try:
+            write_name_cache(self.config_dir, names)
+        except OSError as e:
+            print(f"Error saving preset name cache: {e}")
+
     def _create_phases(self) -> list[tuple[int, str]]:
         """Create phases through interactive prompts."""
         # Ask for the number of phases
@@ -77,12 +119,15 @@ class PresetManager:
 
             # Get duration for the selected phase type
             duration = typer.prompt(
-                "Enter the duration for this phase (in seconds): ", type=int
+                "Enter the duration for this phase (in seconds): ", type=float
             )
             if duration <= 0:
                 print("Duration must be greater than 0.")
                 return []
 
+            # Whole seconds are kept as integers in presets.json
+            if duration.is_integer():
+                duration = int(duration)
             phases.append((duration, phase_types[phase_type]))
 
         return phases
@@ -126,6 +171,27 @@ class PresetManager:
 
         return all_presets
 
+    def get_presets_page(
+        self, offset: int = 0, limit: int = 0
+    ) -> tuple[list[tuple[str, list, str]], int]:
+        """Get a page of (name, phases, type), built-in presets first.
+
+        Only the presets of the page are gathered, so listing a large
+        library does not cost more than its first page; limit 0 means all.
+        Returns the page and the total number of presets.
+        """
+        from .breath import PATTERNS  # Importing here to avoid circular import issues
+
+        # A custom preset takes the place of a built-in one with its name
+        built_in = [name for name in PATTERNS if name not in self.custom_presets]
+        presets = itertools.chain(
+            ((name, PATTERNS[name], "built-in") for name in built_in),
+            ((name, phases, "custom") for name, phases in self.custom_presets.items()),
+        )
+        stop = offset + limit if limit else None
+        page = list(itertools.islice(presets, offset, stop))
+        return page, len(built_in) + len(self.custom_presets)
+
     def delete_preset(self, name: str) -> bool:
         """Delete a custom preset."""
         if name not in self.custom_presets:
@@ -154,8 +220,8 @@ class PresetManager:
         # Display current pattern
         current_phases = self.custom_presets[name]
         print(f"Current pattern '{name}':")
-        for i, (duration, message) in enumerate(current_phases, 1):
-            print(f" Phase {i}: {duration}s {message}")
+        for i, description in enumerate(describe_steps(current_phases), 1):
+            print(f" Phase {i}: {description}")
 
         # Confirm modification
         confirm = typer.confirm(f"Do you want to modify the preset '{name}'?")
@@ -0,0 +1,151 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Iterator
+
+
+# Taken as early as possible so the import cost of the CLI can be reported
+PROCESS_START = time.perf_counter()
+_imports_done: float | None = None
+_profiler: "Profiler | None" = None
+
+
+class Profiler:
+    """Collect timing spans and optionally drive cProfile."""
+
+    def __init__(self, output_path: str = ""):
+        """Initialize the profiler, starting cProfile for .pstats outputs."""
+        self.output_path = output_path
+        self.spans: list[tuple[str, float, float, int]] = []
+        self.cprofile = None
+        if output_path.endswith((".pstats", ".prof")):
+            import cProfile
+
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Record how long the enclosed block takes."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((name, start, time.perf_counter(), threading.get_ident()))
+
+    def breakdown(self) -> str:
+        """Format total time, call count and share per span name."""
+        totals: dict[str, list[float]] = {}
+        for name, start, end, _ in self.spans:
+            total = totals.setdefault(name, [0.0, 0])
+            total[0] += end - start
+            total[1] += 1
+        wall = time.perf_counter() - PROCESS_START
+
+        lines = ["Profile breakdown:"]
+        for name, (seconds, calls) in sorted(
+            totals.items(), key=lambda item: item[1][0], reverse=True
+        ):
+            lines.append(
+                f"  {name:<24} {seconds * 1000:9.2f} ms"
+                f"  {int(calls):>5} calls  {seconds / wall:6.1%}"
+            )
+        lines.append(f"  {'total wall time':<24} {wall * 1000:9.2f} ms")
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Convert the spans to the Chrome trace event format."""
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - PROCESS_START) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": pid,
+                    "tid": tid,
+                }
+                for name, start, end, tid in self.spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write(self) -> None:
+        """Write the cProfile dump or the Chrome trace, if one was asked for."""
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.output_path)
+        elif self.output_path:
+            with open(self.output_path, "w") as f:
+                json.dump(self.chrome_trace(), f)
+
+
+def mark_imports_done() -> None:
+    """Remember when the CLI modules finished importing."""
+    global _imports_done
+    _imports_done = time.perf_counter()
+
+
+def enable(output_path: str = "") -> Profiler:
+    """Start profiling for the rest of the process."""
+    global _profiler
+    _profiler = Profiler(output_path)
+    if _imports_done is not None:
+        _profiler.spans.append(
+            ("imports", PROCESS_START, _imports_done, threading.get_ident())
+        )
+    return _profiler
+
+
+def disable() -> None:
+    """Stop profiling without reporting anything."""
+    global _profiler
+    _profiler = None
+
+
+def finish() -> None:
+    """Print the breakdown, write the requested output and stop profiling."""
+    profiler = _profiler
+    if profiler is None:
+        return
+    disable()
+    print(profiler.breakdown(), file=sys.stderr)
+    try:
+        profiler.write()
+        if profiler.output_path:
+            print(f"Profile written to: {profiler.output_path}", file=sys.stderr)
+    except OSError as e:
+        print(f"Error writing profile: {e}", file=sys.stderr)
+
+
+def span(name: str):
+    """Time a block when profiling is on, otherwise return a no-op context."""
+    if _profiler is None:
+        return _NO_SPAN
+    return _profiler.span(name)
+
+
+def timed(name: str) -> Callable:
+    """Decorate a function so its calls are recorded as spans."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # A single global check keeps the cost near zero when disabled
+            if _profiler is None:
+                return func(*args, **kwargs)
+            with _profiler.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# Reusable do-nothing context manager for disabled spans
+_NO_SPAN = nullcontext()
@@ -0,0 +1,83 @@
+import os
+import time
+
+
+# This module runs on every shell prompt, so it must only use cheap stdlib modules
+PROMPT_FILE = "prompt_summary.txt"
+PROMPT_FORMAT = "{streak}d {today}x {minutes}m"
+FORMAT_OPTION = "--prompt-format"
+
+
+def prompt_summary(data: dict) -> dict[str, int | str]:
+    """Return the figures shown in a shell prompt, as of today."""
+    today = time.strftime("%Y-%m-%d")
+    return {
+        "date": today,
+        "streak": data["streaks"]["current"],
+        "today": sum(1 for session in data["sessions"] if session["date"] == today),
+        "total_seconds": data["total_time_seconds"],
+    }
+
+
+def write_prompt_summary(config_dir, data: dict) -> None:
+    """Precompute the prompt figures into a file read without the CLI."""
+    from .metrics import write_textfile
+
+    summary = prompt_summary(data)
+    text = "".join(f"{key}\t{value}\n" for key, value in summary.items())
+    write_textfile(config_dir / PROMPT_FILE, text)
+
+
+def read_prompt_summary(config_dir) -> dict[str, int] | None:
+    """Return the prompt figures for today, or None if there is no summary."""
+    try:
+        with open(os.path.join(config_dir, PROMPT_FILE), "r") as f:
+            fields = dict(line.split("\t", 1) for line in f.read().splitlines())
+        summary = {
+            "streak": int(fields["streak"]),
+            "today": int(fields["today"]),
+            "minutes": int(fields["total_seconds"]) // 60,
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+    # Written on an earlier day: nothing was breathed since, so no session
+    # today and, like 'breath stats', no current streak
+    if fields["date"] != time.strftime("%Y-%m-%d"):
+        summary["streak"] = summary["today"] = 0
+    return summary
+
+
+def format_prompt(summary: dict[str, int], template: str = PROMPT_FORMAT) -> str:
+    """Fill a template using {streak}, {today} and {minutes}."""
+    return template.format(**summary)
+
+
+def fast_prompt(args: list[str], config_dir) -> str | None:
+    """Answer 'stats --prompt [--prompt-format TEXT]' from the summary file.
+
+    Returns None for any other command line, or when the summary has to
+    be computed first, so the full CLI handles it.
+    """
+    if args[:1] != ["stats"]:
+        return None
+    template = PROMPT_FORMAT
+    prompt = False
+    rest = args[1:]
+    while rest:
+        arg = rest.pop(0)
+        if arg == "--prompt":
+            prompt = True
+        elif arg == FORMAT_OPTION and rest:
+            template = rest.pop(0)
+        elif arg.startswith(FORMAT_OPTION + "="):
+            template = arg.partition("=")[2]
+        else:
+            return None
+    summary = read_prompt_summary(config_dir) if prompt else None
+    if summary is None:
+        return None
+    try:
+        return format_prompt(summary, template)
+    except (KeyError, IndexError, ValueError):
+        # Let the full CLI report the bad template
+        return None
@@ -0,0 +1,249 @@
+import math
+import shutil
+import sys
+import threading
+import time
+from functools import lru_cache
+from typing import Any, TextIO
+from rich.cells import cell_len
+from rich.color import ColorSystem
+from rich.console import Console
+from rich.style import Style
+from rich.text import Text
+
+
+DEFAULT_FPS = 20
+MIN_FPS = 2
+# Share of a frame interval a draw may take before the frame rate drops
+DRAW_BUDGET = 0.25
+BAR_WIDTH = 40
+# Eighth blocks give the bar 8 steps per cell
+BAR_BLOCKS = " ▏▎▍▌▋▊▉█"
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+CLEAR_TO_END = "\x1b[K"
+RESET = "\x1b[0m"
+# Distinct phase labels and preset descriptions kept parsed
+LABEL_CACHE_SIZE = 4096
+# Unchanged cells rewritten rather than skipped with a cursor move
+RUN_GAP = 6
+COLOR_SYSTEMS = {
+    "standard": ColorSystem.STANDARD,
+    "256": ColorSystem.EIGHT_BIT,
+    "truecolor": ColorSystem.TRUECOLOR,
+    "windows": ColorSystem.WINDOWS,
+}
+
+
+class FrameRate:
+    """A frame rate that backs off when drawing is slow and recovers after.
+
+    Writes to a terminal over a slow link (SSH, a busy tmux) block once
+    the buffers fill up, so the time spent in a draw is a good measure of
+    what the link can take.
+    """
+
+    def __init__(self, target: float = DEFAULT_FPS):
+        """Initialize the frame rate at its target."""
+        self.target = max(target, MIN_FPS)
+        self.fps = self.target
+        self._fast_frames = 0
+
+    @property
+    def interval(self) -> float:
+        """Return the seconds between two frames."""
+        return 1 / self.fps
+
+    def record(self, seconds: float) -> None:
+        """Adapt to the time one draw took."""
+        if seconds > DRAW_BUDGET * self.interval:
+            self.fps = max(self.fps / 2, MIN_FPS)
+            self._fast_frames = 0
+        elif self.fps < self.target and seconds < DRAW_BUDGET * self.interval / 4:
+            # Only speed up again after a second of quick draws
+            self._fast_frames += 1
+            if self._fast_frames >= self.fps:
+                self.fps = min(self.fps * 2, self.target)
+                self._fast_frames = 0
+
+
+@lru_cache(maxsize=LABEL_CACHE_SIZE)
+def phase_label(markup: str) -> Text:
+    """Parse the Rich markup of a phase label, once per distinct label.
+
+    The Text is shared by every caller and must not be modified.
+    """
+    return Text.from_markup(markup)
+
+
+def bar_cells(fraction: float, width: int) -> str:
+    """Return a bar filled to a fraction, with sub-cell precision."""
+    eighths = round(min(max(fraction, 0.0), 1.0) * width * 8)
+    full, part = divmod(eighths, 8)
+    bar = "█" * full
+    if full < width:
+        bar += BAR_BLOCKS[part] + " " * (width - full - 1)
+    return bar
+
+
+class TerminalRenderer:
+    """Draw the session as one animated bar per phase.
+
+    Each frame is compared with what is on screen and only the cells that
+    changed are rewritten, so a frame usually costs a few bytes. Nothing
+    is written when a frame looks like the previous one, and the frame
+    rate drops on its own when writing to the terminal gets slow. Output
+    that is not a terminal gets the final line of each phase only.
+    """
+
+    def __init__(self, fps: float = DEFAULT_FPS, file: TextIO | None = None):
+        """Initialize the renderer with a target frame rate and output."""
+        self.file = file or sys.stdout
+        console = Console(file=self.file)
+        self.is_terminal = console.is_terminal
+        self.color_system = COLOR_SYSTEMS.get(console.color_system or "")
+        self.frame_rate = FrameRate(fps)
+        self._lock = threading.Lock()
+        self._shown: tuple[int, int] | None = None
+        self._cycle: int | None = None
+        self._label: list[tuple[str, str]] = []
+        self._label_width = 0
+        self._bar_style = ""
+        self._styles: dict[str, str] = {}
+        self._width = BAR_WIDTH
+        self._step = 0.0
+        self._key: tuple | None = None
+        self._cells: list[tuple[str, str]] = []
+        self._line = ""
+
+    @property
+    def interval(self) -> float:
+        """Return the seconds to wait before the next frame."""
+        # Waking up faster than the bar can move would draw the same frame
+        return max(self.frame_rate.interval, self._step)
+
+    def _style(self, style: str) -> str:
+        """Return the escape sequence that starts a style, cached."""
+        if style not in self._styles:
+            code = ""
+            if style and self.color_system is not None:
+                rendered = Style.parse(style).render(
+                    "\0", color_system=self.color_system
+                )
+                code = rendered.partition("\0")[0]
+            self._styles[style] = code
+        return self._styles[style]
+
+    def draw(self, frame: dict[str, Any]) -> None:
+        """Draw a snapshot of the session."""
+        with self._lock:
+            if (frame["cycle"], frame["phase"]) != self._shown:
+                self._start_phase(frame)
+            duration = frame["duration"]
+            fraction = frame["elapsed"] / duration if duration else 1.0
+            remaining = math.ceil(duration - frame["elapsed"])
+            bar = bar_cells(fraction, self._width)
+            key = (bar, remaining, frame["paused"])
+            if key == self._key:
+                return
+            self._key = key
+            tail = f" {int(fraction * 100):3d}% {remaining // 60}:{remaining % 60:02d}"
+            cells = self._label + [(" ", "")]
+            cells += [(char, self._bar_style) for char in bar]
+            cells += [(char, "") for char in tail]
+            if frame["paused"]:
+                cells += [(char, "dim") for char in " (paused)"]
+            self._line = "".join(char for char, _ in cells)
+            if self.is_terminal:
+                start = time.perf_counter()
+                self._write_changes(cells)
+                self.frame_rate.record(time.perf_counter() - start)
+
+    def _start_phase(self, frame: dict[str, Any]) -> None:
+        """End the line of the previous phase and lay out the new one."""
+        self._end_line()
+        out = []
+        # Frames can be skipped, so a new cycle is not always seen at phase 0
+        if frame["cycle"] != self._cycle:
+            self._cycle = frame["cycle"]
+            if self.is_terminal:
+                out.append(CLEAR_SCREEN + HIDE_CURSOR)
+            out.append(f"Cycle {frame['cycle'] + 1} of {frame['cycles']}:\n")
+            if frame["keyboard"]:
+                hint = "p pause · r resume · s skip · q quit"
+                out.append(self._style("dim") + hint + RESET + "\n")
+        self.file.write("".join(out))
+        self.file.flush()
+
+        label = phase_label(frame["message"])
+        style = str(label.spans[0].style) if label.spans else ""
+        self._label = [(char, style) for char in label.plain]
+        self._label_width = cell_len(label.plain)
+        self._bar_style = style
+        columns = shutil.get_terminal_size().columns
+        # Room for the label, percentage, time left and the paused marker
+        self._width = max(min(BAR_WIDTH, columns - self._label_width - 22), 10)
+        self._step = frame["duration"] / (self._width * 8)
+        self._shown = (frame["cycle"], frame["phase"])
+        self._key = None
+        self._cells = []
+
+    def _column(self, index: int, cells: list[tuple[str, str]]) -> int:
+        """Return the screen column of a cell."""
+        # The label may hold wide characters, the rest is one cell per char
+        if index <= len(self._label):
+            return cell_len("".join(char for char, _ in cells[:index]))
+        return self._label_width + index - len(self._label)
+
+    def _write_changes(self, cells: list[tuple[str, str]]) -> None:
+        """Rewrite the runs of cells that differ from the ones on screen."""
+        old = self._cells
+        changed = [i for i, cell in enumerate(cells) if i >= len(old) or old[i] != cell]
+        if not changed and len(cells) == len(old):
+            return
+        # Cells between two close changes are cheaper to rewrite than to skip
+        runs: list[list[int]] = []
+        for i in changed:
+            if runs and i - runs[-1][1] <= RUN_GAP:
+                runs[-1][1] = i + 1
+            else:
+                runs.append([i, i + 1])
+        out = []
+        for first, last in runs:
+            column = self._column(first, cells)
+            out.append(f"\r\x1b[{column}C" if column else "\r")
+            # Each run starts and ends with the default style
+            current = ""
+            for char, style in cells[first:last]:
+                if style != current:
+                    out.append(
+                        RESET + self._style(style) if current else self._style(style)
+                    )
+                    current = style
+                out.append(char)
+            if current:
+                out.append(RESET)
+        if len(cells) < len(old):
+            out.append(f"\r\x1b[{self._column(len(cells), cells)}C{CLEAR_TO_END}")
+        self.file.write("".join(out))
+        self.file.flush()
+        self._cells = cells
+
+    def _end_line(self) -> None:
+        """Leave the last frame of a phase on screen and go to the next line."""
+        if self._shown is None:
+            return
+        if not self.is_terminal:
+            self.file.write(self._line)
+        self.file.write("\n")
+        self.file.flush()
+        self._shown = None
+
+    def close(self) -> None:
+        """End the last line and show the cursor again."""
+        with self._lock:
+            self._end_line()
+            if self.is_terminal:
+                self.file.write(SHOW_CURSOR)
+                self.file.flush()
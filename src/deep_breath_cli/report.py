@@ -0,0 +1,393 @@
+import calendar
+import copy
+import html
+import json
+from pathlib import Path
+from typing import Any
+from .journal import JournalTail, read_head
+from .loader import read_fields
+from .metrics import write_textfile
+from .retention import archive_dates
+
+
+MANIFEST_FILE = "manifest.json"
+# Bump when the pages or the manifest change layout, to force a full build
+MANIFEST_VERSION = 1
+FORMATS = ("html", "md")
+# Sessions a day needs to reach each level of the heatmap
+HEAT_LEVELS = (1, 2, 3, 5)
+HEAT_COLORS = ("#ebedf0", "#c6e6f5", "#7fc4e8", "#3a8fc7", "#1d5a8c")
+HEAT_MARKS = ("·", "░", "▒", "▓", "█")
+TREND_WIDTH = 30
+STYLE = """body { font-family: sans-serif; max-width: 50em; margin: 2em auto; }
+table { border-collapse: collapse; }
+td, th { padding: 0.2em 0.6em; text-align: right; }
+.day { width: 2.2em; height: 2.2em; text-align: center; }"""
+
+
+def new_month() -> dict[str, Any]:
+    """Return the empty aggregate of a month."""
+    return {"sessions": 0, "seconds": 0, "patterns": {}, "days": {}}
+
+
+def add_to_month(months: dict[str, dict], session: dict[str, Any]) -> str:
+    """Count a session in the aggregate of its month, return the month."""
+    month, day = session["date"][:7], session["date"][8:10]
+    aggregate = months.setdefault(month, new_month())
+    aggregate["sessions"] += 1
+    aggregate["seconds"] += session["duration_seconds"]
+    patterns = aggregate["patterns"]
+    patterns[session["pattern"]] = patterns.get(session["pattern"], 0) + 1
+    aggregate["days"][day] = aggregate["days"].get(day, 0) + 1
+    return month
+
+
+def month_aggregates(data: dict[str, Any]) -> dict[str, dict]:
+    """Aggregate stats data per month, archived sessions included."""
+    months: dict[str, dict] = {}
+    archive = data.get("archive")
+    if archive:
+        for record in archive["periods"]:
+            aggregate = months.setdefault(record["period"][:7], new_month())
+            aggregate["sessions"] += record["sessions"]
+            aggregate["seconds"] += record["duration_seconds"]
+            for pattern, count in record["patterns_used"].items():
+                patterns = aggregate["patterns"]
+                patterns[pattern] = patterns.get(pattern, 0) + count
+            if "active_days" not in record:
+                day = record["period"][8:10]
+                aggregate["days"][day] = (
+                    aggregate["days"].get(day, 0) + record["sessions"]
+                )
+        # Month records only know which days were active
+        for date in archive_dates(archive):
+            aggregate = months[date[:7]]
+            aggregate["days"].setdefault(date[8:10], 0)
+    for session in data["sessions"]:
+        add_to_month(months, session)
+    return months
+
+
+def heat_level(sessions: int) -> int:
+    """Return the heatmap level (0-4) of a day."""
+    return sum(sessions >= threshold for threshold in HEAT_LEVELS)
+
+
+def _weeks(month: str) -> list[list[int]]:
+    """Return the weeks of a month, Monday first, 0 outside the month."""
+    year, number = (int(part) for part in month.split("-"))
+    return calendar.Calendar().monthdayscalendar(year, number)
+
+
+def _day_level(aggregate: dict[str, Any], day: int) -> int:
+    """Return the level of a day, at least 1 if it was active at all."""
+    key = f"{day:02d}"
+    if key not in aggregate["days"]:
+        return 0
+    return max(heat_level(aggregate["days"][key]), 1)
+
+
+def _patterns(aggregate: dict[str, Any]) -> list[tuple[str, int, float]]:
+    """Return (pattern, sessions, share) rows, most used first."""
+    total = aggregate["sessions"] or 1
+    rows = sorted(aggregate["patterns"].items(), key=lambda item: (-item[1], item[0]))
+    return [(pattern, count, count / total) for pattern, count in rows]
+
+
+def _month_name(month: str) -> str:
+    """Return 'March 2025' for '2025-03'."""
+    year, number = month.split("-")
+    return f"{calendar.month_name[int(number)]} {year}"
+
+
+def _page(title: str, body: str) -> str:
+    """Wrap a body into a standalone HTML page."""
+    return (
+        f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+        f"<title>{html.escape(title)}</title>\n<style>\n{STYLE}\n</style>\n"
+        f"</head>\n<body>\n<h1>{html.escape(title)}</h1>\n{body}</body>\n</html>\n"
+    )
+
+
+def render_month_html(month: str, aggregate: dict[str, Any]) -> str:
+    """Render the page of a month: totals, calendar heatmap and patterns."""
+    out = [
+        f"<p>{aggregate['sessions']} sessions, {aggregate['seconds'] // 60} minutes,"
+        f" {len(aggregate['days'])} active days.</p>\n",
+        '<table class="calendar">\n<tr>',
+    ]
+    out += [f"<th>{name}</th>" for name in calendar.day_abbr]
+    out.append("</tr>\n")
+    for week in _weeks(month):
+        out.append("<tr>")
+        for day in week:
+            if not day:
+                out.append("<td></td>")
+                continue
+            sessions = aggregate["days"].get(f"{day:02d}", 0)
+            color = HEAT_COLORS[_day_level(aggregate, day)]
+            out.append(
+                f'<td class="day" style="background:{color}"'
+                f' title="{sessions} sessions">{day}</td>'
+            )
+        out.append("</tr>\n")
+    out.append("</table>\n<h2>Patterns</h2>\n<table>\n")
+    out.append("<tr><th>Pattern</th><th>Sessions</th><th>Share</th></tr>\n")
+    for pattern, count, share in _patterns(aggregate):
+        out.append(
+            f"<tr><td>{html.escape(pattern)}</td><td>{count}</td>"
+            f"<td>{share:.0%}</td></tr>\n"
+        )
+    out.append('</table>\n<p><a href="../index.html">All months</a></p>\n')
+    return _page(f"Breathing sessions, {_month_name(month)}", "".join(out))
+
+
+def render_month_md(month: str, aggregate: dict[str, Any]) -> str:
+    """Render the Markdown page of a month."""
+    lines = [
+        f"# Breathing sessions, {_month_name(month)}",
+        "",
+        f"{aggregate['sessions']} sessions, {aggregate['seconds'] // 60} minutes,"
+        f" {len(aggregate['days'])} active days.",
+        "",
+        "| " + " | ".join(calendar.day_abbr) + " |",
+        "|" + "---:|" * 7,
+    ]
+    for week in _weeks(month):
+        cells = [
+            f"{day} {HEAT_MARKS[_day_level(aggregate, day)]}" if day else ""
+            for day in week
+        ]
+        lines.append("| " + " | ".join(cells) + " |")
+    lines += [
+        "",
+        "## Patterns",
+        "",
+        "| Pattern | Sessions | Share |",
+        "|---|---:|---:|",
+    ]
+    for pattern, count, share in _patterns(aggregate):
+        lines.append(f"| {pattern} | {count} | {share:.0%} |")
+    lines += ["", "[All months](../index.md)", ""]
+    return "\n".join(lines)
+
+
+def _overall(months: dict[str, dict]) -> dict[str, Any]:
+    """Sum the aggregates of every month."""
+    total = new_month()
+    for aggregate in months.values():
+        total["sessions"] += aggregate["sessions"]
+        total["seconds"] += aggregate["seconds"]
+        for pattern, count in aggregate["patterns"].items():
+            total["patterns"][pattern] = total["patterns"].get(pattern, 0) + count
+    return total
+
+
+def _trend(months: dict[str, dict]) -> list[tuple[str, dict, str]]:
+    """Return (month, aggregate, bar) rows, latest month first."""
+    peak = max((aggregate["sessions"] for aggregate in months.values()), default=0)
+    rows = []
+    for month in sorted(months, reverse=True):
+        aggregate = months[month]
+        width = round(aggregate["sessions"] / peak * TREND_WIDTH) if peak else 0
+        rows.append((month, aggregate, "█" * width))
+    return rows
+
+
+def render_index_html(months: dict[str, dict]) -> str:
+    """Render the index: totals, monthly trend and pattern breakdown."""
+    total = _overall(months)
+    out = [
+        f"<p>{total['sessions']} sessions, {total['seconds'] // 60} minutes"
+        f" over {len(months)} months.</p>\n<h2>Monthly trend</h2>\n<table>\n",
+        "<tr><th>Month</th><th>Sessions</th><th>Minutes</th>"
+        "<th>Active days</th><th></th></tr>\n",
+    ]
+    for month, aggregate, bar in _trend(months):
+        out.append(
+            f'<tr><td><a href="months/{month}.html">{month}</a></td>'
+            f"<td>{aggregate['sessions']}</td><td>{aggregate['seconds'] // 60}</td>"
+            f"<td>{len(aggregate['days'])}</td>"
+            f'<td style="text-align:left">{bar}</td></tr>\n'
+        )
+    out.append("</table>\n<h2>Patterns</h2>\n<table>\n")
+    out.append("<tr><th>Pattern</th><th>Sessions</th><th>Share</th></tr>\n")
+    for pattern, count, share in _patterns(total):
+        out.append(
+            f"<tr><td>{html.escape(pattern)}</td><td>{count}</td>"
+            f"<td>{share:.0%}</td></tr>\n"
+        )
+    out.append("</table>\n")
+    return _page("Breathing report", "".join(out))
+
+
+def render_index_md(months: dict[str, dict]) -> str:
+    """Render the Markdown index."""
+    total = _overall(months)
+    lines = [
+        "# Breathing report",
+        "",
+        f"{total['sessions']} sessions, {total['seconds'] // 60} minutes"
+        f" over {len(months)} months.",
+        "",
+        "## Monthly trend",
+        "",
+        "| Month | Sessions | Minutes | Active days | |",
+        "|---|---:|---:|---:|---|",
+    ]
+    for month, aggregate, bar in _trend(months):
+        lines.append(
+            f"| [{month}](months/{month}.md) | {aggregate['sessions']}"
+            f" | {aggregate['seconds'] // 60} | {len(aggregate['days'])} | {bar} |"
+        )
+    lines += [
+        "",
+        "## Patterns",
+        "",
+        "| Pattern | Sessions | Share |",
+        "|---|---:|---:|",
+    ]
+    for pattern, count, share in _patterns(total):
+        lines.append(f"| {pattern} | {count} | {share:.0%} |")
+    lines.append("")
+    return "\n".join(lines)
+
+
+MONTH_RENDERERS = {"html": render_month_html, "md": render_month_md}
+INDEX_RENDERERS = {"html": render_index_html, "md": render_index_md}
+
+
+class ReportBuilder:
+    """Build a static report and keep it up to date incrementally.
+
+    manifest.json keeps the aggregate of every month and how far the
+    session journal was read. A later build only reads the sessions
+    appended since, and rewrites the pages of the months they fall in
+    plus the index. When the journal was reset (vacuum) or the totals no
+    longer match the stats file, everything is recomputed, but pages are
+    still only rewritten for months whose figures changed.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        config_dir: Path,
+        formats: tuple[str, ...] = FORMATS,
+    ):
+        """Initialize the builder for an output directory."""
+        self.output_dir = output_dir
+        self.stats_file = config_dir / "stats.json"
+        self.journal_file = config_dir / "sessions.log"
+        self.formats = tuple(sorted(formats))
+        self.manifest_file = output_dir / MANIFEST_FILE
+        self.journal_offset = 0
+
+    def _load_manifest(self) -> dict[str, Any] | None:
+        """Return the manifest of the previous build, if it can be reused."""
+        try:
+            with open(self.manifest_file, "r") as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        return manifest
+
+    def _stored_total(self) -> int | None:
+        """Return total_sessions from the stats file, reading only its head."""
+        try:
+            with open(self.stats_file, "r") as f:
+                fields = read_fields(f)
+        except OSError:
+            return None
+        return fields.get("total_sessions") if fields else None
+
+    def _update(self, manifest: dict[str, Any]) -> tuple[dict, set[str]] | None:
+        """Apply the journal since the last build, None if it cannot be trusted."""
+        tail = JournalTail(
+            self.journal_file, manifest["journal_offset"], manifest["journal_head"]
+        )
+        sessions = tail.poll()
+        if sessions is None:
+            return None
+        months = copy.deepcopy(manifest["months"])
+        changed = {add_to_month(months, session) for session in sessions}
+        total = sum(aggregate["sessions"] for aggregate in months.values())
+        if total != self._stored_total():
+            return None
+        self.journal_offset = tail.offset
+        return months, changed
+
+    def _rebuild(self, previous: dict[str, dict]) -> tuple[dict, set[str]]:
+        """Aggregate every session again, return the months that changed."""
+        from .stats import StatsManager
+
+        # Taken first: sessions saved meanwhile, or a line being written,
+        # make the next totals check fail
+        self.journal_offset = self._journal_size()
+        months = month_aggregates(StatsManager().data)
+        changed = set()
+        for month, aggregate in months.items():
+            old = previous.get(month)
+            if old == aggregate:
+                continue
+            # Archiving a month keeps its figures but forgets daily counts
+            if (
+                old is not None
+                and (old["sessions"], old["seconds"], old["patterns"])
+                == (aggregate["sessions"], aggregate["seconds"], aggregate["patterns"])
+                and old["days"].keys() == aggregate["days"].keys()
+            ):
+                months[month] = old
+                continue
+            changed.add(month)
+        return months, changed
+
+    def _journal_size(self) -> int:
+        """Return the size of the journal in bytes."""
+        try:
+            return self.journal_file.stat().st_size
+        except OSError:
+            return 0
+
+    def build(self, full: bool = False) -> dict[str, Any]:
+        """Bring the report up to date, return what was done."""
+        manifest = None if full else self._load_manifest()
+        update = None
+        if manifest is not None and manifest["formats"] == list(self.formats):
+            update = self._update(manifest)
+        if update is not None:
+            months, changed = update
+            rebuilt = False
+        else:
+            previous = manifest["months"] if manifest and not full else {}
+            months, changed = self._rebuild(previous)
+            # Pages of another format, or from a forced build, are all rewritten
+            if manifest is None or manifest["formats"] != list(self.formats):
+                changed = set(months)
+            rebuilt = True
+
+        (self.output_dir / "months").mkdir(parents=True, exist_ok=True)
+        for month in sorted(changed):
+            for fmt in self.formats:
+                page = MONTH_RENDERERS[fmt](month, months[month])
+                write_textfile(self.output_dir / "months" / f"{month}.{fmt}", page)
+        if changed or manifest is None:
+            for fmt in self.formats:
+                write_textfile(
+                    self.output_dir / f"index.{fmt}", INDEX_RENDERERS[fmt](months)
+                )
+        write_textfile(
+            self.manifest_file,
+            json.dumps(
+                {
+                    "version": MANIFEST_VERSION,
+                    "formats": list(self.formats),
+                    "journal_offset": self.journal_offset,
+                    "journal_head": read_head(self.journal_file),
+                    "months": months,
+                },
+                separators=(",", ":"),
+            ),
+        )
+        return {"rebuilt": rebuilt, "written": sorted(changed), "months": len(months)}
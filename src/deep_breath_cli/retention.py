@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+
+GRANULARITIES = ("day", "month")
+DEFAULT_RETENTION = {"keep_days": 365, "granularity": "day"}
+# The 7-day chart and the current streak always need raw sessions
+MIN_KEEP_DAYS = 7
+
+
+def retention_policy(data: dict[str, Any]) -> dict[str, Any]:
+    """Return the retention policy of a stats file, with defaults filled in."""
+    return DEFAULT_RETENTION | data.get("retention", {})
+
+
+def retention_cutoff(keep_days: int) -> str:
+    """Return the first date whose sessions are kept raw."""
+    return (datetime.now().date() - timedelta(days=keep_days - 1)).strftime("%Y-%m-%d")
+
+
+def period_of(date: str, granularity: str) -> str:
+    """Return the archive period of a date: the date itself or its month."""
+    return date if granularity == "day" else date[:7]
+
+
+def new_period(period: str) -> dict[str, Any]:
+    """Return an empty archive record for a day (YYYY-MM-DD) or month (YYYY-MM)."""
+    record = {"period": period, "sessions": 0, "duration_seconds": 0}
+    record["patterns_used"] = {}
+    if len(period) == 7:
+        # Bit n-1 is set when day n of the month had sessions
+        record["active_days"] = 0
+    return record
+
+
+def add_to_period(record: dict[str, Any], session: dict[str, Any]) -> None:
+    """Count one session in an archive record."""
+    record["sessions"] += 1
+    record["duration_seconds"] += session["duration_seconds"]
+    patterns_used = record["patterns_used"]
+    patterns_used[session["pattern"]] = patterns_used.get(session["pattern"], 0) + 1
+    if "active_days" in record:
+        record["active_days"] |= 1 << (int(session["date"][8:10]) - 1)
+
+
+def merge_period(target: dict[str, Any], record: dict[str, Any]) -> None:
+    """Add an archive record into another one of the same or a wider period."""
+    target["sessions"] += record["sessions"]
+    target["duration_seconds"] += record["duration_seconds"]
+    for pattern, count in record["patterns_used"].items():
+        target["patterns_used"][pattern] = (
+            target["patterns_used"].get(pattern, 0) + count
+        )
+    if "active_days" in target:
+        if "active_days" in record:
+            target["active_days"] |= record["active_days"]
+        else:
+            target["active_days"] |= 1 << (int(record["period"][8:10]) - 1)
+
+
+def merge_periods(
+    periods: list[dict[str, Any]], granularity: str = "day", before: str = ""
+) -> list[dict[str, Any]]:
+    """Sum records of the same period, sorted by period.
+
+    With the month granularity, day records dated before the given date are
+    folded into their month.
+    """
+    merged: dict[str, dict[str, Any]] = {}
+    for record in periods:
+        period = record["period"]
+        if granularity == "month" and len(period) == 10 and period < before:
+            period = period[:7]
+        if period not in merged:
+            merged[period] = new_period(period)
+        merge_period(merged[period], record)
+    return [merged[period] for period in sorted(merged)]
+
+
+def archive_dates(archive: dict[str, Any]) -> set[str]:
+    """Return every date with archived sessions."""
+    dates = set()
+    for record in archive["periods"]:
+        if "active_days" not in record:
+            dates.add(record["period"])
+            continue
+        for day in range(31):
+            if record["active_days"] >> day & 1:
+                dates.add(f"{record['period']}-{day + 1:02d}")
+    return dates
+
+
+def archive_daily(archive: dict[str, Any]) -> dict[str, int]:
+    """Return the session count of each archived day.
+
+    Month records only know which days were active, so they are left out.
+    """
+    return {
+        record["period"]: record["sessions"]
+        for record in archive["periods"]
+        if "active_days" not in record
+    }
+
+
+def archive_monthly(archive: dict[str, Any]) -> dict[str, int]:
+    """Return the number of archived sessions per month."""
+    monthly: dict[str, int] = {}
+    for record in archive["periods"]:
+        month = record["period"][:7]
+        monthly[month] = monthly.get(month, 0) + record["sessions"]
+    return monthly
+
+
+def archive_totals(archive: dict[str, Any]) -> dict[str, Any]:
+    """Return the session count, time and pattern usage of the archive."""
+    totals: dict[str, Any] = {
+        "total_sessions": 0,
+        "total_time_seconds": 0,
+        "patterns_used": {},
+    }
+    for record in archive["periods"]:
+        totals["total_sessions"] += record["sessions"]
+        totals["total_time_seconds"] += record["duration_seconds"]
+        for pattern, count in record["patterns_used"].items():
+            patterns_used = totals["patterns_used"]
+            patterns_used[pattern] = patterns_used.get(pattern, 0) + count
+    return totals
@@ -0,0 +1,138 @@
+import math
+from typing import Any
+
+
+# Quantiles are within 1% of a recorded duration
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+QUANTILES = (50, 90, 99)
+
+
+def new_sketch() -> dict[str, Any]:
+    """Return an empty duration sketch.
+
+    Durations fall in logarithmic bins, bin i holding the values in
+    (GAMMA^(i-1), GAMMA^i], so the sketch stays small however many values
+    it counts, and two sketches merge by adding their bins. Bin keys are
+    strings so the sketch goes through JSON unchanged.
+    """
+    return {"zero": 0, "bins": {}}
+
+
+def add_to_sketch(sketch: dict[str, Any], value: float, count: int = 1) -> None:
+    """Count a value in the sketch."""
+    if value <= 0:
+        sketch["zero"] += count
+        return
+    key = str(math.ceil(math.log(value) / LOG_GAMMA))
+    sketch["bins"][key] = sketch["bins"].get(key, 0) + count
+
+
+def merge_sketch(target: dict[str, Any], sketch: dict[str, Any]) -> None:
+    """Add the counts of a sketch into another one."""
+    target["zero"] += sketch["zero"]
+    bins = target["bins"]
+    for key, count in sketch["bins"].items():
+        bins[key] = bins.get(key, 0) + count
+
+
+def sketch_quantile(sketch: dict[str, Any], q: float) -> float | None:
+    """Return the q-th percentile (0-100) of the values, None if empty."""
+    total = sketch["zero"] + sum(sketch["bins"].values())
+    if total == 0:
+        return None
+    rank = q / 100 * (total - 1)
+    seen = sketch["zero"]
+    if seen > rank:
+        return 0.0
+    for key in sorted(sketch["bins"], key=int):
+        seen += sketch["bins"][key]
+        if seen > rank:
+            # The value with the same relative error to both ends of the bin
+            return 2 * GAMMA ** int(key) / (GAMMA + 1)
+    return 2 * GAMMA ** int(max(sketch["bins"], key=int)) / (GAMMA + 1)
+
+
+def new_pattern_stats() -> dict[str, Any]:
+    """Return the running aggregates of one pattern."""
+    return {"sessions": 0, "seconds": 0, "cycles": 0, "durations": new_sketch()}
+
+
+def add_to_pattern_stats(pattern_stats: dict[str, Any], session: dict) -> None:
+    """Count one session in the aggregates of its pattern."""
+    pattern = session["pattern"]
+    if pattern not in pattern_stats:
+        pattern_stats[pattern] = new_pattern_stats()
+    record = pattern_stats[pattern]
+    record["sessions"] += 1
+    record["seconds"] += session["duration_seconds"]
+    record["cycles"] += session.get("cycles", 0)
+    add_to_sketch(record["durations"], session["duration_seconds"])
+
+
+def merge_pattern_stats(target: dict[str, Any], pattern_stats: dict[str, Any]) -> None:
+    """Add per-pattern aggregates, from another file or machine, into target."""
+    for pattern, record in pattern_stats.items():
+        if pattern not in target:
+            target[pattern] = new_pattern_stats()
+        merged = target[pattern]
+        for key in ("sessions", "seconds", "cycles"):
+            merged[key] += record[key]
+        merge_sketch(merged["durations"], record["durations"])
+
+
+def build_pattern_stats(sessions: list[dict[str, Any]]) -> dict[str, Any]:
+    """Compute the per-pattern aggregates in a single pass over sessions."""
+    pattern_stats: dict[str, Any] = {}
+    for session in sessions:
+        add_to_pattern_stats(pattern_stats, session)
+    return pattern_stats
+
+
+def format_pattern_stats(
+    pattern_stats: dict[str, Any], patterns_used: dict[str, int] | None = None
+) -> str:
+    """Format the aggregates as a table, one row per pattern.
+
+    Sessions counted in patterns_used but not in the aggregates (archived
+    before they existed) are mentioned under the table.
+    """
+    if not pattern_stats:
+        return "No breathing sessions recorded yet."
+    headers = ["Pattern", "Sessions", "Avg cycles", "Total time"]
+    headers += [f"p{q}" for q in QUANTILES]
+    rows = []
+    for pattern, record in sorted(
+        pattern_stats.items(), key=lambda item: item[1]["sessions"], reverse=True
+    ):
+        sessions = record["sessions"]
+        minutes = record["seconds"] // 60
+        total = (
+            f"{minutes // 60}h {minutes % 60}min" if minutes >= 60 else f"{minutes} min"
+        )
+        quantiles = [sketch_quantile(record["durations"], q) for q in QUANTILES]
+        rows.append(
+            [pattern, str(sessions), f"{record['cycles'] / sessions:.1f}", total]
+            + ["-" if value is None else f"{value:.0f}s" for value in quantiles]
+        )
+    widths = [max(len(row[i]) for row in rows + [headers]) for i in range(len(headers))]
+
+    def line(cells: list[str]) -> str:
+        first = cells[0].ljust(widths[0])
+        rest = "  ".join(
+            cell.rjust(width) for cell, width in zip(cells[1:], widths[1:])
+        )
+        return f"  {first}  {rest}"
+
+    lines = ["Pattern Stats", line(headers)] + [line(row) for row in rows]
+    if patterns_used is not None:
+        unmeasured = sum(patterns_used.values()) - sum(
+            record["sessions"] for record in pattern_stats.values()
+        )
+        if unmeasured > 0:
+            lines.append(
+                f"\n{unmeasured} sessions archived before pattern stats existed "
+                "are left out."
+            )
+    return "\n".join(lines)
@@ -1,78 +1,540 @@
+import contextlib
+import copy
 import json
+import time
 import plotext as plt
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Any
+from typing import TYPE_CHECKING, Any
+from .importer import SessionReader, validate_session
+from .index import SessionIndex, assign_ids, day_timestamp, new_session_id
+from .journal import SessionJournal
+from .loader import SessionStream, read_fields
+from .merge import longest_streak
+from .metrics import MetricsExporter
+from .profiling import timed
+from .prompt import write_prompt_summary
+from .sketch import (
+    add_to_pattern_stats,
+    build_pattern_stats,
+    format_pattern_stats,
+    merge_pattern_stats,
+)
+from .retention import (
+    GRANULARITIES,
+    MIN_KEEP_DAYS,
+    add_to_period,
+    archive_dates,
+    archive_monthly,
+    archive_totals,
+    merge_periods,
+    new_period,
+    period_of,
+    retention_cutoff,
+    retention_policy,
+)
+
+if TYPE_CHECKING:
+    from .context import AppContext
+
+
+STATS_FILE = "stats.json"
+# Held while stats are updated, so processes recording at once lose nothing
+LOCK_FILE = "stats.lock"
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def dump_fields(data: dict[str, Any]) -> list[str]:
+    """Format every top-level field but the sessions, one indented entry each."""
+    lines = []
+    for key, value in data.items():
+        if key == "sessions":
+            continue
+        encoded = json.dumps(value, indent=2).replace("\n", "\n  ")
+        lines.append(f"  {json.dumps(key)}: {encoded}")
+    return lines
+
+
+def dump_stats(data: dict[str, Any]) -> str:
+    """Serialize stats as indented JSON with one session per line.
+
+    json.dump with indent falls back to the pure Python encoder, which is far
+    too slow for large session lists. Sessions are encoded with the C encoder
+    instead, and keeping one per line leaves the file easy to read and diff.
+    """
+    encode = json.JSONEncoder().encode
+    lines = dump_fields(data)
+    sessions = ",\n".join(f"    {encode(session)}" for session in data["sessions"])
+    lines.append(
+        f'  "sessions": [\n{sessions}\n  ]' if sessions else '  "sessions": []'
+    )
+    return "{\n" + ",\n".join(lines) + "\n}\n"
+
+
+def fill_timestamps(session: dict[str, Any]) -> bool:
+    """Give a date-only session approximate start and end times.
+
+    The start is the beginning of its day, and the session is flagged as
+    approximate so it is left out of hour-of-day analytics.
+    """
+    if "start" in session:
+        return False
+    session["start"] = day_timestamp(session["date"])
+    session["end"] = session["start"] + session["duration_seconds"]
+    session["approximate"] = True
+    return True
+
+
+def empty_time_rollups() -> dict[str, list[int]]:
+    """Return zeroed hour-of-day and day-of-week session counters."""
+    return {"by_hour": [0] * 24, "by_weekday": [0] * 7}
+
+
+def add_to_time_rollups(rollups: dict[str, list[int]], session: dict) -> None:
+    """Count one session in the hour and weekday buckets."""
+    moment = datetime.fromtimestamp(session["start"])
+    rollups["by_weekday"][moment.weekday()] += 1
+    if not session.get("approximate"):
+        rollups["by_hour"][moment.hour] += 1
+
+
+def empty_archive() -> dict[str, Any]:
+    """Return an archive with no compacted sessions yet.
+
+    periods holds the per-day or per-month records, rollups the hour and
+    weekday buckets of the archived sessions, pattern_stats their per-pattern
+    aggregates, and indexed how many of their ids are still in the session
+    index.
+    """
+    return {
+        "periods": [],
+        "rollups": empty_time_rollups(),
+        "pattern_stats": {},
+        "indexed": 0,
+    }
+
+
+def build_time_rollups(sessions: list[dict[str, Any]]) -> dict[str, list[int]]:
+    """Compute the hour and weekday buckets in a single pass over start times."""
+    rollups = empty_time_rollups()
+    for session in sessions:
+        add_to_time_rollups(rollups, session)
+    return rollups
 
 
 class StatsManager:
-    def __init__(self):
-        """Initialize the stats manager and load existing stats."""
-        self.config_dir = Path.home() / ".config" / "deep-breath-cli"
-        self.stats_file = self.config_dir / "stats.json"
+    def __init__(self, context: "AppContext | None" = None):
+        """Initialize the stats manager and load existing stats.
+
+        Without a context, the one of the process is used.
+        """
+        if context is None:
+            from .context import get_context
+
+            context = get_context()
+        self.config_dir = context.config_dir
+        self.storage = context.storage
+        self.stats_file = self.storage.path(STATS_FILE)
+        self.index = SessionIndex(self.config_dir / "sessions.idx", self.storage)
+        self.journal = SessionJournal(self.config_dir / "sessions.log", self.storage)
+        self.metrics = MetricsExporter.from_env(self.config_dir)
         self.data = self._load_stats()
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Bring stats written by older versions up to the current format."""
+        changed = False
+        for session in self.data["sessions"]:
+            changed |= fill_timestamps(session)
+        # Give legacy sessions a stable id so imports and merges can skip them
+        changed |= bool(assign_ids(self.data["sessions"]))
+        if "rollups" not in self.data:
+            rollups = build_time_rollups(self.data["sessions"])
+            if "archive" in self.data:
+                for key, counts in self.data["archive"]["rollups"].items():
+                    rollups[key] = [a + b for a, b in zip(rollups[key], counts)]
+            self.data["rollups"] = rollups
+            changed = True
+        if "pattern_stats" not in self.data:
+            # Sessions archived before then were not measured, and stay out
+            pattern_stats = build_pattern_stats(self.data["sessions"])
+            if "archive" in self.data:
+                merge_pattern_stats(
+                    pattern_stats, self.data["archive"].get("pattern_stats", {})
+                )
+            self.data["pattern_stats"] = pattern_stats
+            changed = True
+        if changed:
+            self._save_stats()
 
+    @timed("stats.load")
     def _load_stats(self) -> dict[str, Any]:
         """Load stats from JSON file or create default structure."""
-        if not self.stats_file.exists():
-            print("Stats file not found, creating default stats.")
-            self.config_dir.mkdir(parents=True, exist_ok=True)
-            default_data = {
-                "total_sessions": 0,
-                "total_time_seconds": 0,
-                "patterns_used": {"4-7-8": 0, "4-4-4-4": 0},
-                "sessions": [],
-                "streaks": {"current": 0, "longest": 0},
-            }
-            # Save default data
-            with open(self.stats_file, "w") as f:
-                json.dump(default_data, f, indent=2)
-            return default_data
+        # Stamped before reading: a save in between only causes a reload
+        self._stamp = self.storage.stamp(STATS_FILE)
+        if self._stamp is None:
+            with self.storage.lock(LOCK_FILE):
+                if not self.storage.exists(STATS_FILE):
+                    print("Stats file not found, creating default stats.")
+                    default_data = {
+                        "total_sessions": 0,
+                        "total_time_seconds": 0,
+                        "patterns_used": {"4-7-8": 0, "4-4-4-4": 0},
+                        "sessions": [],
+                        "streaks": {"current": 0, "longest": 0},
+                        "rollups": empty_time_rollups(),
+                        "pattern_stats": {},
+                    }
+                    # Save default data
+                    self.storage.write_text(
+                        STATS_FILE, json.dumps(default_data, indent=2)
+                    )
+                    self._stamp = self.storage.stamp(STATS_FILE)
+                    return default_data
+            # Created by another process in the meantime
+            return self._load_stats()
         else:
             # Load existing stats
             try:
-                with open(self.stats_file, "r") as f:
+                with self.storage.open(STATS_FILE, "r") as f:
                     return json.load(f)
             except (json.JSONDecodeError, IOError) as e:
-                print(f"Error loading stats file: {e}")
-                print("Creating fresh stats file.")
-                # Recreate the stats file if there's an error
-                return self._load_stats()
+                with self.storage.lock(LOCK_FILE):
+                    if self.storage.stamp(STATS_FILE) != self._stamp:
+                        # Saved or recovered by another process meanwhile
+                        return self._load_stats()
+                    print(f"Error loading stats file: {e}")
+                    return self._recover_stats()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Hold the stats lock for an update, with up-to-date data.
+
+        Another process may have saved since the data was read: it is then
+        loaded again, so that no session recorded elsewhere is overwritten.
+        """
+        with self.storage.lock(LOCK_FILE):
+            if self.storage.stamp(STATS_FILE) != self._stamp:
+                self.data = self._load_stats()
+                self._migrate()
+                # The other process indexed its sessions too
+                self.index = SessionIndex(
+                    self.config_dir / "sessions.idx", self.storage
+                )
+            yield
+
+    def _recover_stats(self) -> dict[str, Any]:
+        """Rebuild stats from the sessions that can still be read.
+
+        The damaged file is kept next to the new one, and every session up to
+        the corruption point is streamed out of it and recorded again.
+        """
+        self.data = {
+            "total_sessions": 0,
+            "total_time_seconds": 0,
+            "patterns_used": {"4-7-8": 0, "4-4-4-4": 0},
+            "sessions": [],
+            "streaks": {"current": 0, "longest": 0},
+            "rollups": empty_time_rollups(),
+            "pattern_stats": {},
+        }
+        try:
+            with self.storage.open(STATS_FILE, "r", errors="replace") as f:
+                # The archive is written before the sessions, usually intact
+                fields = read_fields(f) or {}
+                f.seek(0)
+                stream = SessionStream(f)
+                for raw in stream:
+                    session = validate_session(raw)
+                    if session is not None:
+                        self._record_session(session)
+            self.storage.replace(STATS_FILE, STATS_FILE + ".corrupt")
+            backup_file = self.storage.path(STATS_FILE + ".corrupt")
+        except IOError as e:
+            print(f"Error reading stats file: {e}")
+            return self.data
+
+        print(
+            f"Recovered {self.data['total_sessions']} sessions, damaged file kept as: {backup_file}"
+        )
+        if isinstance(fields.get("retention"), dict):
+            self.data["retention"] = fields["retention"]
+        if isinstance(fields.get("archive"), dict):
+            self._restore_archive(fields["archive"])
+        self.data["streaks"]["longest"] = longest_streak(self._active_dates())
+        self._update_streaks()
+        self._save_stats()
+        return self.data
 
+    def _restore_archive(self, archive: dict[str, Any]) -> None:
+        """Count the sessions of a recovered archive in the totals."""
+        try:
+            totals = archive_totals(archive)
+            rollups = {
+                key: [a + b for a, b in zip(self.data["rollups"][key], counts)]
+                for key, counts in archive["rollups"].items()
+            }
+            pattern_stats = {}
+            merge_pattern_stats(pattern_stats, self.data["pattern_stats"])
+            merge_pattern_stats(pattern_stats, archive.get("pattern_stats", {}))
+        except (KeyError, TypeError, AttributeError) as e:
+            print(f"Error recovering session archive: {e}")
+            return
+        self.data["total_sessions"] += totals["total_sessions"]
+        self.data["total_time_seconds"] += totals["total_time_seconds"]
+        for pattern, count in totals["patterns_used"].items():
+            patterns_used = self.data["patterns_used"]
+            patterns_used[pattern] = patterns_used.get(pattern, 0) + count
+        self.data["rollups"] = rollups
+        self.data["pattern_stats"] = pattern_stats
+        # The rewritten index only has the recovered raw sessions
+        self.data["archive"] = archive | {"indexed": 0}
+
+    @timed("stats.save")
     def _save_stats(self) -> None:
         """Save current stats to JSON file."""
         try:
-            with open(self.stats_file, "w") as f:
-                json.dump(self.data, f, indent=2)
+            self.storage.write_text(STATS_FILE, dump_stats(self.data))
+            self._stamp = self.storage.stamp(STATS_FILE)
         except IOError as e:
             print(f"Error saving stats file: {e}")
-
-    def add_session(self, pattern: str, cycles: int, duration_seconds: int) -> None:
-        """Add a completed breathing session to stats."""
-        # Add session data to the sessions list
-        session = {
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "pattern": pattern,
-            "cycles": cycles,
-            "duration_seconds": duration_seconds,
-        }
+            return
+        if not self.storage.persistent:
+            return
+        try:
+            write_prompt_summary(self.config_dir, self.data)
+        except OSError as e:
+            print(f"Error saving prompt summary: {e}")
+
+    def _get_index(self) -> SessionIndex:
+        """Return the session index, rebuilding it if it drifted from the data.
+
+        The ids of archived sessions stay in the index so they are never
+        imported again, and the archive keeps count of them.
+        """
+        archive = self.data.get("archive")
+        archived = archive["indexed"] if archive else 0
+        if self.index.is_stale(len(self.data["sessions"]) + archived):
+            self.index.rebuild(session["id"] for session in self.data["sessions"])
+            if archive:
+                archive["indexed"] = 0
+        return self.index
+
+    def _active_dates(self) -> set[str]:
+        """Return every date with sessions, raw or archived."""
+        dates = {session["date"] for session in self.data["sessions"]}
+        if "archive" in self.data:
+            dates |= archive_dates(self.data["archive"])
+        return dates
+
+    def _record_session(self, session: dict[str, Any]) -> None:
+        """Append a session and update the running totals."""
+        fill_timestamps(session)
         self.data["sessions"].append(session)
         # Increment total sessions and time
         self.data["total_sessions"] += 1
-        self.data["total_time_seconds"] += duration_seconds
+        self.data["total_time_seconds"] += session["duration_seconds"]
         # Increment pattern usage
-        # self.data["patterns_used"][pattern] = self.data["patterns_used"].get(pattern, 0) + 1
+        pattern = session["pattern"]
         if pattern in self.data["patterns_used"]:
             self.data["patterns_used"][pattern] += 1
         else:
             self.data["patterns_used"][pattern] = 1
-        # Update streaks
+        add_to_time_rollups(self.data["rollups"], session)
+        add_to_pattern_stats(self.data["pattern_stats"], session)
+
+    def _update_streaks(self) -> None:
+        """Recalculate the current streak and keep the longest one."""
         current_streak = self._calculate_streak()
         self.data["streaks"]["current"] = current_streak
         if current_streak > self.data["streaks"]["longest"]:
             self.data["streaks"]["longest"] = current_streak
-        # Save updated stats
+
+    def add_session(
+        self,
+        pattern: str,
+        cycles: int,
+        duration_seconds: int,
+        started_at: int | None = None,
+        ended_at: int | None = None,
+    ) -> None:
+        """Add a completed breathing session to stats.
+
+        Start and end times are epoch seconds; when they are not given the
+        session is assumed to have just ended.
+        """
+        # Timing drift is only known when the caller measured the session
+        timed = started_at is not None and ended_at is not None
+        if ended_at is None:
+            ended_at = int(time.time())
+        if started_at is None:
+            started_at = ended_at - duration_seconds
+        # Add session data to the sessions list
+        session = {
+            "date": datetime.fromtimestamp(started_at).strftime("%Y-%m-%d"),
+            "start": started_at,
+            "end": ended_at,
+            "pattern": pattern,
+            "cycles": cycles,
+            "duration_seconds": duration_seconds,
+        }
+        session["id"] = new_session_id(session)
+        with self._transaction():
+            index = self._get_index()
+            index.add(session["id"])
+            self._record_session(session)
+            # Update streaks
+            self._update_streaks()
+            # Save updated stats
+            self._save_stats()
+            index.flush()
+            self.journal.append([session])
+            if self.metrics is not None:
+                drift = ended_at - started_at - duration_seconds if timed else None
+                self.metrics.record_stats(self.data, drift)
+
+    def _add_batch(self, sessions: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Record the sessions whose id is not indexed yet, without saving."""
+        assign_ids(sessions)
+        index = self._get_index()
+        added = []
+        for session in sessions:
+            if not index.add(session["id"]):
+                continue
+            self._record_session(session)
+            added.append(session)
+        return added
+
+    def _snapshot(self) -> tuple[dict[str, Any], int, int]:
+        """Capture the data and the index before batches that may fail.
+
+        Sessions are only ever appended, so their count is enough.
+        """
+        mark = self._get_index().mark()
+        fields = {
+            key: copy.deepcopy(value)
+            for key, value in self.data.items()
+            if key != "sessions"
+        }
+        return fields, len(self.data["sessions"]), mark
+
+    def _restore(self, snapshot: tuple[dict[str, Any], int, int]) -> None:
+        """Go back to the data and the index captured by _snapshot."""
+        fields, count, mark = snapshot
+        sessions = self.data["sessions"]
+        del sessions[count:]
+        self.data.clear()
+        self.data.update(fields, sessions=sessions)
+        self.index.rollback(mark)
+
+    def _commit_batch(self, sessions: list[dict[str, Any]]) -> None:
+        """Update streaks and write the stats, the index and the journal once."""
+        self._update_streaks()
         self._save_stats()
+        self.index.flush()
+        self.journal.append(sessions)
+        if self.metrics is not None:
+            self.metrics.record_stats(self.data)
+
+    def add_sessions(self, sessions: list[dict[str, Any]]) -> int:
+        """Add many sessions in one batch, skipping those already recorded.
+
+        Returns the number of sessions actually added, so importing or
+        merging the same data twice is a no-op the second time.
+        """
+        with self._transaction():
+            added = self._add_batch(sessions)
+            if added:
+                self._commit_batch(added)
+        return len(added)
+
+    def import_stats(self, input_path: str, format: str = "") -> int:
+        """Import sessions from a JSON, CSV or NDJSON export (optionally .gz)."""
+        path = Path(input_path)
+        if not path.exists():
+            print(f"File not found: {input_path}")
+            return 0
+
+        with self._transaction():
+            snapshot = self._snapshot()
+            try:
+                reader = SessionReader(path, format)
+                added: list[dict[str, Any]] = []
+                read = 0
+                # Rows are streamed in batches, the file is written only once
+                for batch in reader.batches():
+                    read += len(batch)
+                    added.extend(self._add_batch(batch))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # All or nothing: the batches already applied are undone
+                self._restore(snapshot)
+                print(f"Error importing stats: {e}")
+                return 0
+
+            if added:
+                self._commit_batch(added)
+
+        print(f"Imported {len(added)} sessions from: {input_path}")
+        if read - len(added):
+            print(f"Skipped {read - len(added)} sessions already recorded.")
+        if reader.invalid_rows:
+            print(f"Skipped {reader.invalid_rows} invalid rows:")
+            for error in reader.errors:
+                print(f"  {error}")
+        return len(added)
+
+    def vacuum(self, keep_days: int | None = None, granularity: str = "") -> int:
+        """Compact sessions older than the retention period into the archive.
+
+        A given keep_days or granularity becomes the stored retention policy.
+        Totals, patterns, rollups and streaks are unchanged: archived sessions
+        are summed into per-day or per-month records that keep feeding them.
+        Returns the number of sessions compacted.
+        """
+        with self._transaction():
+            policy = retention_policy(self.data)
+            if keep_days is not None or granularity:
+                policy["keep_days"] = (
+                    keep_days if keep_days is not None else policy["keep_days"]
+                )
+                policy["granularity"] = granularity or policy["granularity"]
+                if policy["keep_days"] < MIN_KEEP_DAYS:
+                    raise ValueError(f"keep at least {MIN_KEEP_DAYS} days of sessions")
+                if policy["granularity"] not in GRANULARITIES:
+                    raise ValueError(
+                        f"granularity must be one of {', '.join(GRANULARITIES)}"
+                    )
+                self.data["retention"] = policy
+
+            cutoff = retention_cutoff(policy["keep_days"])
+            # Make sure every archived id ends up in the index before counting them
+            index = self._get_index()
+            archive = self.data.setdefault("archive", empty_archive())
+            periods = {record["period"]: record for record in archive["periods"]}
+            kept = []
+            for session in self.data["sessions"]:
+                if session["date"] >= cutoff:
+                    kept.append(session)
+                    continue
+                period = period_of(session["date"], policy["granularity"])
+                if period not in periods:
+                    periods[period] = new_period(period)
+                add_to_period(periods[period], session)
+                add_to_time_rollups(archive["rollups"], session)
+                # Kept so that fsck can still account for the pattern stats
+                add_to_pattern_stats(archive.setdefault("pattern_stats", {}), session)
+            compacted = len(self.data["sessions"]) - len(kept)
+
+            archive["periods"] = merge_periods(
+                list(periods.values()), policy["granularity"], cutoff
+            )
+            archive["indexed"] += compacted
+            self.data["sessions"] = kept
+            self._save_stats()
+            index.flush()
+            # The journal only exists for tailing, the sessions are safe in the file
+            self.journal.truncate()
+        return compacted
 
     def get_display_stats(self) -> str:
         """Format stats for display in terminal."""
@@ -103,15 +565,16 @@ class StatsManager:
             Total sessions: {self.data["total_sessions"]}
             Total time: {time_display}
             Favorite pattern: {favorite_pattern} ({favorite_count} sessions)
-            Current streak: {self.data["streaks"]["current"]} days (Longest: {self.data["streaks"]["longest"]} days)"""
+            Current streak: {self._calculate_streak()} days (Longest: {self.data["streaks"]["longest"]} days)"""
 
+    @timed("stats.streak")
     def _calculate_streak(self) -> int:
         """Calculate current streak of consecutive days."""
         if not self.data["sessions"]:
             return 0  # No sessions means no streak
 
-        # Get the unique dates from sessions
-        session_dates = set(session["date"] for session in self.data["sessions"])
+        # Get the unique dates from sessions, archived ones included
+        session_dates = self._active_dates()
 
         # Check if the last session was today
         today = datetime.now().date()
@@ -126,27 +589,26 @@ class StatsManager:
 
         return streak
 
-    def _generate_sessions_chart(self) -> str:
-        """Generate ASCII chart of sessions in last 7 days."""
+    @timed("stats.render")
+    def _generate_sessions_chart(self, daily: dict[str, int] | None = None) -> str:
+        """Generate ASCII chart of sessions in last 7 days.
+
+        Callers that already keep per-day counts can pass them in to avoid a
+        scan of every session.
+        """
+        if daily is None:
+            daily = {}
+            for session in self.data["sessions"]:
+                daily[session["date"]] = daily.get(session["date"], 0) + 1
 
         # Get last 7 days
         today = datetime.now().date()
-        last_week = [
-            (today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(6, -1, -1)
-        ]
+        last_week = [today - timedelta(days=i) for i in range(6, -1, -1)]
 
         # Count sessions per day
-        daily_counts = []
-        day_labels = []
-
-        for day in last_week:
-            count = sum(
-                1 for session in self.data["sessions"] if session["date"] == day
-            )
-            daily_counts.append(count)
-            # Format label (Mon, Tue, etc.)
-            day_obj = datetime.strptime(day, "%Y-%m-%d")
-            day_labels.append(day_obj.strftime("%a"))
+        daily_counts = [daily.get(day.strftime("%Y-%m-%d"), 0) for day in last_week]
+        # Format label (Mon, Tue, etc.)
+        day_labels = [day.strftime("%a") for day in last_week]
 
         # Generate chart with plotext
         plt.clear_data()
@@ -165,6 +627,7 @@ class StatsManager:
 
         return chart_string
 
+    @timed("stats.render")
     def _generate_patterns_chart(self) -> str:
         """Generate ASCII chart of pattern usage."""
         if not self.data["patterns_used"]:
@@ -188,6 +651,69 @@ class StatsManager:
         plt.clear_data()
         return chart_string
 
+    @timed("stats.render")
+    def _generate_histogram(
+        self, labels: list[str], counts: list[int], title: str
+    ) -> str:
+        """Generate an ASCII bar chart from precomputed buckets."""
+        plt.clear_data()
+        plt.canvas_color("black")
+        plt.axes_color("black")
+        plt.ticks_color("white")
+
+        plt.bar(labels, counts, color="cyan+")
+        plt.title(title)
+        plt.plot_size(80, 12)
+
+        chart_string = plt.build()
+        plt.clear_data()
+        return chart_string
+
+    def get_patterns_stats(self) -> str:
+        """Format the per-pattern session, cycle and duration figures."""
+        return format_pattern_stats(
+            self.data["pattern_stats"], self.data["patterns_used"]
+        )
+
+    def get_hours_stats(self) -> str:
+        """Format the sessions per hour of day histogram."""
+        by_hour = self.data["rollups"]["by_hour"]
+        if not any(by_hour):
+            return "No sessions with a known time of day yet."
+        labels = [f"{hour:02d}" for hour in range(24)]
+        return self._generate_histogram(labels, by_hour, "Sessions by Hour of Day")
+
+    def get_weekdays_stats(self) -> str:
+        """Format the sessions per day of week histogram."""
+        by_weekday = self.data["rollups"]["by_weekday"]
+        if not any(by_weekday):
+            return "No breathing sessions recorded yet."
+        return self._generate_histogram(WEEKDAYS, by_weekday, "Sessions by Day of Week")
+
+    def get_months_stats(self, months: int = 12) -> str:
+        """Format the sessions per month histogram, archived sessions included."""
+        monthly: dict[str, int] = {}
+        for session in self.data["sessions"]:
+            month = session["date"][:7]
+            monthly[month] = monthly.get(month, 0) + 1
+        if "archive" in self.data:
+            for month, count in archive_monthly(self.data["archive"]).items():
+                monthly[month] = monthly.get(month, 0) + count
+        if not monthly:
+            return "No breathing sessions recorded yet."
+
+        # Last N months, ending with the current one
+        year, month = datetime.now().year, datetime.now().month
+        labels = []
+        for _ in range(months):
+            labels.append(f"{year}-{month:02d}")
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        labels.reverse()
+        counts = [monthly.get(label, 0) for label in labels]
+        return self._generate_histogram(
+            [label[2:] for label in labels], counts, "Sessions by Month"
+        )
+
     def get_detailed_stats(self) -> str:
         """Format detailed stats with charts for display in terminal."""
         basic = self.get_display_stats()
@@ -230,9 +756,19 @@ class StatsManager:
         with open(output_path, "w", newline="") as f:
             writer = csv.writer(f, delimiter=";")
             # Headers
-            writer.writerow(["Date", "Pattern", "Cycles", "Duration (seconds)"])
+            writer.writerow(
+                [
+                    "Date",
+                    "Pattern",
+                    "Cycles",
+                    "Duration (seconds)",
+                    "Start",
+                    "End",
+                    "Id",
+                ]
+            )
 
-            # Data rows
+            # Data rows; start, end and id let import-stats recognize them
             for session in self.data["sessions"]:
                 writer.writerow(
                     [
@@ -240,5 +776,8 @@ class StatsManager:
                         session["pattern"],
                         session["cycles"],
                         session["duration_seconds"],
+                        session.get("start", ""),
+                        session.get("end", ""),
+                        session.get("id", ""),
                     ]
                 )
@@ -0,0 +1,209 @@
+import contextlib
+import errno
+import io
+import os
+import threading
+from pathlib import Path
+from .paths import APP_NAME, config_dir_path
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are kept apart
+    fcntl = None
+
+
+def resolve_config_dir(environ=None) -> Path:
+    """Return the directory holding the stats, presets and caches.
+
+    BREATH_DATA_DIR wins, then $XDG_CONFIG_HOME/deep-breath-cli, then
+    ~/.config/deep-breath-cli.
+    """
+    return Path(config_dir_path(environ, home=str(Path.home())))
+
+
+class FileStorage:
+    """Files of the config directory, which is created on the first write."""
+
+    persistent = True
+
+    def __init__(self, root: Path):
+        """Initialize the storage without touching the disk."""
+        self.root = root
+        self._created = False
+        # Locks held by this process, so that taking one again does not block
+        self._held: dict[str, int] = {}
+        self._guard = threading.RLock()
+
+    def path(self, name: str) -> Path:
+        """Return the path of a file of the storage."""
+        return self.root / name
+
+    def exists(self, name: str) -> bool:
+        """Tell whether the file exists."""
+        return self.path(name).exists()
+
+    def size(self, name: str) -> int:
+        """Return the size of the file in bytes, 0 if it does not exist."""
+        try:
+            return os.stat(self.path(name)).st_size
+        except OSError:
+            return 0
+
+    def stamp(self, name: str) -> tuple[int, ...] | None:
+        """Return a value that changes whenever the file is written."""
+        try:
+            stat = os.stat(self.path(name))
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _create_root(self) -> None:
+        """Create the directory before the first write."""
+        if not self._created:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._created = True
+
+    def open(self, name: str, mode: str = "r", errors: str | None = None):
+        """Open a file like the open() builtin."""
+        if mode[0] in "wa":
+            self._create_root()
+        return open(self.path(name), mode, errors=None if "b" in mode else errors)
+
+    def write_text(self, name: str, text: str) -> None:
+        """Replace a file atomically, readers see the old or the new content."""
+        import tempfile
+
+        self._create_root()
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=f".{name}.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(text)
+            os.replace(tmp_path, self.path(name))
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+
+    def replace(self, name: str, target: str) -> None:
+        """Rename a file, replacing the target."""
+        os.replace(self.path(name), self.path(target))
+
+    @contextlib.contextmanager
+    def lock(self, name: str):
+        """Hold an exclusive lock shared with other processes for the block.
+
+        The lock file is created if needed. Taking a lock this process
+        already holds does not block.
+        """
+        with self._guard:
+            if self._held.get(name):
+                self._held[name] += 1
+                try:
+                    yield
+                finally:
+                    self._held[name] -= 1
+                return
+            self._create_root()
+            fd = os.open(self.path(name), os.O_WRONLY | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                self._held[name] = 1
+                try:
+                    yield
+                finally:
+                    self._held[name] = 0
+                    if fcntl is not None:
+                        fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+
+
+class _MemoryWriter(io.BytesIO):
+    """Buffer that stores its content in a MemoryStorage when closed."""
+
+    def __init__(self, storage: "MemoryStorage", name: str, initial: bytes):
+        super().__init__(initial)
+        self.seek(0, io.SEEK_END)
+        self._storage = storage
+        self._name = name
+
+    def close(self) -> None:
+        if not self.closed:
+            self._storage._store(self._name, self.getvalue())
+        super().close()
+
+
+class MemoryStorage:
+    """Files kept in a dict, for tests and ephemeral containers.
+
+    Nothing touches the disk, so the caches read by other processes (name
+    cache, prompt summary, checkpoint log) are not written either.
+    """
+
+    persistent = False
+
+    def __init__(self, root: Path | None = None):
+        """Initialize an empty storage; root only names it in messages."""
+        self.root = root or Path(f"<memory>/{APP_NAME}")
+        self.files: dict[str, bytes] = {}
+        self._writes = 0
+        self._stamps: dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def _store(self, name: str, data: bytes) -> None:
+        """Set the content of a file and give it a new stamp."""
+        self.files[name] = data
+        self._writes += 1
+        self._stamps[name] = self._writes
+
+    def path(self, name: str) -> Path:
+        """Return the nominal path of a file, for messages."""
+        return self.root / name
+
+    def exists(self, name: str) -> bool:
+        """Tell whether the file exists."""
+        return name in self.files
+
+    def size(self, name: str) -> int:
+        """Return the size of the file in bytes, 0 if it does not exist."""
+        return len(self.files.get(name, b""))
+
+    def stamp(self, name: str) -> int | None:
+        """Return a value that changes whenever the file is written."""
+        return self._stamps.get(name)
+
+    def open(self, name: str, mode: str = "r", errors: str | None = None):
+        """Open a file in memory with the modes of the open() builtin."""
+        if mode[0] == "r":
+            if name not in self.files:
+                raise FileNotFoundError(
+                    errno.ENOENT, os.strerror(errno.ENOENT), str(self.path(name))
+                )
+            f = io.BytesIO(self.files[name])
+        else:
+            initial = self.files.get(name, b"") if mode[0] == "a" else b""
+            f = _MemoryWriter(self, name, initial)
+            # Like open(), the file exists as soon as it is opened
+            self._store(name, initial)
+        if "b" in mode:
+            return f
+        return io.TextIOWrapper(f, encoding="utf-8", errors=errors)
+
+    def write_text(self, name: str, text: str) -> None:
+        """Replace a file at once."""
+        self._store(name, text.encode())
+
+    def replace(self, name: str, target: str) -> None:
+        """Rename a file, replacing the target."""
+        if name not in self.files:
+            raise FileNotFoundError(
+                errno.ENOENT, os.strerror(errno.ENOENT), str(self.path(name))
+            )
+        self._store(target, self.files.pop(name))
+        self._stamps.pop(name, None)
+
+    @contextlib.contextmanager
+    def lock(self, name: str):
+        """Hold a lock for the block; the storage only lives in this process."""
+        with self._lock:
+            yield
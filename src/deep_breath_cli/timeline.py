@@ -0,0 +1,237 @@
+import math
+from typing import Any, Iterator, NamedTuple
+
+
+class TimedPhase(NamedTuple):
+    """One phase of a session, placed on the session's time axis."""
+
+    start: float
+    duration: float
+    message: str
+    cycle: int
+    # Position of the phase within its cycle, counting repeated phases
+    index: int
+
+
+class Phase:
+    """A phase whose duration can ramp by a step at each repetition.
+
+    The repetition is the one of the innermost enclosing repeat block, or
+    the session cycle at the top level. A ramp stops at its limit.
+    """
+
+    leaves = 1
+
+    def __init__(
+        self,
+        duration: float,
+        message: str,
+        ramp: float = 0.0,
+        until: float | None = None,
+    ):
+        """Initialize and validate the phase."""
+        if duration <= 0:
+            raise ValueError(f"phase duration must be positive, got {duration}")
+        if ramp < 0 and (until is None or until <= 0):
+            raise ValueError("a shrinking phase needs a positive 'until' limit")
+        self.duration = duration
+        self.message = message
+        self.ramp = ramp
+        self.until = until
+
+    def at(self, repetition: int) -> float:
+        """Return the duration of the phase at a repetition."""
+        # Without a ramp, a limit has nothing to stop
+        if not self.ramp:
+            return self.duration
+        duration = self.duration + self.ramp * repetition
+        if self.until is None:
+            return duration
+        return min(duration, self.until) if self.ramp > 0 else max(duration, self.until)
+
+    def total(self, repetitions: int) -> float:
+        """Return the summed duration of the first repetitions, in O(1)."""
+        if not self.ramp or self.until is None:
+            free = repetitions
+        else:
+            # Repetitions before the ramp reaches its limit
+            free = max(math.floor((self.until - self.duration) / self.ramp) + 1, 0)
+            free = min(free, repetitions)
+        ramped = free * self.duration + self.ramp * free * (free - 1) / 2
+        return ramped + (repetitions - free) * (self.until or 0)
+
+
+class Block:
+    """Steps repeated a number of times."""
+
+    def __init__(self, count: int, steps: list["Phase | Block"]):
+        """Initialize the block and precompute what does not ramp."""
+        if count < 1:
+            raise ValueError(f"repeat count must be at least 1, got {count}")
+        if not steps:
+            raise ValueError("a repeat block needs at least one step")
+        self.count = count
+        self.steps = steps
+        self.body_leaves = sum(step.leaves for step in steps)
+        self.leaves = count * self.body_leaves
+        self._ramping = [s for s in steps if isinstance(s, Phase) and s.ramp]
+        self._fixed = sum(
+            step.total if isinstance(step, Block) else step.duration
+            for step in steps
+            if step not in self._ramping
+        )
+        self.total = self.prefix(count)
+
+    def at(self, repetition: int) -> float:
+        """Return the duration of the block, the same at every repetition."""
+        # Ramps inside only follow the iterations of their own block
+        return self.total
+
+    def prefix(self, iterations: int) -> float:
+        """Return the duration of the first iterations, in O(ramping phases)."""
+        return iterations * self._fixed + sum(
+            phase.total(iterations) for phase in self._ramping
+        )
+
+    def iteration_at(self, offset: float) -> int:
+        """Return the iteration running at an offset, by binary search."""
+        low, high = 0, self.count - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.prefix(middle) <= offset:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+
+def compile_steps(steps: list[Any]) -> list[Phase | Block]:
+    """Compile preset steps into phases and repeat blocks.
+
+    A step is a [duration, message] pair, a phase object such as
+    {"duration": 8, "message": "...", "ramp": 1, "until": 12}, or a
+    repeat block {"repeat": 3, "steps": [...]}.
+    """
+    compiled: list[Phase | Block] = []
+    for step in steps:
+        if isinstance(step, dict) and "repeat" in step:
+            compiled.append(Block(int(step["repeat"]), compile_steps(step["steps"])))
+        elif isinstance(step, dict):
+            compiled.append(
+                Phase(
+                    step["duration"],
+                    step["message"],
+                    step.get("ramp", 0.0),
+                    step.get("until"),
+                )
+            )
+        else:
+            duration, message = step
+            compiled.append(Phase(duration, message))
+    return compiled
+
+
+def describe_steps(steps: list[Any]) -> list[str]:
+    """Describe preset steps for listings, one string per top-level step."""
+    descriptions = []
+    for step in steps:
+        if isinstance(step, dict) and "repeat" in step:
+            inner = ", ".join(describe_steps(step["steps"]))
+            descriptions.append(f"{step['repeat']}× ({inner})")
+        elif isinstance(step, dict):
+            ramp = step.get("ramp", 0)
+            text = f"{step['duration']}s"
+            if ramp:
+                text += f" {ramp:+}s each time"
+                if step.get("until") is not None:
+                    text += f" until {step['until']}s"
+            descriptions.append(f"{text} {step['message']}")
+        else:
+            duration, message = step
+            descriptions.append(f"{duration}s {message}")
+    return descriptions
+
+
+class Timeline:
+    """A preset repeated over a number of cycles, evaluated lazily.
+
+    Nothing is expanded: phases are generated as the session reaches
+    them, and the phase at any time is found with a binary search on the
+    repetitions of each block, so a session of any length costs the same.
+    """
+
+    def __init__(self, steps: list[Any], cycles: int):
+        """Compile the steps and check the resulting session."""
+        self.cycles = cycles
+        try:
+            self.root = Block(cycles, compile_steps(steps))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"invalid step: {e}") from e
+        self.duration = self.root.total
+        self.phases_per_cycle = self.root.body_leaves
+
+    def _path(self, offset: float) -> list[tuple[int, int]]:
+        """Return the (iteration, step) choices leading to the phase at offset."""
+        path = []
+        block = self.root
+        while True:
+            iteration = block.iteration_at(offset)
+            offset -= block.prefix(iteration)
+            for number, step in enumerate(block.steps):
+                duration = step.at(iteration)
+                # Rounding can leave a sliver past the last step
+                if offset < duration or number == len(block.steps) - 1:
+                    break
+                offset -= duration
+            path.append((iteration, number))
+            if not isinstance(step, Block):
+                return path
+            block = step
+
+    def locate(self, offset: float) -> TimedPhase | None:
+        """Return the phase running at an offset in seconds, None past the end."""
+        if offset < 0 or offset >= self.duration:
+            return None
+        return next(self.phases(offset))
+
+    def phases(self, start: float = 0.0) -> Iterator[TimedPhase]:
+        """Yield the phases in order, from the one running at start."""
+        if start >= self.duration:
+            return iter(())
+        path = self._path(start) if start > 0 else []
+        return self._walk(self.root, 0.0, 0, path, None)
+
+    def _walk(
+        self,
+        block: Block,
+        time: float,
+        index: int,
+        path: list[tuple[int, int]],
+        cycle: int | None,
+    ) -> Iterator[TimedPhase]:
+        """Yield the phases of a block, resuming from a path if one is given."""
+        first_iteration, first_step = path[0] if path else (0, 0)
+        time += block.prefix(first_iteration)
+        for iteration in range(first_iteration, block.count):
+            # The top-level block counts cycles, and phases restart at 0
+            if cycle is None:
+                current_cycle, position = iteration, 0
+            else:
+                current_cycle, position = cycle, index + iteration * block.body_leaves
+            skip = first_step if iteration == first_iteration else 0
+            for step in block.steps[:skip]:
+                time += step.at(iteration)
+                position += step.leaves
+            for number in range(skip, len(block.steps)):
+                step = block.steps[number]
+                duration = step.at(iteration)
+                if isinstance(step, Block):
+                    # Only the block the path goes through starts part-way
+                    resume = path[1:] if path and path[0] == (iteration, number) else []
+                    yield from self._walk(step, time, position, resume, current_cycle)
+                else:
+                    yield TimedPhase(
+                        time, duration, step.message, current_cycle, position
+                    )
+                time += duration
+                position += step.leaves
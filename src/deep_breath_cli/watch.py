@@ -0,0 +1,99 @@
+import time
+from datetime import datetime
+from typing import Any
+from rich.console import Console
+from .context import get_context
+from .journal import JournalTail, SessionJournal
+from .merge import current_streak
+from .retention import archive_daily, archive_dates
+from .stats import StatsManager
+
+
+class StatsWatcher:
+    """Keep stats up to date from the session journal.
+
+    stats.json is loaded once; after that only the bytes appended to the
+    journal are read, and totals, streaks and daily counts are updated from
+    the new sessions alone.
+    """
+
+    def __init__(self):
+        """Initialize the watcher with a full load of the stats."""
+        config_dir = get_context().config_dir
+        self.journal = SessionJournal(config_dir / "sessions.log")
+        self.reload()
+
+    def reload(self) -> None:
+        """Load everything from scratch."""
+        # Take the offset first: sessions saved meanwhile are skipped by id
+        self.tail = JournalTail(self.journal.journal_file, self.journal.size())
+        self.stats_manager = StatsManager()
+        self.seen: set[str] = set()
+        self.daily: dict[str, int] = {}
+        self.archived_dates: set[str] = set()
+        if "archive" in self.stats_manager.data:
+            self.daily = archive_daily(self.stats_manager.data["archive"])
+            self.archived_dates = archive_dates(self.stats_manager.data["archive"])
+        for session in self.stats_manager.data["sessions"]:
+            self.seen.add(session["id"])
+            self.daily[session["date"]] = self.daily.get(session["date"], 0) + 1
+        self.today = datetime.now().date()
+
+    def apply(self, sessions: list[dict[str, Any]]) -> int:
+        """Apply new sessions, return how many were not already known."""
+        data = self.stats_manager.data
+        added = 0
+        for session in sessions:
+            if "id" in session:
+                if session["id"] in self.seen:
+                    continue
+                self.seen.add(session["id"])
+            self.stats_manager._record_session(session)
+            self.daily[session["date"]] = self.daily.get(session["date"], 0) + 1
+            added += 1
+        if added:
+            streak = current_streak(self.archived_dates | set(self.daily))
+            data["streaks"]["current"] = streak
+            data["streaks"]["longest"] = max(data["streaks"]["longest"], streak)
+        return added
+
+    def poll(self) -> bool:
+        """Check the journal once, return True if the dashboard must redraw."""
+        sessions = self.tail.poll()
+        if sessions is None:
+            self.reload()
+            return True
+        changed = self.apply(sessions) > 0
+        # The 7-day chart and the streak move at midnight even without sessions
+        if datetime.now().date() != self.today:
+            self.today = datetime.now().date()
+            data = self.stats_manager.data
+            data["streaks"]["current"] = current_streak(
+                self.archived_dates | set(self.daily)
+            )
+            changed = True
+        return changed
+
+    def render(self) -> str:
+        """Format the dashboard."""
+        basic = self.stats_manager.get_display_stats()
+        chart = self.stats_manager._generate_sessions_chart(self.daily)
+        updated = datetime.now().strftime("%H:%M:%S")
+        return f"{basic}\n\n{chart}\n\nUpdated at {updated}. Press Ctrl+C to stop."
+
+
+def watch_stats(interval: float = 1.0) -> None:
+    """Show a dashboard that refreshes when new sessions are recorded."""
+    console = Console()
+    watcher = StatsWatcher()
+    try:
+        console.clear()
+        print(watcher.render())
+        while True:
+            # Polling a file size is one stat call, so idling costs nothing
+            time.sleep(interval)
+            if watcher.poll():
+                console.clear()
+                print(watcher.render())
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
@@ -0,0 +1,13 @@
+import pytest
+from src.deep_breath_cli.paths import DATA_DIR_VAR, STORAGE_VAR
+
+
+@pytest.fixture(autouse=True)
+def default_config_dir(monkeypatch, tmp_path):
+    """Keep tests in the config directory under a temporary home.
+
+    Tests that do not patch the home still never touch the real one.
+    """
+    monkeypatch.setenv("HOME", str(tmp_path))
+    for name in (DATA_DIR_VAR, STORAGE_VAR, "XDG_CONFIG_HOME"):
+        monkeypatch.delenv(name, raising=False)
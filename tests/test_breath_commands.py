@@ -7,7 +7,7 @@ def test_create_pattern_command():
     """Test create-pattern command."""
     runner = CliRunner()
 
-    with patch("src.deep_breath_cli.breath.PresetManager") as mock_preset_manager:
+    with patch("src.deep_breath_cli.context.PresetManager") as mock_preset_manager:
         mock_instance = MagicMock()
         mock_preset_manager.return_value = mock_instance
         mock_instance.create_interactive_preset.return_value = True
@@ -22,7 +22,7 @@ def test_delete_pattern_command():
     """Test delete-pattern command."""
     runner = CliRunner()
 
-    with patch("src.deep_breath_cli.breath.PresetManager") as mock_preset_manager:
+    with patch("src.deep_breath_cli.context.PresetManager") as mock_preset_manager:
         mock_instance = MagicMock()
         mock_preset_manager.return_value = mock_instance
         mock_instance.delete_preset.return_value = True
@@ -37,7 +37,7 @@ def test_modify_pattern_command():
     """Test modify-pattern command."""
     runner = CliRunner()
 
-    with patch("src.deep_breath_cli.breath.PresetManager") as mock_preset_manager:
+    with patch("src.deep_breath_cli.context.PresetManager") as mock_preset_manager:
         mock_instance = MagicMock()
         mock_preset_manager.return_value = mock_instance
         mock_instance.modify_preset.return_value = True
@@ -52,7 +52,7 @@ def test_export_stats_command():
     """Test export-stats command."""
     runner = CliRunner()
 
-    with patch("src.deep_breath_cli.breath.StatsManager") as mock_stats_manager:
+    with patch("src.deep_breath_cli.context.StatsManager") as mock_stats_manager:
         mock_instance = MagicMock()
         mock_stats_manager.return_value = mock_instance
 
@@ -66,7 +66,7 @@ def test_stats_detailed_command():
     """Test stats command with --detailed flag."""
     runner = CliRunner()
 
-    with patch("src.deep_breath_cli.breath.StatsManager") as mock_stats_manager:
+    with patch("src.deep_breath_cli.context.StatsManager") as mock_stats_manager:
         mock_instance = MagicMock()
         mock_stats_manager.return_value = mock_instance
         mock_instance.get_detailed_stats.return_value = "Detailed Stats Output"
@@ -1,6 +1,8 @@
-from src.deep_breath_cli.breath import app, breath_phase, PATTERNS
+from src.deep_breath_cli.breath import app, PATTERNS
+from src.deep_breath_cli.engine import SimulatedClock
+from src.deep_breath_cli.stats import StatsManager
 from typer.testing import CliRunner
-from unittest.mock import call, patch
+from unittest.mock import patch
 
 
 def test_patterns_are_valid():
@@ -20,26 +22,6 @@ def test_patterns_are_valid():
     assert all(isinstance(message, str) for _, message in pattern_478)
 
 
-@patch("src.deep_breath_cli.breath.time.sleep")
-@patch("src.deep_breath_cli.breath.track")
-def test_breath_phase(mock_track, mock_sleep):
-    """Test the breath_phase function."""
-    # Prepare the data
-    duration = 5
-    message = "Test phase"
-
-    # Mock the track function to avoid actual time.sleep calls
-    mock_track.return_value = range(duration)  # track should iterate over this range
-
-    # Call the function
-    breath_phase(duration, message)
-
-    # Check that track was called with the correct parameters
-    mock_sleep.assert_called_with(1)  # Ensure sleep is called with 1 second
-    assert mock_sleep.call_count == duration  # Ensure it was called duration times
-    mock_track.assert_called_once_with(range(duration), description=message)
-
-
 def test_presets_command():
     """Test the presets command."""
     runner = CliRunner()
@@ -53,22 +35,25 @@ def test_presets_command():
     assert "4-4-4-4" in result.stdout
 
 
+def recorded_sessions():
+    """Return the sessions saved in the stats file."""
+    return StatsManager().data["sessions"]
+
+
 @patch("src.deep_breath_cli.breath.typer.confirm")
 @patch("src.deep_breath_cli.breath.time.sleep")
-@patch("src.deep_breath_cli.breath.os.system")
-@patch("src.deep_breath_cli.breath.track")
-def test_breath_command(mock_track, mock_system, mock_sleep, mock_confirm):
+@patch("src.deep_breath_cli.engine.MonotonicClock", SimulatedClock)
+def test_breath_command(mock_sleep, mock_confirm, tmp_path):
     """Test the breath command."""
     # Mock the confirm function to return True
     mock_confirm.return_value = (
         True  # Simulate user confirming to start the breathing cycle
     )
-    mock_track.side_effect = (
-        lambda x, **kwargs: x
-    )  # Mock track to return the range directly
 
     runner = CliRunner()
-    result = runner.invoke(app, ["start", "--cycle", "1"])
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        result = runner.invoke(app, ["start", "--cycle", "1"])
+        sessions = recorded_sessions()
 
     # Check that the command executed successfully
     assert result.exit_code == 0
@@ -80,52 +65,77 @@ def test_breath_command(mock_track, mock_system, mock_sleep, mock_confirm):
 
     # Check that the number of cycles is respected
     assert "Starting a breathing cycle of 1 cycles..." in result.stdout
+    assert "Cycle 1 of 1:" in result.stdout
 
-    # Check that the system clear command was called
-    mock_system.assert_called_with("clear")
+    # The simulated clock finishes at once, so only the last phase is drawn
+    assert "Breathe out..." in result.stdout
+    assert "Cycle complete!" in result.stdout
 
-    # Check that the messages for the breathing pattern are printed
-    expected_calls = [
-        call(range(4), description="[blue]Breathe in..."),
-        call(range(7), description="[green]Hold..."),
-        call(range(8), description="[dark_orange]Breathe out..."),
+    # Check that the whole session was recorded
+    assert [(s["pattern"], s["cycles"], s["duration_seconds"]) for s in sessions] == [
+        ("4-7-8", 1, 19)
     ]
-    mock_track.assert_has_calls(expected_calls)
-
-    # Check that the sleep function was called for each phase in the pattern
-    assert mock_sleep.call_count == 20
 
 
 @patch("src.deep_breath_cli.breath.typer.confirm")
 @patch("src.deep_breath_cli.breath.time.sleep")
-@patch("src.deep_breath_cli.breath.track")
-def test_breath_command_invalid_pattern(mock_track, mock_sleep, mock_confirm):
+@patch("src.deep_breath_cli.engine.MonotonicClock", SimulatedClock)
+def test_breath_command_invalid_pattern(mock_sleep, mock_confirm, tmp_path):
     """Test the breath command with invalid pattern."""
     mock_confirm.return_value = True
-    mock_track.side_effect = lambda x, **kwargs: x
 
     runner = CliRunner()
-    result = runner.invoke(app, ["start", "--cycle", "2", "--pattern", "inexistant"])
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        result = runner.invoke(
+            app, ["start", "--cycle", "2", "--pattern", "inexistant"]
+        )
+        sessions = recorded_sessions()
 
     assert result.exit_code == 0
     assert (
         "Pattern 'inexistant' not found. Using default pattern '4-7-8'."
         in result.stdout
     )
-    assert mock_sleep.call_count == 39
+    assert sessions[0]["duration_seconds"] == 38
 
 
 @patch("src.deep_breath_cli.breath.typer.confirm")
 @patch("src.deep_breath_cli.breath.time.sleep")
-@patch("src.deep_breath_cli.breath.track")
-def test_breath_command_cycle_less_than_one(mock_track, mock_sleep, mock_confirm):
+@patch("src.deep_breath_cli.engine.MonotonicClock", SimulatedClock)
+def test_breath_command_cycle_less_than_one(mock_sleep, mock_confirm, tmp_path):
     """Test the breath command with cycle < 1."""
     mock_confirm.return_value = True
-    mock_track.side_effect = lambda x, **kwargs: x
 
     runner = CliRunner()
-    result = runner.invoke(app, ["start", "--cycle", "0"])
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        result = runner.invoke(app, ["start", "--cycle", "0"])
+        sessions = recorded_sessions()
 
     assert result.exit_code == 0
     assert "Cycle must be at least 1. Setting to 1." in result.stdout
-    assert mock_sleep.call_count == 20
+    assert sessions[0]["cycles"] == 1
+
+
+@patch("src.deep_breath_cli.breath.typer.confirm")
+@patch("src.deep_breath_cli.breath.time.sleep")
+def test_breath_command_interrupted(mock_sleep, mock_confirm, tmp_path):
+    """Test that Ctrl+C during a session still records the time breathed."""
+    mock_confirm.return_value = True
+    clock = SimulatedClock()
+
+    def interrupt():
+        raise KeyboardInterrupt
+
+    # Raised from inside the event loop, like a signal would be
+    clock.at(10, interrupt)
+    runner = CliRunner()
+    with (
+        patch("pathlib.Path.home", return_value=tmp_path),
+        patch("src.deep_breath_cli.engine.MonotonicClock", return_value=clock),
+    ):
+        result = runner.invoke(app, ["start", "--cycle", "2"])
+        sessions = recorded_sessions()
+
+    assert result.exit_code == 130
+    assert "Session interrupted after 10 seconds." in result.stdout
+    assert sessions[0]["duration_seconds"] == 10
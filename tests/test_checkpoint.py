@@ -0,0 +1,133 @@
+import asyncio
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.checkpoint import (
+    CHECKPOINT_FILE,
+    CheckpointLog,
+    recover_sessions,
+)
+from src.deep_breath_cli.engine import SessionEngine, SimulatedClock
+from src.deep_breath_cli.stats import StatsManager
+
+runner = CliRunner()
+
+# Leaves a session with 2 completed cycles of 8s each, then dies without cleanup
+# (after starting the phases of a third cycle, if given their offsets)
+CRASH = """
+import os, sys
+from pathlib import Path
+from src.deep_breath_cli.checkpoint import CheckpointLog
+log = CheckpointLog(Path(sys.argv[1]), "box")
+log.observe("session_start", {})
+log.observe("cycle_complete", {"cycle": 1, "duration_seconds": 8})
+log.observe("cycle_complete", {"cycle": 2, "duration_seconds": 16})
+for offset in sys.argv[2:]:
+    log.observe("phase_change", {"cycle": 3, "duration_seconds": int(offset)})
+log.commit()
+os._exit(1)
+"""
+
+
+def crash_session(config_dir, *offsets):
+    """Leave an unfinished session in the log from a process that died.
+
+    offsets are the time breathed at the phases started after the cycles.
+    """
+    args = [sys.executable, "-c", CRASH, str(config_dir), *map(str, offsets)]
+    result = subprocess.run(args)
+    assert result.returncode == 1
+
+
+def test_cycles_are_group_committed(tmp_path):
+    """Test that a session's records end up in few commits, in order."""
+    log = CheckpointLog(tmp_path, "box")
+    engine = SessionEngine(
+        [(4, "In"), (4, "Out")], 3, clock=SimulatedClock(), events=log.observe
+    )
+    asyncio.run(engine.run(record=lambda session: log.finish()))
+    log.close()
+
+    lines = (tmp_path / CHECKPOINT_FILE).read_text().splitlines()
+    assert [line.split('"type": "')[1].split('"')[0] for line in lines] == [
+        "begin",
+        *["phase", "phase", "cycle"] * 3,
+        "end",
+    ]
+    assert '"duration_seconds": 20' in lines[8]
+    assert '"duration_seconds": 24' in lines[9]
+    assert log.commits <= 2
+    # Finished sessions are dropped from the log
+    assert recover_sessions(tmp_path, lambda session: None) == 0
+    assert (tmp_path / CHECKPOINT_FILE).read_text() == ""
+
+
+def test_recovers_session_of_a_dead_process(tmp_path):
+    """Test that the cycles completed before a crash are recorded once."""
+    crash_session(tmp_path)
+    recorded = []
+    assert recover_sessions(tmp_path, recorded.append) == 1
+    assert len(recorded) == 1
+    session = recorded[0]
+    assert (session["pattern"], session["cycles"]) == ("box", 2)
+    assert session["duration_seconds"] == 16
+    assert session["started_at"] <= session["ended_at"]
+
+    assert recover_sessions(tmp_path, recorded.append) == 0
+    assert len(recorded) == 1
+
+
+def test_recovers_the_part_of_an_unfinished_cycle(tmp_path):
+    """Test that the time of the last phase started is kept, not only cycles."""
+    crash_session(tmp_path, 16, 20)
+    recorded = []
+    assert recover_sessions(tmp_path, recorded.append) == 1
+    assert (recorded[0]["cycles"], recorded[0]["duration_seconds"]) == (2, 20)
+
+
+def test_failed_recovery_is_kept_for_later(tmp_path, capsys):
+    """Test that a session that cannot be recorded neither blocks nor is lost."""
+    crash_session(tmp_path)
+
+    def fail(session):
+        raise OSError("disk full")
+
+    assert recover_sessions(tmp_path, fail) == 0
+    assert (
+        "Error recovering an interrupted session: disk full" in capsys.readouterr().out
+    )
+    recorded = []
+    assert recover_sessions(tmp_path, recorded.append) == 1
+    assert recorded[0]["cycles"] == 2
+
+
+def test_keeps_sessions_of_live_processes(tmp_path):
+    """Test that a session still running elsewhere is left alone."""
+    crash_session(tmp_path)
+    log_file = tmp_path / CHECKPOINT_FILE
+    before = log_file.read_text()
+    # A torn last line, as left by a process killed in the middle of a write
+    log_file.write_text(before + '{"session": "1-2", "ty')
+    with patch("src.deep_breath_cli.checkpoint._process_alive", return_value=True):
+        assert recover_sessions(tmp_path, lambda session: None) == 0
+    assert log_file.read_text() == before
+
+
+def test_next_command_records_interrupted_session(tmp_path):
+    """Test that any command recovers the session before running."""
+    config_dir = tmp_path / ".config" / "deep-breath-cli"
+    config_dir.mkdir(parents=True)
+    crash_session(config_dir)
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        result = runner.invoke(app, ["stats"])
+        assert result.exit_code == 0
+        assert "Recovered 1 interrupted session(s)" in result.stdout
+        sessions = StatsManager().data["sessions"]
+        assert [(s["pattern"], s["cycles"]) for s in sessions] == [("box", 2)]
+
+        result = runner.invoke(app, ["stats"])
+        assert "Recovered" not in result.stdout
+    assert os.path.getsize(config_dir / CHECKPOINT_FILE) == 0
@@ -0,0 +1,115 @@
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.completion import (
+    COMPLETE_VAR,
+    fast_complete,
+    read_name_cache,
+)
+from src.deep_breath_cli.presets import PresetManager
+
+
+def make_presets(tmp_path):
+    """Create two custom presets through the manager, which writes the cache."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = PresetManager()
+        manager.custom_presets = {"box": [(4, "In")], "calm": [(5, "Out")]}
+        manager._save_presets()
+    return tmp_path / ".config" / "deep-breath-cli"
+
+
+def bash_env(line: str) -> dict[str, str]:
+    """Build the environment the bash completion script passes."""
+    words = line.split()
+    cword = len(words) if line.endswith(" ") else len(words) - 1
+    return {COMPLETE_VAR: "complete_bash", "COMP_WORDS": line, "COMP_CWORD": str(cword)}
+
+
+def test_save_presets_regenerates_name_cache(tmp_path):
+    """Test that saving presets rewrites the cache with built-in and custom names."""
+    config_dir = make_presets(tmp_path)
+    assert read_name_cache(config_dir) == {
+        "4-7-8": "built-in",
+        "4-4-4-4": "built-in",
+        "box": "custom",
+        "calm": "custom",
+    }
+
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = PresetManager()
+        del manager.custom_presets["box"]
+        manager._save_presets()
+    assert "box" not in read_name_cache(config_dir)
+
+
+def test_fast_complete_preset_names(tmp_path):
+    """Test the names offered for --pattern and for delete/modify-pattern."""
+    config_dir = make_presets(tmp_path)
+
+    output, code = fast_complete(bash_env("breath start --pattern "), config_dir)
+    assert output.split("\n") == ["4-7-8", "4-4-4-4", "box", "calm"]
+    assert code == 0
+
+    output, _ = fast_complete(bash_env("breath delete-pattern "), config_dir)
+    assert output.split("\n") == ["box", "calm"]
+    output, _ = fast_complete(bash_env("breath --profile modify-pattern c"), config_dir)
+    assert output == "calm"
+
+
+def test_fast_complete_defers_to_full_cli(tmp_path):
+    """Test that anything but a preset name is left to typer."""
+    config_dir = make_presets(tmp_path)
+    assert fast_complete(bash_env("breath st"), config_dir) is None
+    assert fast_complete(bash_env("breath start --cy"), config_dir) is None
+    assert fast_complete(bash_env("breath delete-pattern box "), config_dir) is None
+    # No cache yet
+    assert fast_complete(bash_env("breath start --pattern "), tmp_path) is None
+
+
+def test_fast_complete_matches_typer_output(tmp_path):
+    """Test that the fast path prints exactly what typer would."""
+    config_dir = make_presets(tmp_path)
+    runner = CliRunner()
+    cases = [
+        bash_env("breath start --pattern 4"),
+        {
+            COMPLETE_VAR: "complete_zsh",
+            "_TYPER_COMPLETE_ARGS": "breath start --pattern=",
+        },
+        {
+            COMPLETE_VAR: "complete_zsh",
+            "_TYPER_COMPLETE_ARGS": "breath delete-pattern x",
+        },
+        {
+            COMPLETE_VAR: "complete_fish",
+            "_TYPER_COMPLETE_FISH_ACTION": "get-args",
+            "_TYPER_COMPLETE_ARGS": "breath modify-pattern ",
+        },
+    ]
+    for env in cases:
+        output, code = fast_complete(env, config_dir)
+        with patch("pathlib.Path.home", return_value=tmp_path):
+            result = runner.invoke(app, [], env=env, prog_name="breath")
+        assert result.output == output + "\n"
+        assert result.exit_code == code
+
+
+def test_launcher_completion_skips_heavy_imports(tmp_path):
+    """Test that the fast path never imports typer, rich or plotext."""
+    make_presets(tmp_path)
+    code = (
+        "import atexit, sys\n"
+        "atexit.register(lambda: print(sorted("
+        "m for m in ('typer', 'rich', 'plotext') if m in sys.modules), file=sys.stderr))\n"
+        "from src.deep_breath_cli.launcher import main\n"
+        "main()\n"
+    )
+    env = dict(os.environ, HOME=str(tmp_path), **bash_env("breath start --pattern b"))
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+    assert result.stdout == "box\n"
+    assert result.stderr.strip() == "[]"
@@ -0,0 +1,100 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.context import AppContext, get_context
+from src.deep_breath_cli.stats import StatsManager
+from src.deep_breath_cli.storage import MemoryStorage, resolve_config_dir
+
+runner = CliRunner()
+
+
+def test_config_dir_overrides(tmp_path):
+    """Test BREATH_DATA_DIR, then XDG_CONFIG_HOME, then ~/.config."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        assert resolve_config_dir({}) == tmp_path / ".config" / "deep-breath-cli"
+        assert resolve_config_dir({"XDG_CONFIG_HOME": "/xdg"}) == Path(
+            "/xdg/deep-breath-cli"
+        )
+        assert resolve_config_dir(
+            {"XDG_CONFIG_HOME": "/xdg", "BREATH_DATA_DIR": "/data"}
+        ) == Path("/data")
+
+
+def test_context_is_shared_until_the_directory_changes(tmp_path):
+    """Test that managers are built once per context, on first use."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        context = get_context()
+        assert get_context() is context
+        assert not (tmp_path / ".config").exists()
+        assert context.stats is context.stats
+        assert context.presets is context.presets
+    with patch("pathlib.Path.home", return_value=tmp_path / "other"):
+        assert get_context() is not context
+
+
+def test_memory_storage_never_touches_disk(tmp_path):
+    """Test sessions, presets and the index kept in memory only."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        context = AppContext(storage=MemoryStorage())
+        context.stats.add_session("box", 4, 64)
+        sessions = [dict(session) for session in context.stats.data["sessions"]]
+        assert context.stats.add_sessions(sessions) == 0
+        context.presets.custom_presets["calm"] = [(4, "In"), (6, "Out")]
+        context.presets._save_presets()
+
+        reloaded = StatsManager(context)
+        assert reloaded.data["total_sessions"] == 1
+        assert "sessions.idx" in context.storage.files
+        assert '"calm"' in context.storage.files["presets.json"].decode()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cli_honours_environment(tmp_path, monkeypatch):
+    """Test the CLI with XDG_CONFIG_HOME, then with in-memory storage."""
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "xdg"))
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        result = runner.invoke(app, ["stats"])
+        assert result.exit_code == 0
+        assert (tmp_path / "xdg" / "deep-breath-cli" / "stats.json").exists()
+        assert not (tmp_path / ".config").exists()
+
+        monkeypatch.setenv("BREATH_STORAGE", "memory")
+        monkeypatch.setenv("BREATH_DATA_DIR", str(tmp_path / "data"))
+        result = runner.invoke(app, ["stats", "--prompt"])
+        assert result.stdout == "0d 0x 0m\n"
+        assert not (tmp_path / "data").exists()
+
+
+def test_managers_read_before_a_save_lose_nothing(tmp_path):
+    """Test that an update reloads stats another manager saved meanwhile."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        first, second = StatsManager(), StatsManager()
+        first.add_session("box", 4, 64)
+        second.add_session("4-7-8", 2, 38)
+        second.add_sessions([dict(first.data["sessions"][0])])
+        assert second.data["total_sessions"] == 2
+        assert StatsManager().data["patterns_used"]["box"] == 1
+        assert (tmp_path / ".config" / "deep-breath-cli" / "stats.lock").exists()
+
+
+def record_sessions(home: Path, worker: int) -> None:
+    """Record sessions with start times of their own, in another process."""
+    with patch("pathlib.Path.home", return_value=home):
+        manager = StatsManager()
+        for i in range(20):
+            start = 1_754_000_000 + i * 2 + worker
+            manager.add_session("4-7-8", 1, 19, start, start + 19)
+
+
+def test_processes_saving_at_once_lose_nothing(tmp_path):
+    """Test the stats lock with two processes recording at the same time."""
+    with ProcessPoolExecutor(2) as pool:
+        list(pool.map(record_sessions, [tmp_path] * 2, [0, 1]))
+
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        data = StatsManager().data
+    assert data["total_sessions"] == 40
+    assert data["patterns_used"]["4-7-8"] == 40
+    assert len({session["id"] for session in data["sessions"]}) == 40
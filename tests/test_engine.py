@@ -0,0 +1,105 @@
+import asyncio
+import time
+import pytest
+from src.deep_breath_cli.engine import SessionEngine, SimulatedClock
+
+PHASES = [(4, "[blue]Breathe in..."), (7, "[green]Hold..."), (8, "Breathe out...")]
+
+
+def run_engine(engine, **kwargs):
+    """Run a session and return its summary and the recorded sessions."""
+    recorded = []
+    summary = asyncio.run(engine.run(record=recorded.append, **kwargs))
+    return summary, recorded
+
+
+def test_full_session_counts_every_phase():
+    """Test that a session runs every phase of every cycle."""
+    clock = SimulatedClock()
+    summary, recorded = run_engine(SessionEngine(PHASES, 3, clock))
+    assert clock.now() == 57
+    assert summary["status"] == "finished"
+    assert (summary["cycles"], summary["duration_seconds"]) == (3, 57)
+    assert recorded == [summary]
+
+
+def test_pause_resume_and_skip():
+    """Test that paused time is not counted and skipped phases end early."""
+    clock = SimulatedClock()
+    engine = SessionEngine(PHASES, 1, clock)
+    clock.at(2, lambda: engine.handle_key("p"))
+    clock.at(62, lambda: engine.handle_key("r"))
+    # The hold phase starts at 64, once the 2 remaining seconds are done
+    clock.at(68, lambda: engine.handle_key("s"))
+    clock.at(69, lambda: engine.handle_key("x"))
+    summary, _ = run_engine(engine)
+
+    assert clock.now() == 76
+    assert summary["cycles"] == 1
+    assert summary["duration_seconds"] == 4 + 4 + 8
+
+
+def test_stop_records_a_partial_session():
+    """Test that quitting keeps the time breathed so far."""
+    clock = SimulatedClock()
+    engine = SessionEngine(PHASES, 4, clock)
+    clock.at(25.4, engine.stop)
+    summary, recorded = run_engine(engine)
+
+    assert summary["status"] == "stopped"
+    assert (summary["cycles"], summary["duration_seconds"]) == (1, 25)
+    assert recorded == [summary]
+
+
+def test_cancellation_records_a_partial_session():
+    """Test that a cancelled session is recorded before the error goes on."""
+    clock = SimulatedClock()
+    engine = SessionEngine(PHASES, 2, clock)
+    recorded = []
+
+    async def cancel_later():
+        task = asyncio.create_task(engine.run(record=recorded.append))
+        clock.at(30, task.cancel)
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(cancel_later())
+    assert engine.status == "cancelled"
+    assert recorded[0]["duration_seconds"] == 30
+    assert recorded[0]["cycles"] == 1
+
+
+def test_stop_before_a_second_records_nothing():
+    """Test that an immediate quit does not add an empty session."""
+    clock = SimulatedClock()
+    engine = SessionEngine(PHASES, 1, clock)
+    clock.at(0.2, engine.stop)
+    _, recorded = run_engine(engine)
+    assert recorded == []
+
+
+def test_slow_terminal_does_not_delay_phases():
+    """Test that slow drawing and saving leave phase timing alone."""
+    draws = []
+    events = {}
+
+    class SlowRenderer:
+        def draw(self, frame):
+            draws.append(frame)
+            time.sleep(0.4)
+
+        def close(self):
+            pass
+
+    def slow_record(session):
+        time.sleep(0.4)
+
+    def on_event(event, payload):
+        events[event] = time.perf_counter()
+
+    start = time.perf_counter()
+    engine = SessionEngine([(1, "In"), (1, "Out")], 1, events=on_event)
+    asyncio.run(engine.run(SlowRenderer(), slow_record))
+    # Each phase ended on time, whatever the renderer was doing
+    assert events["session_complete"] - start < 2.1
+    assert draws[-1]["elapsed"] == 1
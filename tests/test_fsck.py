@@ -0,0 +1,184 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from functools import reduce
+from unittest.mock import patch
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.fsck import (
+    StatsChecker,
+    _empty_partial,
+    combine,
+    summarize_range,
+)
+from src.deep_breath_cli.stats import LOCK_FILE, StatsManager, dump_stats
+from src.deep_breath_cli.storage import FileStorage
+
+
+def make_stats(tmp_path, count=40):
+    """Record sessions over several days and return the stats manager."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+        starts = [1_754_000_000 + i * 20_000 for i in range(count)]
+        manager.add_sessions(
+            [
+                {
+                    "date": datetime.fromtimestamp(start).strftime("%Y-%m-%d"),
+                    "start": start,
+                    "end": start + 76,
+                    "pattern": "4-7-8" if i % 3 else "box",
+                    "cycles": 4,
+                    "duration_seconds": 76,
+                }
+                for i, start in enumerate(starts)
+            ]
+        )
+    return manager
+
+
+def test_summarize_range_splits_on_line_boundaries(tmp_path):
+    """Test that any split of the session lines counts each session once."""
+    manager = make_stats(tmp_path)
+    checker = StatsChecker(manager.stats_file)
+    checker.scan(workers=1)
+    start, end = checker.body
+
+    for splits in ([start + 1, end - 1], [start + 7, start + 500, start + 501]):
+        bounds = [start] + splits + [end]
+        partials = [
+            summarize_range(manager.stats_file, a, b)
+            for a, b in zip(bounds, bounds[1:])
+        ]
+        merged = reduce(combine, partials, _empty_partial())
+        assert merged == checker.partial
+    assert checker.partial["total_sessions"] == 40
+
+
+def test_fsck_finds_and_repairs_drift(tmp_path):
+    """Test that drifted aggregates are reported and rewritten, sessions kept."""
+    manager = make_stats(tmp_path)
+    sessions = manager.data["sessions"]
+    manager.data["total_sessions"] = 7
+    manager.data["patterns_used"]["box"] += 2
+    manager.data["streaks"]["longest"] = 99
+    manager.data["rollups"]["by_hour"][0] += 1
+    manager._save_stats()
+
+    checker = StatsChecker(manager.stats_file)
+    checker.scan(workers=2)
+    assert checker.find_mismatches() == [
+        "total_sessions: 7 stored, 40 in sessions",
+        "patterns_used.box: 16 stored, 14 in sessions",
+        "streaks.longest: 99 stored, 10 in sessions",
+        "rollups.by_hour: 1 of 24 buckets differ",
+    ]
+
+    assert checker.repair() is True
+    with open(manager.stats_file) as f:
+        repaired = json.load(f)
+    assert repaired["sessions"] == sessions
+    assert repaired["total_sessions"] == 40
+    assert repaired["patterns_used"] == {"4-7-8": 26, "4-4-4-4": 0, "box": 14}
+
+    checker = StatsChecker(manager.stats_file)
+    checker.scan(workers=1)
+    assert checker.find_mismatches() == []
+
+
+def test_fsck_current_streak_on_a_later_day(tmp_path):
+    """Test that a healthy file is still healthy the days after it was saved."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+        manager.add_session("4-7-8", 4, 76)
+    assert manager.data["streaks"]["current"] == 1
+
+    class Tomorrow(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + timedelta(days=1)
+
+    with (
+        patch("src.deep_breath_cli.fsck.datetime", Tomorrow),
+        patch("src.deep_breath_cli.merge.datetime", Tomorrow),
+    ):
+        checker = StatsChecker(manager.stats_file)
+        checker.scan(workers=1)
+        assert checker.find_mismatches() == []
+
+        # Saved again that day, without a session: the streak is over
+        manager.data["streaks"]["current"] = 0
+        manager._save_stats()
+        checker = StatsChecker(manager.stats_file)
+        checker.scan(workers=1)
+        assert checker.find_mismatches() == []
+
+        manager.data["streaks"]["current"] = 5
+        manager._save_stats()
+        checker = StatsChecker(manager.stats_file)
+        checker.scan(workers=1)
+        assert checker.find_mismatches() == ["streaks.current: 5 stored, 1 in sessions"]
+
+
+def test_fsck_handles_files_not_written_by_dump_stats(tmp_path):
+    """Test the whole-file fallback for compact or hand-edited JSON."""
+    manager = make_stats(tmp_path, count=3)
+    data = dict(manager.data, total_time_seconds=1)
+    manager.stats_file.write_text(json.dumps(data))
+
+    checker = StatsChecker(manager.stats_file)
+    checker.scan()
+    assert checker.body is None
+    assert "total_time_seconds: 1 stored, 228 in sessions" in checker.find_mismatches()
+    assert checker.repair() is True
+    assert json.loads(manager.stats_file.read_text())["total_time_seconds"] == 228
+
+
+def test_fsck_refuses_to_repair_a_file_that_changed(tmp_path):
+    """Test that a session added during the check is never overwritten."""
+    manager = make_stats(tmp_path, count=3)
+    checker = StatsChecker(manager.stats_file)
+    checker.scan()
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        StatsManager().add_session("4-7-8", 1, 19)
+    assert checker.repair() is False
+
+
+def test_fsck_repairs_under_the_stats_lock(tmp_path):
+    """Test that a repair waits for a save in progress, then refuses."""
+    manager = make_stats(tmp_path, count=3)
+    checker = StatsChecker(manager.stats_file)
+    checker.scan()
+    results = []
+    repair = threading.Thread(target=lambda: results.append(checker.repair()))
+
+    with FileStorage(manager.stats_file.parent).lock(LOCK_FILE):
+        repair.start()
+        repair.join(0.2)
+        assert repair.is_alive()
+        manager.data["total_sessions"] += 1
+        manager.stats_file.write_text(dump_stats(manager.data))
+    repair.join()
+
+    assert results == [False]
+    assert json.loads(manager.stats_file.read_text())["total_sessions"] == 4
+
+
+def test_stats_fsck_command(tmp_path):
+    """Test exit codes and output of 'breath stats fsck'."""
+    manager = make_stats(tmp_path, count=3)
+    manager.data["total_sessions"] = 1
+    manager._save_stats()
+    runner = CliRunner()
+
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        result = runner.invoke(app, ["stats", "fsck", "-w", "1"])
+        assert result.exit_code == 1
+        assert "total_sessions: 1 stored, 3 in sessions" in result.output
+
+        result = runner.invoke(app, ["stats", "fsck", "--repair", "-w", "1"])
+        assert result.exit_code == 0
+        assert "Aggregates rewritten" in result.output
+
+        result = runner.invoke(app, ["stats", "fsck", "-w", "1"])
+    assert result.exit_code == 0
+    assert "All aggregates match the sessions." in result.output
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock
+from src.deep_breath_cli.bench import group_load, percentile
+from src.deep_breath_cli.engine import SessionEngine
+from src.deep_breath_cli.group import (
+    MAX_CLIENT_BUFFER,
+    GroupClient,
+    GroupHost,
+    parse_address,
+)
+
+STEPS = [[0.3, "[blue]In"], [0.3, "Out"]]
+
+
+def host_message(host, event, **payload):
+    """Return a message of the host as a client decodes it."""
+    return json.loads(host.message(event, payload))
+
+
+def test_parse_address():
+    """Test telling TCP addresses from Unix socket paths."""
+    assert parse_address("0.0.0.0:7464") == ("tcp", ("0.0.0.0", 7464))
+    assert parse_address(":7464") == ("tcp", ("127.0.0.1", 7464))
+    kind, path = parse_address("/tmp/breath:1.sock")
+    assert kind == "unix" and path.name == "breath:1.sock"
+
+
+def test_hundreds_of_clients_follow_the_host(tmp_path):
+    """Load harness: every client gets every event, quickly and cheaply."""
+    clients = 300
+    result = group_load(str(tmp_path / "group.sock"), clients, STEPS, 2)
+
+    expected = ["hello", "session_start"]
+    expected += ["phase_change", "phase_change", "cycle_complete"] * 2
+    expected += ["session_complete"]
+    for events in result["events"]:
+        assert [event for event in events if event != "tick"] == expected
+    assert result["dropped"] == 0
+
+    # Fan-out latency, with all clients parsing on the same machine
+    assert percentile(result["latencies"], 99) < 0.5
+    # Encoding happens once per event, whatever the number of clients
+    per_message = result["host_cpu"] / (result["broadcasts"] * clients)
+    assert per_message < 0.0005
+    assert not (tmp_path / "group.sock").exists()
+
+
+def test_lagging_client_is_dropped():
+    """Test that a client that stops reading is cut off, not waited for."""
+    host = GroupHost(SessionEngine(STEPS, 1), "box")
+    reading, stuck = MagicMock(), MagicMock()
+    reading.transport.get_write_buffer_size.return_value = 0
+    stuck.transport.get_write_buffer_size.return_value = MAX_CLIENT_BUFFER + 1
+    host.clients = {reading, stuck}
+    host.broadcast("tick", {})
+    host.broadcast("tick", {})
+
+    assert reading.write.call_count == 2
+    stuck.write.assert_not_called()
+    stuck.transport.abort.assert_called_once()
+    assert host.clients == {reading} and host.dropped == 1
+
+
+def test_client_moves_on_between_messages():
+    """Test that a client extrapolates the last frame and records its part."""
+    engine = SessionEngine([[10, "In"]], 2)
+    engine.status = "running"
+    host = GroupHost(engine, "slow")
+    client = GroupClient()
+    engine.breathing_seconds = 4
+    client.receive(host_message(host, "tick"))
+    time.sleep(0.05)
+    assert 0.05 <= client.snapshot()["elapsed"] < 1
+
+    engine.pause()
+    client.receive(host_message(host, "tick"))
+    time.sleep(0.05)
+    assert client.snapshot()["elapsed"] == 0
+
+    engine.status = "finished"
+    client.receive(
+        host_message(host, "session_complete", duration_seconds=20, cycles=2)
+    )
+    session = client.session()
+    assert (session["duration_seconds"], session["status"]) == (16, "finished")
+    assert client.pattern == "slow"
+
+
+def test_client_skips_damaged_lines(tmp_path):
+    """Test that a malformed or truncated line does not end the session."""
+    engine = SessionEngine([[10, "In"]], 1)
+    engine.status = "running"
+    host = GroupHost(engine, "box")
+    address = str(tmp_path / "group.sock")
+
+    async def serve(reader, writer):
+        writer.write(b'{"event": "tick", "pat\n[1, 2]\n{}\n')
+        writer.write(host.message("tick", {}))
+        writer.write(host.message("session_complete", {"duration_seconds": 10}))
+        await writer.drain()
+        writer.close()
+
+    client = GroupClient()
+
+    async def follow():
+        server = await asyncio.start_unix_server(serve, address)
+        async with server:
+            return await client.run(address)
+
+    session = asyncio.run(follow())
+    assert client.skipped == 3
+    assert (session["status"], session["duration_seconds"]) == ("finished", 10)
+
+
+def test_events_still_reach_hooks():
+    """Test that hosting keeps the engine's event listener."""
+    seen = []
+    engine = SessionEngine(STEPS, 1, events=lambda e, p: seen.append(e))
+    host = GroupHost(engine, "box")
+
+    async def run():
+        host._loop = asyncio.get_running_loop()
+        await engine.run()
+        # Broadcasts wait for the engine to enter the state they describe
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert seen[0] == "session_start" and seen[-1] == "session_complete"
+    assert host.broadcasts == len(seen)
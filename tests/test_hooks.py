@@ -0,0 +1,169 @@
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+from src.deep_breath_cli.engine import SessionEngine, SimulatedClock
+from src.deep_breath_cli.hooks import EventBus, Hook, load_hooks
+from src.deep_breath_cli.metrics import MetricsExporter
+from tests.test_metrics import parse_metrics
+
+
+def test_engine_emits_lifecycle_events():
+    """Test the order and payloads of the events of a session."""
+    events = []
+    engine = SessionEngine(
+        [(4, "[blue]Breathe in..."), (4, "Out")],
+        2,
+        SimulatedClock(),
+        lambda event, payload: events.append((event, payload)),
+    )
+    asyncio.run(engine.run())
+
+    assert [event for event, _ in events] == [
+        "session_start",
+        "phase_change",
+        "phase_change",
+        "cycle_complete",
+        "phase_change",
+        "phase_change",
+        "cycle_complete",
+        "session_complete",
+    ]
+    assert events[1][1] == {
+        "cycle": 1,
+        "phase": 1,
+        "message": "Breathe in...",
+        "duration": 4,
+        "duration_seconds": 0,
+    }
+    assert events[5][1]["duration_seconds"] == 12
+    assert events[-1][1]["duration_seconds"] == 16
+    assert events[-1][1]["status"] == "finished"
+
+
+def test_slow_hook_never_blocks_emit():
+    """Test that a stuck hook drops its own events, others still get theirs."""
+    started = threading.Event()
+    release = threading.Event()
+    received = []
+
+    def stuck(event, payload):
+        started.set()
+        release.wait()
+
+    slow = Hook("slow", stuck)
+    fast = Hook(
+        "fast", lambda e, payload: received.append(payload["n"]), {"phase_change"}
+    )
+    bus = EventBus([slow, fast], {"pattern": "box"})
+    bus.emit("cycle_complete", {"n": -1})
+    assert started.wait(5)
+
+    start = time.perf_counter()
+    for n in range(50):
+        bus.emit("phase_change", {"n": n})
+    for n in range(200):
+        bus.emit("cycle_complete", {"n": n})
+    assert time.perf_counter() - start < 0.1
+
+    release.set()
+    bus.close(timeout=5)
+    assert received == list(range(50))
+    # The first event was being handled, 64 waited and the rest were dropped
+    assert slow.dropped == 250 - 64
+    assert slow.latency.counts[-1] == 65
+    assert fast.dropped == 0
+
+
+def test_hook_failures_are_counted():
+    """Test that an exception in a hook is reported and counted."""
+
+    def broken(event, payload):
+        raise RuntimeError("boom")
+
+    hook = Hook("broken", broken, {"session_complete"})
+    bus = EventBus([hook])
+    bus.emit("phase_change", {})
+    bus.emit("session_complete", {})
+    bus.close()
+    assert hook.failures == 1
+    assert hook.latency.counts[-1] == 1
+
+
+def test_shell_and_entry_point_hooks(tmp_path):
+    """Test loading hooks.json commands and entry points."""
+    out = tmp_path / "out.txt"
+    (tmp_path / "hooks.json").write_text(
+        json.dumps(
+            {
+                "session_complete": [f'echo "$BREATH_EVENT" > {out}; cat >> {out}'],
+                "not_an_event": ["true"],
+            }
+        )
+    )
+    plugin = MagicMock()
+    entry_point = MagicMock()
+    entry_point.name = "plugin"
+    entry_point.load.return_value = plugin
+    with patch(
+        "src.deep_breath_cli.hooks.entry_points", return_value=[entry_point]
+    ) as mock_entry_points:
+        hooks = load_hooks(tmp_path)
+    mock_entry_points.assert_called_once_with(group="deep_breath_cli.hooks")
+    assert [hook.name for hook in hooks][1:] == ["plugin"]
+
+    bus = EventBus(hooks, {"pattern": "4-7-8"})
+    bus.emit("phase_change", {"cycle": 1})
+    bus.emit("session_complete", {"duration_seconds": 19})
+    bus.close()
+
+    event, payload = out.read_text().split("\n", 1)
+    assert event == "session_complete"
+    assert json.loads(payload)["pattern"] == "4-7-8"
+    assert plugin.call_count == 2
+
+
+def test_malformed_hooks_file_is_skipped(tmp_path, capsys):
+    """Test that hooks.json of the wrong shape warns instead of failing."""
+    hooks_file = tmp_path / "hooks.json"
+    with patch("src.deep_breath_cli.hooks.entry_points", return_value=[]):
+        hooks_file.write_text("[]")
+        assert load_hooks(tmp_path) == []
+
+        hooks_file.write_text(
+            json.dumps(
+                {
+                    "session_start": "true",
+                    "phase_change": ["true", 3, None],
+                    "session_complete": ["true"],
+                }
+            )
+        )
+        hooks = load_hooks(tmp_path)
+
+    assert [hook.name for hook in hooks] == ["true", "true"]
+    output = capsys.readouterr().out
+    assert "expected an object of event names" in output
+    assert "Ignoring hooks of 'session_start'" in output
+    assert "3 is not a command" in output and "None is not a command" in output
+
+
+def test_hook_latency_is_exported(tmp_path):
+    """Test that hook latency, failures and drops accumulate in the textfile."""
+    exporter = MetricsExporter(tmp_path / "metrics.json", tmp_path / "breath.prom")
+    hook = Hook("notify", lambda event, payload: None)
+    hook.latency.observe(0.02)
+    hook.dropped = 3
+    exporter.observe_hooks([hook])
+    exporter.observe_hooks([hook])
+
+    samples = parse_metrics((tmp_path / "breath.prom").read_text())
+    labels = (("hook", "notify"),)
+    assert samples[("breath_hook_duration_seconds_count", labels)] == 2
+    assert (
+        samples[("breath_hook_duration_seconds_bucket", labels + (("le", "0.01"),))]
+        == 0
+    )
+    assert samples[("breath_hook_dropped_events_total", labels)] == 6
+    assert samples[("breath_hook_failures_total", labels)] == 0
@@ -0,0 +1,178 @@
+import copy
+import gzip
+import json
+from unittest.mock import patch
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.importer import SessionReader, detect_format, validate_session
+from src.deep_breath_cli.stats import StatsManager
+
+
+CSV_EXPORT = """Date;Pattern;Cycles;Duration (seconds)
+2025-08-05;4-4-4-4;2;32
+2025-08-06;4-7-8;4;76
+not-a-date;4-7-8;4;76
+2025-08-06;4-7-8;zero;76
+"""
+
+
+def test_detect_format(tmp_path):
+    """Test format detection from file names."""
+    assert detect_format(tmp_path / "stats.json") == "json"
+    assert detect_format(tmp_path / "stats.csv.gz") == "csv"
+    assert detect_format(tmp_path / "stats.jsonl") == "ndjson"
+    assert detect_format(tmp_path / "stats.ndjson.gz") == "ndjson"
+
+
+def test_validate_session():
+    """Test row validation and normalization."""
+    raw = {"date": "2025-08-06", "pattern": "4-7-8", "cycles": "4"}
+    assert validate_session({**raw, "duration_seconds": "76"}) == {
+        "date": "2025-08-06",
+        "pattern": "4-7-8",
+        "cycles": 4,
+        "duration_seconds": 76,
+    }
+    assert validate_session(raw) is None
+    assert validate_session({**raw, "duration_seconds": 76, "cycles": 0}) is None
+
+
+def test_reader_csv_batches(tmp_path):
+    """Test that CSV rows are streamed in batches and bad rows are counted."""
+    path = tmp_path / "stats.csv"
+    path.write_text(CSV_EXPORT)
+
+    reader = SessionReader(path)
+    batches = list(reader.batches(batch_size=1))
+
+    assert [len(batch) for batch in batches] == [1, 1]
+    assert batches[0][0]["pattern"] == "4-4-4-4"
+    assert reader.invalid_rows == 2
+    assert reader.errors == ["Row 4: invalid session", "Row 5: invalid session"]
+
+
+def test_reader_gzip_ndjson(tmp_path):
+    """Test reading a gzipped NDJSON file."""
+    path = tmp_path / "stats.ndjson.gz"
+    lines = [
+        json.dumps(
+            {
+                "date": "2025-08-06",
+                "pattern": "4-7-8",
+                "cycles": 4,
+                "duration_seconds": 76,
+            }
+        ),
+        "{broken",
+    ]
+    with gzip.open(path, "wt") as f:
+        f.write("\n".join(lines))
+
+    reader = SessionReader(path)
+    sessions = [s for batch in reader.batches() for s in batch]
+    assert len(sessions) == 1
+    assert reader.invalid_rows == 1
+
+
+def test_reader_unsupported_format(tmp_path):
+    """Test that unknown formats are rejected."""
+    try:
+        SessionReader(tmp_path / "stats.xml")
+    except ValueError as e:
+        assert "Unsupported format" in str(e)
+    else:
+        raise AssertionError("ValueError not raised")
+
+
+def test_import_stats_roundtrip(tmp_path):
+    """Test that a JSON export imports once and is idempotent afterwards."""
+    with patch("pathlib.Path.home", return_value=tmp_path / "a"):
+        source = StatsManager()
+        source.add_session("4-7-8", 4, 76)
+        source.add_session("4-4-4-4", 2, 32)
+        export = tmp_path / "export.json"
+        source._export_json(str(export))
+
+    with patch("pathlib.Path.home", return_value=tmp_path / "b"):
+        target = StatsManager()
+        assert target.import_stats(str(export)) == 2
+        assert target.import_stats(str(export)) == 0
+
+    assert target.data["total_sessions"] == 2
+    assert target.data["total_time_seconds"] == 108
+    assert target.data["patterns_used"]["4-4-4-4"] == 1
+    assert target.data["streaks"]["current"] == 1
+
+
+def test_import_stats_csv_roundtrip(tmp_path):
+    """Test that importing a CSV export again leaves the totals unchanged."""
+    export = tmp_path / "export.csv"
+    with patch("pathlib.Path.home", return_value=tmp_path / "a"):
+        source = StatsManager()
+        source.add_session("4-7-8", 4, 76)
+        source.add_session("4-4-4-4", 2, 32)
+        source.export_stats("csv", str(export))
+        assert source.import_stats(str(export)) == 0
+        assert source.data["total_sessions"] == 2
+
+    with patch("pathlib.Path.home", return_value=tmp_path / "b"):
+        target = StatsManager()
+        assert target.import_stats(str(export)) == 2
+        assert target.import_stats(str(export)) == 0
+
+    assert target.data["total_sessions"] == 2
+    assert [s["id"] for s in target.data["sessions"]] == [
+        s["id"] for s in source.data["sessions"]
+    ]
+    assert target.data["sessions"][0]["start"] == source.data["sessions"][0]["start"]
+
+
+def test_import_stats_failing_halfway_keeps_nothing(tmp_path):
+    """Test that an import failing after a batch leaves no trace of it."""
+    path = tmp_path / "stats.csv"
+    path.write_text(CSV_EXPORT)
+    real_batches = SessionReader.batches
+
+    def failing_batches(reader):
+        yield from real_batches(reader)
+        raise OSError("device went away")
+
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+        manager.add_session("box", 4, 64)
+        before = copy.deepcopy(manager.data)
+        with patch.object(SessionReader, "batches", failing_batches):
+            assert manager.import_stats(str(path)) == 0
+        assert manager.data == before
+        assert len(manager.index) == 1
+
+        # Nothing of the failed import is saved with the next session
+        manager.add_session("box", 4, 64)
+        assert StatsManager().data["total_sessions"] == 2
+        assert manager.import_stats(str(path)) == 2
+
+
+def test_import_stats_command(tmp_path):
+    """Test the import-stats command with a CSV export."""
+    path = tmp_path / "stats.csv"
+    path.write_text(CSV_EXPORT)
+
+    runner = CliRunner()
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        result = runner.invoke(app, ["import-stats", str(path)])
+        stats = StatsManager()
+
+    assert result.exit_code == 0
+    assert "Imported 2 sessions" in result.stdout
+    assert "Skipped 2 invalid rows" in result.stdout
+    assert stats.data["total_sessions"] == 2
+
+
+def test_import_stats_missing_file(tmp_path):
+    """Test importing a file that does not exist."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+
+    with patch("builtins.print") as mock_print:
+        assert manager.import_stats(str(tmp_path / "missing.csv")) == 0
+        mock_print.assert_called_with(f"File not found: {tmp_path / 'missing.csv'}")
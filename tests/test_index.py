@@ -0,0 +1,92 @@
+import json
+from unittest.mock import patch
+from src.deep_breath_cli.index import DIGEST_SIZE, SessionIndex, assign_ids
+from src.deep_breath_cli.stats import StatsManager
+
+
+def _session(date="2025-08-06", pattern="4-7-8", cycles=4, duration=76):
+    return {
+        "date": date,
+        "pattern": pattern,
+        "cycles": cycles,
+        "duration_seconds": duration,
+    }
+
+
+def test_assign_ids_is_stable():
+    """Test that legacy sessions get the same ids on every run."""
+    first = [_session(), _session(), _session(pattern="4-4-4-4")]
+    second = [_session(), _session(), _session(pattern="4-4-4-4")]
+
+    assert assign_ids(first) == 3
+    assert assign_ids(second) == 3
+    assert [s["id"] for s in first] == [s["id"] for s in second]
+    # Identical sessions on the same day are still distinct
+    assert len({s["id"] for s in first}) == 3
+    # Sessions that already have an id are left alone
+    assert assign_ids(first) == 0
+
+
+def test_session_index_roundtrip(tmp_path):
+    """Test that added ids are persisted as fixed-size digests."""
+    index_file = tmp_path / "sessions.idx"
+    index = SessionIndex(index_file)
+
+    assert index.add("1754438400-abc") is True
+    assert index.add("1754438400-abc") is False
+    index.add("1754438400-def")
+    index.flush()
+
+    assert index_file.stat().st_size == 2 * DIGEST_SIZE
+    reloaded = SessionIndex(index_file)
+    assert "1754438400-abc" in reloaded
+    assert "1754438400-xyz" not in reloaded
+    assert not reloaded.is_stale(2)
+
+
+def test_add_session_sets_id(tmp_path):
+    """Test that recorded sessions get an id and land in the index."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+        manager.add_session("4-7-8", 4, 76)
+
+    session = manager.data["sessions"][0]
+    assert "id" in session
+    assert session["id"] in SessionIndex(manager.config_dir / "sessions.idx")
+
+
+def test_legacy_sessions_are_migrated(tmp_path):
+    """Test that sessions without an id are given one when loading."""
+    config_dir = tmp_path / ".config" / "deep-breath-cli"
+    config_dir.mkdir(parents=True)
+    legacy = {
+        "total_sessions": 1,
+        "total_time_seconds": 76,
+        "patterns_used": {"4-7-8": 1},
+        "sessions": [_session()],
+        "streaks": {"current": 0, "longest": 0},
+    }
+    (config_dir / "stats.json").write_text(json.dumps(legacy))
+
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        StatsManager()
+
+    saved = json.loads((config_dir / "stats.json").read_text())
+    assert "id" in saved["sessions"][0]
+
+
+def test_add_sessions_is_idempotent(tmp_path):
+    """Test that adding the same batch twice only counts it once."""
+    batch = [_session(), _session(pattern="4-4-4-4", duration=64)]
+
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+        assert manager.add_sessions([dict(s) for s in batch]) == 2
+        assert manager.add_sessions([dict(s) for s in batch]) == 0
+
+        reloaded = StatsManager()
+
+    assert reloaded.data["total_sessions"] == 2
+    assert reloaded.data["total_time_seconds"] == 140
+    assert reloaded.data["patterns_used"]["4-4-4-4"] == 1
+    assert reloaded.add_sessions([dict(s) for s in batch]) == 0
@@ -0,0 +1,110 @@
+import io
+import json
+import threading
+from unittest.mock import patch
+from src.deep_breath_cli.loader import SessionStream
+from src.deep_breath_cli.stats import LOCK_FILE, StatsManager, dump_stats
+from src.deep_breath_cli.storage import FileStorage
+
+
+def _sessions(count):
+    return [
+        {
+            "date": f"2025-08-{day % 28 + 1:02d}",
+            "pattern": "4-7-8",
+            "cycles": 4,
+            "duration_seconds": 76,
+        }
+        for day in range(count)
+    ]
+
+
+def _stats(sessions):
+    return {
+        "total_sessions": len(sessions),
+        "total_time_seconds": 76 * len(sessions),
+        "patterns_used": {"sessions": len(sessions)},
+        "sessions": sessions,
+        "streaks": {"current": 0, "longest": 0},
+    }
+
+
+def test_stream_legacy_indented_file():
+    """Test streaming a json.dump(indent=2) file with tiny chunks."""
+    text = json.dumps(_stats(_sessions(50)), indent=2)
+    stream = SessionStream(io.StringIO(text), chunk_size=7)
+
+    assert list(stream) == _sessions(50)
+    assert stream.complete is True
+    assert stream.error is None
+
+
+def test_stream_current_format():
+    """Test streaming the one-session-per-line format."""
+    text = dump_stats(_stats(_sessions(3)))
+    assert list(SessionStream(io.StringIO(text), chunk_size=16)) == _sessions(3)
+
+
+def test_stream_salvages_up_to_corruption():
+    """Test that valid sessions before a corrupt byte are kept."""
+    text = dump_stats(_stats(_sessions(10)))
+    lines = text.splitlines()
+    broken_line = next(i for i, line in enumerate(lines) if "2025-08-05" in line)
+    lines[broken_line] = lines[broken_line].replace('"pattern"', '"pat\x00tern')
+    stream = SessionStream(io.StringIO("\n".join(lines)), chunk_size=32)
+
+    salvaged = list(stream)
+    assert salvaged == _sessions(4)
+    assert stream.complete is False
+    assert "after 4 valid ones" in stream.error
+
+
+def test_stream_truncated_file():
+    """Test a file cut in the middle of the sessions array."""
+    text = dump_stats(_stats(_sessions(5)))
+    stream = SessionStream(io.StringIO(text[: text.index('"2025-08-05"')]))
+
+    assert list(stream) == _sessions(4)
+    assert stream.error is not None
+
+
+def test_corrupt_stats_file_is_recovered(tmp_path):
+    """Test that a damaged stats.json keeps its readable sessions."""
+    config_dir = tmp_path / ".config" / "deep-breath-cli"
+    config_dir.mkdir(parents=True)
+    text = dump_stats(_stats(_sessions(6)))
+    (config_dir / "stats.json").write_text(text[: text.index('"2025-08-06"')])
+
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+
+    assert manager.data["total_sessions"] == 5
+    assert manager.data["total_time_seconds"] == 380
+    assert manager.data["patterns_used"]["4-7-8"] == 5
+    assert manager.data["streaks"]["longest"] == 5
+    assert (config_dir / "stats.json.corrupt").exists()
+    assert json.loads((config_dir / "stats.json").read_text())["total_sessions"] == 5
+
+
+def test_file_recovered_meanwhile_is_loaded(tmp_path):
+    """Test that recovery waits for the lock and reads a file saved meanwhile."""
+    config_dir = tmp_path / ".config" / "deep-breath-cli"
+    config_dir.mkdir(parents=True)
+    text = dump_stats(_stats(_sessions(6)))
+    (config_dir / "stats.json").write_text(text[: text.index('"2025-08-06"')])
+    managers = []
+
+    def load():
+        with patch("pathlib.Path.home", return_value=tmp_path):
+            managers.append(StatsManager())
+
+    loader = threading.Thread(target=load)
+    with FileStorage(config_dir).lock(LOCK_FILE):
+        loader.start()
+        loader.join(0.2)
+        assert loader.is_alive()
+        (config_dir / "stats.json").write_text(text)
+    loader.join()
+
+    assert managers[0].data["total_sessions"] == 6
+    assert not (config_dir / "stats.json.corrupt").exists()
@@ -0,0 +1,133 @@
+import os
+import subprocess
+import sys
+import typer
+from unittest.mock import patch
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.completion import COMPLETE_VAR, fast_complete
+from src.deep_breath_cli.manifest import (
+    MANIFEST_FILE,
+    CommandManifest,
+    _stamp,
+    build_manifest,
+    manifest_sources,
+)
+
+runner = CliRunner()
+
+# Runs the launcher, then lists the heavy modules it imported on stderr
+LAUNCHER = (
+    "import atexit, sys\n"
+    "atexit.register(lambda: print(sorted("
+    "m for m in ('typer', 'rich', 'plotext') if m in sys.modules), file=sys.stderr))\n"
+    "sys.argv = ['breath'] + sys.argv[1:]\n"
+    "from src.deep_breath_cli.launcher import main\n"
+    "main()\n"
+)
+
+
+def run_launcher(tmp_path, *args):
+    """Run the breath entry point in a fresh interpreter."""
+    env = dict(os.environ, HOME=str(tmp_path), COLUMNS="100")
+    return subprocess.run(
+        [sys.executable, "-c", LAUNCHER, *args],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+
+def test_help_and_version_answered_from_manifest(tmp_path):
+    """Test that a second run prints the same help without importing typer."""
+    first = run_launcher(tmp_path, "stats", "--help")
+    assert "Display breathing session statistics." in first.stdout
+    assert first.stderr.strip() != "[]"
+    assert (tmp_path / ".config" / "deep-breath-cli" / MANIFEST_FILE).exists()
+
+    second = run_launcher(tmp_path, "stats", "--help")
+    assert second.stdout == first.stdout
+    assert second.stderr.strip() == "[]"
+
+    version = run_launcher(tmp_path, "--version")
+    assert version.stdout.startswith("deep-breath-cli ")
+    assert version.stderr.strip() == "[]"
+    # Not cached yet for this command: the full CLI answers, and errors as usual
+    unknown = run_launcher(tmp_path, "nope", "--help")
+    assert unknown.returncode == 2
+
+
+def test_manifest_completion_matches_typer(tmp_path):
+    """Test that command and option names complete exactly like typer."""
+    manifest = build_manifest(typer.main.get_command(app))
+    manifest.save(tmp_path)
+    manifest = CommandManifest.load(tmp_path)
+    cases = [
+        {COMPLETE_VAR: "complete_bash", "COMP_WORDS": "breath ", "COMP_CWORD": "1"},
+        {COMPLETE_VAR: "complete_bash", "COMP_WORDS": "breath st", "COMP_CWORD": "1"},
+        {COMPLETE_VAR: "complete_zsh", "_TYPER_COMPLETE_ARGS": "breath stats "},
+        {COMPLETE_VAR: "complete_zsh", "_TYPER_COMPLETE_ARGS": "breath start --c"},
+        {
+            COMPLETE_VAR: "complete_fish",
+            "_TYPER_COMPLETE_FISH_ACTION": "get-args",
+            "_TYPER_COMPLETE_ARGS": "breath stats --",
+        },
+        {
+            COMPLETE_VAR: "complete_fish",
+            "_TYPER_COMPLETE_FISH_ACTION": "is-args",
+            "_TYPER_COMPLETE_ARGS": "breath stats fsck --x",
+        },
+    ]
+    for env in cases:
+        output, code = fast_complete(env, tmp_path, manifest)
+        with patch("pathlib.Path.home", return_value=tmp_path):
+            result = runner.invoke(app, [], env=env, prog_name="breath")
+        assert result.output == ("" if output is None else output + "\n")
+        assert result.exit_code == code
+
+    # Arguments and words after an option are left to typer
+    for line in ("breath start ", "breath start --cycles 3 --"):
+        env = {COMPLETE_VAR: "complete_zsh", "_TYPER_COMPLETE_ARGS": line}
+        assert fast_complete(env, tmp_path, manifest) is None
+
+
+def test_manifest_discarded_when_cli_changes(tmp_path):
+    """Test that a manifest describing other sources is not used."""
+    source = tmp_path / "breath.py"
+    source.write_text("app = None\n")
+    manifest = CommandManifest()
+    manifest.sources = {str(source): _stamp(source)}
+    manifest.version = "deep-breath-cli 9.9"
+    manifest.save(tmp_path)
+    assert CommandManifest.load(tmp_path).answer(["--version"]) == (
+        "deep-breath-cli 9.9\n"
+    )
+
+    source.write_text("app = 'changed'\n")
+    assert CommandManifest.load(tmp_path) is None
+
+
+def test_manifest_stamps_every_source():
+    """Test that every command module, click and the installed versions count."""
+    from typer import _click
+    from src.deep_breath_cli import report
+
+    sources = manifest_sources()
+    package_dir = os.path.dirname(report.__file__)
+    assert os.path.join(package_dir, "report.py") in sources
+    assert os.path.join(package_dir, "breath.py") in sources
+    assert _click.__file__ in sources
+    assert any(
+        os.path.basename(os.path.dirname(path)).startswith("typer-")
+        and path.endswith("METADATA")
+        for path in sources
+    )
+    manifest = build_manifest(typer.main.get_command(app))
+    assert list(manifest.sources) == sources
+
+
+def test_version_option():
+    """Test that the full CLI prints the version too."""
+    result = runner.invoke(app, ["--version"])
+    assert result.exit_code == 0
+    assert result.stdout.startswith("deep-breath-cli ")
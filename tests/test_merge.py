@@ -0,0 +1,179 @@
+import json
+from datetime import datetime, timedelta
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.merge import (
+    build_stats,
+    combine,
+    deduplicate,
+    find_stats_files,
+    longest_streak,
+    merge_stats_files,
+    summarize_file,
+)
+
+
+def _write_stats(path, sessions):
+    """Write a minimal stats.json file with the given sessions."""
+    data = {
+        "total_sessions": len(sessions),
+        "total_time_seconds": sum(s["duration_seconds"] for s in sessions),
+        "patterns_used": {},
+        "sessions": sessions,
+        "streaks": {"current": 0, "longest": 0},
+    }
+    path.write_text(json.dumps(data))
+
+
+def _session(date, pattern="4-7-8", duration=76):
+    return {"date": date, "pattern": pattern, "cycles": 4, "duration_seconds": duration}
+
+
+def _make_fleet(tmp_path):
+    """Create three users' stats files and one corrupt file."""
+    today = datetime.now().date()
+    days = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(3)]
+    _write_stats(tmp_path / "alice.json", [_session(d) for d in days])
+    _write_stats(tmp_path / "bob.json", [_session(days[1], "4-4-4-4", 64)])
+    _write_stats(tmp_path / "carol.json", [])
+    (tmp_path / "broken.json").write_text("{not json")
+    return days
+
+
+def test_longest_streak():
+    """Test the longest run of consecutive days."""
+    dates = {"2025-08-01", "2025-08-02", "2025-08-03", "2025-08-10", "2025-08-11"}
+    assert longest_streak(dates) == 3
+    assert longest_streak(set()) == 0
+
+
+def test_summarize_file(tmp_path):
+    """Test the map step on a single file."""
+    days = _make_fleet(tmp_path)
+    partial = summarize_file(tmp_path / "alice.json")
+
+    assert partial["files"] == 1
+    assert partial["total_sessions"] == 3
+    assert partial["total_time_seconds"] == 228
+    assert partial["patterns_used"] == {"4-7-8": 3}
+    assert partial["daily"] == {day: 1 for day in days}
+    assert partial["longest_streaks"] == {"3": 1}
+    assert partial["current_streaks"] == {"3": 1}
+
+
+def test_summarize_file_corrupt(tmp_path):
+    """Test that a corrupt file is reported instead of crashing the merge."""
+    _make_fleet(tmp_path)
+    partial = summarize_file(tmp_path / "broken.json")
+    assert partial["files"] == 0
+    assert len(partial["errors"]) == 1
+
+
+def test_combine_is_order_independent(tmp_path):
+    """Test that combining partials gives the same result in any order."""
+    _make_fleet(tmp_path)
+    parts = [summarize_file(p) for p in find_stats_files(str(tmp_path))]
+
+    forward = combine(combine(parts[0], parts[1]), combine(parts[2], parts[3]))
+    backward = combine(parts[3], combine(parts[2], combine(parts[1], parts[0])))
+    for key in ("files", "total_sessions", "patterns_used", "daily"):
+        assert forward[key] == backward[key]
+
+
+def test_merge_parallel_matches_serial(tmp_path):
+    """Test that the process pool gives the same result as a serial merge."""
+    _make_fleet(tmp_path)
+    paths = find_stats_files(str(tmp_path / "*.json"))
+
+    serial = merge_stats_files(paths, workers=1)
+    parallel = merge_stats_files(paths, workers=2)
+
+    assert serial["files"] == parallel["files"] == 3
+    assert serial["total_sessions"] == parallel["total_sessions"] == 4
+    assert serial["patterns_used"] == parallel["patterns_used"]
+    assert parallel["patterns_used"] == {"4-7-8": 3, "4-4-4-4": 1}
+    assert parallel["longest_streaks"] == {"3": 1, "1": 1, "0": 1}
+
+
+def test_build_stats(tmp_path):
+    """Test that a merged partial becomes a regular stats structure."""
+    days = _make_fleet(tmp_path)
+    partial = merge_stats_files(
+        find_stats_files(str(tmp_path)), workers=1, keep_sessions=True
+    )
+    data = build_stats(partial)
+
+    assert data["total_sessions"] == 4
+    assert len(data["sessions"]) == 4
+    assert data["sessions"][0]["date"] == days[-1]
+    assert data["streaks"] == {"current": 3, "longest": 3}
+
+
+def test_stats_merge_command(tmp_path):
+    """Test the stats merge command writes a report and a merged file."""
+    _make_fleet(tmp_path)
+    output = tmp_path / "out" / "merged.json"
+    output.parent.mkdir()
+
+    runner = CliRunner()
+    result = runner.invoke(
+        app, ["stats", "merge", str(tmp_path), "-o", str(output), "-w", "1"]
+    )
+
+    assert result.exit_code == 0
+    assert "Files merged: 3" in result.stdout
+    assert "broken.json" in result.stdout
+    assert json.loads(output.read_text())["total_sessions"] == 4
+
+
+def test_stats_merge_command_no_files(tmp_path):
+    """Test the stats merge command with nothing to merge."""
+    runner = CliRunner()
+    result = runner.invoke(app, ["stats", "merge", str(tmp_path / "*.json")])
+
+    assert result.exit_code == 1
+    assert "No stats files found" in result.stdout
+
+
+def test_build_stats_skips_duplicates(tmp_path):
+    """Test that the same file merged twice is only counted once."""
+    _make_fleet(tmp_path)
+    copy = tmp_path / "copies"
+    copy.mkdir()
+    (copy / "alice.json").write_text((tmp_path / "alice.json").read_text())
+
+    partial = merge_stats_files(
+        find_stats_files(str(tmp_path)), workers=1, keep_sessions=True
+    )
+    data = build_stats(partial)
+
+    assert partial["total_sessions"] == 7
+    assert data["total_sessions"] == 4
+    assert data["patterns_used"] == {"4-7-8": 3, "4-4-4-4": 1}
+
+
+def test_report_and_output_agree_on_duplicates(tmp_path):
+    """Test that the printed report counts duplicates once, like --output."""
+    days = _make_fleet(tmp_path)
+    copy = tmp_path / "copies"
+    copy.mkdir()
+    (copy / "alice.json").write_text((tmp_path / "alice.json").read_text())
+    partial = merge_stats_files(
+        find_stats_files(str(tmp_path)), workers=1, keep_sessions=True
+    )
+
+    deduplicated = deduplicate(partial)
+    data = build_stats(partial)
+    assert deduplicated["duplicates"] == 3
+    for key in ("total_sessions", "total_time_seconds", "patterns_used"):
+        assert deduplicated[key] == data[key]
+    assert deduplicated["daily"] == {days[0]: 1, days[1]: 2, days[2]: 1}
+    assert deduplicated["pattern_stats"]["4-7-8"]["sessions"] == 3
+
+    output = tmp_path / "merged.out"
+    result = CliRunner().invoke(
+        app, ["stats", "merge", str(tmp_path), "-o", str(output), "-w", "1"]
+    )
+    assert "Total sessions: 4" in result.stdout
+    assert "Duplicate sessions: 3" in result.stdout
+    assert json.loads(output.read_text())["total_sessions"] == 4
@@ -0,0 +1,125 @@
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.metrics import Histogram, MetricsExporter, render_metrics
+from src.deep_breath_cli.stats import StatsManager
+
+
+SAMPLE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$")
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text):
+    """Parse the text exposition format into {(name, labels): value}."""
+    assert text.endswith("# EOF\n")
+    types = {}
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            types[name] = kind
+            continue
+        if line.startswith("#"):
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"invalid sample line: {line!r}"
+        name, labels, value = match.groups()
+        family = re.sub(r"_(bucket|sum|count)$", "", name)
+        assert name in types or family in types, f"sample without TYPE: {name}"
+        samples[(name, tuple(LABEL.findall(labels or "")))] = float(value)
+    return samples
+
+
+def test_histogram_is_cumulative():
+    """Test that buckets are cumulative and +Inf counts everything."""
+    histogram = Histogram((1.0, 5.0))
+    for value in (0.5, 2.0, 7.0):
+        histogram.observe(value)
+
+    samples = parse_metrics(
+        "# TYPE h histogram\n" + "\n".join(histogram.render("h")) + "\n# EOF\n"
+    )
+    assert samples[("h_bucket", (("le", "1.0"),))] == 1
+    assert samples[("h_bucket", (("le", "5.0"),))] == 2
+    assert samples[("h_bucket", (("le", "+Inf"),))] == 3
+    assert samples[("h_sum", ())] == 9.5
+    assert samples[("h_count", ())] == 3
+
+
+def test_render_escapes_labels():
+    """Test that odd pattern names still produce a parsable file."""
+    state = {"stats": {"patterns_used": {'my "deep"\\breath': 2}}}
+    samples = parse_metrics(render_metrics(state))
+    assert (
+        samples[("breath_sessions_total", (("pattern", 'my \\"deep\\"\\\\breath'),))]
+        == 2
+    )
+
+
+def test_add_session_writes_textfile(tmp_path, monkeypatch):
+    """Test the .prom file written after each recorded session."""
+    prom_file = tmp_path / "breath.prom"
+    monkeypatch.setenv("BREATH_METRICS_FILE", str(prom_file))
+
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+        manager.add_session("4-7-8", 4, 76, 1_754_460_000, 1_754_460_077)
+        manager.add_session("4-4-4-4", 2, 32)
+
+    samples = parse_metrics(prom_file.read_text())
+    assert samples[("breath_sessions_total", (("pattern", "4-7-8"),))] == 1
+    assert samples[("breath_sessions_total", (("pattern", "4-4-4-4"),))] == 1
+    assert samples[("breath_session_seconds_total", ())] == 108
+    assert samples[("breath_streak_current_days", ())] == 1
+    # Only the measured session has a known drift, of one second
+    assert samples[("breath_session_drift_seconds_count", ())] == 1
+    assert samples[("breath_session_drift_seconds_bucket", (("le", "0.5"),))] == 0
+    assert samples[("breath_session_drift_seconds_bucket", (("le", "1.0"),))] == 1
+    # No temporary files are left behind by the atomic writes
+    assert not list(tmp_path.glob(".breath.prom.*"))
+
+
+def test_command_latency_is_recorded(tmp_path, monkeypatch):
+    """Test that every command observes its latency when the exporter is on."""
+    prom_file = tmp_path / "breath.prom"
+    monkeypatch.setenv("BREATH_METRICS_FILE", str(prom_file))
+
+    runner = CliRunner()
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        runner.invoke(app, ["stats"])
+        runner.invoke(app, ["stats"])
+
+    samples = parse_metrics(prom_file.read_text())
+    key = ("breath_command_duration_seconds_count", (("command", "stats"),))
+    assert samples[key] == 2
+
+
+def test_metrics_disabled_by_default(tmp_path, monkeypatch):
+    """Test that nothing is written when the variable is not set."""
+    monkeypatch.delenv("BREATH_METRICS_FILE", raising=False)
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+        manager.add_session("4-7-8", 4, 76)
+
+    assert manager.metrics is None
+    assert not (manager.config_dir / "metrics.json").exists()
+
+
+def observe_commands(config_dir, count):
+    """Observe command latencies from another process."""
+    exporter = MetricsExporter(config_dir / "metrics.json", config_dir / "breath.prom")
+    for _ in range(count):
+        exporter.observe_command("start", 0.02)
+
+
+def test_commands_at_once_keep_every_observation(tmp_path):
+    """Test that processes updating the metrics at once lose nothing."""
+    with ProcessPoolExecutor(2) as pool:
+        list(pool.map(observe_commands, [tmp_path] * 2, [40] * 2))
+
+    state = json.loads((tmp_path / "metrics.json").read_text())
+    assert state["commands"]["start"]["counts"][-1] == 80
+    assert (tmp_path / "metrics.lock").exists()
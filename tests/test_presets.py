@@ -1,6 +1,10 @@
 import json
 from unittest.mock import patch, mock_open
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
 from src.deep_breath_cli.presets import PresetManager
+from src.deep_breath_cli.render import phase_label
+from src.deep_breath_cli.timeline import describe_steps
 
 
 def test_preset_manager_init():
@@ -220,3 +224,39 @@ def test_save_presets():
         call_args = mock_json_dump.call_args[0]
         expected_data = {"test": [(4, "[blue]Breathe in...")]}
         assert call_args[0] == expected_data
+
+
+def test_presets_listing_is_paged(tmp_path):
+    """Test that only the presets of the page are described."""
+    config_dir = tmp_path / ".config" / "deep-breath-cli"
+    config_dir.mkdir(parents=True)
+    library = {
+        f"custom-{i:04d}": [[4, "[blue]In"], [4, "[green]Out"]] for i in range(5000)
+    }
+    (config_dir / "presets.json").write_text(json.dumps(library))
+    with (
+        patch("pathlib.Path.home", return_value=tmp_path),
+        patch(
+            "src.deep_breath_cli.breath.describe_steps", wraps=describe_steps
+        ) as describe,
+    ):
+        result = CliRunner().invoke(
+            app, ["presets", "--limit", "3", "--offset", "4000"]
+        )
+
+    assert result.exit_code == 0
+    assert describe.call_count == 3
+    # The two built-in patterns come first
+    assert "custom-3998" in result.stdout and "custom-4000" in result.stdout
+    assert "custom-4001" not in result.stdout
+    assert "4s In, 4s Out" in result.stdout
+    assert "Showing 4001-4003 of 5002 patterns." in result.stdout
+    assert "--offset 4003" in result.stdout
+
+
+def test_phase_labels_are_parsed_once():
+    """Test that a label is parsed on first use and shared afterwards."""
+    label = phase_label("[green]Hold...")
+    assert phase_label("[green]Hold...") is label
+    assert label.plain == "Hold..."
+    assert str(label.spans[0].style) == "green"
@@ -0,0 +1,74 @@
+import json
+import pstats
+from unittest.mock import patch
+from typer.testing import CliRunner
+from src.deep_breath_cli import profiling
+from src.deep_breath_cli.breath import app
+
+
+@profiling.timed("test.work")
+def _work(value):
+    return value * 2
+
+
+def test_timed_is_transparent_when_disabled():
+    """Test that decorated functions record nothing when profiling is off."""
+    profiling.disable()
+    assert _work(21) == 42
+    assert profiling.span("test.block") is profiling.span("test.other")
+
+
+def test_spans_and_breakdown():
+    """Test that spans are recorded and summarized per name."""
+    profiler = profiling.enable()
+    try:
+        _work(1)
+        _work(2)
+        with profiling.span("test.block"):
+            pass
+    finally:
+        profiling.disable()
+
+    names = [span[0] for span in profiler.spans]
+    assert names.count("test.work") == 2
+    assert "test.block" in names
+    breakdown = profiler.breakdown()
+    assert "test.work" in breakdown
+    assert "2 calls" in breakdown
+
+
+def test_chrome_trace_output(tmp_path):
+    """Test writing the spans as a Chrome trace file."""
+    output = tmp_path / "trace.json"
+    profiling.enable(str(output))
+    _work(1)
+    with patch("builtins.print"):
+        profiling.finish()
+
+    events = json.loads(output.read_text())["traceEvents"]
+    event = next(event for event in events if event["name"] == "test.work")
+    assert event["ph"] == "X"
+    assert event["dur"] >= 0
+
+
+def test_pstats_output(tmp_path):
+    """Test writing a cProfile dump readable by pstats."""
+    output = tmp_path / "profile.pstats"
+    profiling.enable(str(output))
+    _work(1)
+    with patch("builtins.print"):
+        profiling.finish()
+
+    assert pstats.Stats(str(output)).total_calls > 0
+
+
+def test_profile_option(tmp_path):
+    """Test the global --profile option on a real command."""
+    runner = CliRunner()
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        result = runner.invoke(app, ["--profile", "stats"])
+
+    assert result.exit_code == 0
+    assert "Profile breakdown:" in result.output
+    assert "stats.load" in result.output
+    assert "imports" in result.output
@@ -0,0 +1,116 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.prompt import PROMPT_FILE, fast_prompt, read_prompt_summary
+from src.deep_breath_cli.stats import StatsManager
+
+runner = CliRunner()
+
+
+def add_sessions(tmp_path, count=2):
+    """Record sessions of 76 seconds ending now, which writes the summary."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        for _ in range(count):
+            StatsManager().add_session("4-7-8", 4, 76)
+    return tmp_path / ".config" / "deep-breath-cli"
+
+
+def test_add_session_writes_prompt_summary(tmp_path):
+    """Test that the summary follows each new session."""
+    config_dir = add_sessions(tmp_path)
+    assert read_prompt_summary(config_dir) == {"streak": 1, "today": 2, "minutes": 2}
+    assert fast_prompt(["stats", "--prompt"], config_dir) == "1d 2x 2m"
+    assert (
+        fast_prompt(
+            ["stats", "--prompt-format", "{today} today", "--prompt"], config_dir
+        )
+        == "2 today"
+    )
+
+
+def test_summary_from_an_earlier_day(tmp_path):
+    """Test that a summary written yesterday shows no session and no streak."""
+    config_dir = add_sessions(tmp_path)
+    summary_file = config_dir / PROMPT_FILE
+    summary_file.write_text(summary_file.read_text().replace("date\t", "date\t1999-"))
+    assert read_prompt_summary(config_dir) == {"streak": 0, "today": 0, "minutes": 2}
+
+
+def test_prompt_and_stats_agree_on_a_stale_streak(tmp_path):
+    """Test that a streak saved on an earlier day is 0 in both, as of today."""
+    yesterday = datetime.now().replace(hour=12) - timedelta(days=1)
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+        manager.add_sessions(
+            [
+                {
+                    "date": (yesterday - timedelta(days=i)).strftime("%Y-%m-%d"),
+                    "start": int((yesterday - timedelta(days=i)).timestamp()),
+                    "end": int((yesterday - timedelta(days=i)).timestamp()) + 76,
+                    "pattern": "4-7-8",
+                    "cycles": 4,
+                    "duration_seconds": 76,
+                }
+                for i in range(3)
+            ]
+        )
+    # As saved yesterday, after the last session
+    data = json.loads(manager.stats_file.read_text())
+    data["streaks"] = {"current": 3, "longest": 3}
+    manager.stats_file.write_text(json.dumps(data))
+    summary_file = manager.config_dir / PROMPT_FILE
+    day = yesterday.strftime("%Y-%m-%d")
+    summary_file.write_text(f"date\t{day}\nstreak\t3\ntoday\t1\ntotal_seconds\t228\n")
+
+    assert fast_prompt(["stats", "--prompt"], manager.config_dir) == "0d 0x 3m"
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        result = runner.invoke(app, ["stats"])
+    assert "Current streak: 0 days (Longest: 3 days)" in result.stdout
+
+
+def test_fast_prompt_leaves_the_rest_to_the_cli(tmp_path):
+    """Test the command lines and cases the fast path does not answer."""
+    config_dir = add_sessions(tmp_path)
+    assert fast_prompt(["stats"], config_dir) is None
+    assert fast_prompt(["stats", "--prompt", "--detailed"], config_dir) is None
+    assert fast_prompt(["start", "--prompt"], config_dir) is None
+    assert fast_prompt(["stats", "--prompt", "--prompt-format={x}"], config_dir) is None
+    (config_dir / PROMPT_FILE).unlink()
+    assert fast_prompt(["stats", "--prompt"], config_dir) is None
+
+
+def test_stats_prompt_command(tmp_path):
+    """Test the CLI option, which computes a missing summary once."""
+    config_dir = add_sessions(tmp_path, 1)
+    (config_dir / PROMPT_FILE).unlink()
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        result = runner.invoke(app, ["stats", "--prompt"])
+        assert result.stdout == "1d 1x 1m\n"
+        assert (config_dir / PROMPT_FILE).exists()
+
+        result = runner.invoke(app, ["stats", "--prompt", "--prompt-format", "{x}"])
+        assert result.exit_code == 1
+
+
+def test_launcher_prompt_skips_heavy_imports(tmp_path):
+    """Test that the prompt fast path imports nothing beyond the launcher."""
+    add_sessions(tmp_path)
+    code = (
+        "import atexit, sys\n"
+        "sys.argv = ['breath', 'stats', '--prompt']\n"
+        "atexit.register(lambda: print(sorted("
+        "m for m in ('typer', 'rich', 'plotext', 'json') if m in sys.modules), file=sys.stderr))\n"
+        "from src.deep_breath_cli.launcher import main\n"
+        "main()\n"
+    )
+    env = dict(os.environ, HOME=str(tmp_path))
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+    assert result.stdout == "1d 2x 2m\n"
+    assert result.stderr.strip() == "[]"
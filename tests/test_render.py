@@ -0,0 +1,96 @@
+import io
+from src.deep_breath_cli.render import (
+    MIN_FPS,
+    FrameRate,
+    TerminalRenderer,
+    bar_cells,
+)
+
+
+class FakeTerminal(io.StringIO):
+    """In-memory output that claims to be a terminal."""
+
+    def isatty(self):
+        return True
+
+
+def frame(elapsed, phase=0, paused=False):
+    """Return a renderer frame of a 10 second phase."""
+    return {
+        "cycle": 0,
+        "cycles": 1,
+        "phase": phase,
+        "message": "[blue]Breathe in...",
+        "duration": 10,
+        "elapsed": elapsed,
+        "paused": paused,
+        "keyboard": False,
+    }
+
+
+def test_bar_has_sub_cell_precision():
+    """Test that the bar moves by eighths of a cell."""
+    assert bar_cells(0, 4) == "    "
+    assert bar_cells(1 / 32, 4) == "▏   "
+    assert bar_cells(0.5, 4) == "██  "
+    assert bar_cells(0.59, 4) == "██▍ "
+    assert bar_cells(1.2, 4) == "████"
+
+
+def test_frame_rate_backs_off_and_recovers():
+    """Test that slow draws lower the frame rate until they fit the budget."""
+    rate = FrameRate(30)
+    rate.record(0.05)
+    rate.record(0.05)
+    assert rate.fps == 7.5
+    for _ in range(10):
+        rate.record(1.0)
+    assert rate.fps == MIN_FPS
+
+    # A second worth of quick draws doubles it, up to the target
+    for _ in range(200):
+        rate.record(0.0001)
+    assert rate.fps == 30
+
+
+def test_only_changed_cells_are_written():
+    """Test that a frame rewrites the cells that changed, and nothing else."""
+    out = FakeTerminal()
+    renderer = TerminalRenderer(30, out)
+    renderer.draw(frame(0))
+    assert "Cycle 1 of 1:" in out.getvalue()
+    assert "Breathe in..." in out.getvalue()
+
+    written = len(out.getvalue())
+    renderer.draw(frame(0.01))
+    # The bar did not move and the time left is the same: nothing to write
+    assert len(out.getvalue()) == written
+
+    renderer.draw(frame(1.3))
+    update = out.getvalue()[written:]
+    assert "Breathe in" not in update
+    assert update.count("█") == 5
+    assert len(update) < 50
+
+    renderer.draw(frame(1.3, paused=True))
+    assert "(paused)" in out.getvalue()[-20:]
+    renderer.draw(frame(1.3))
+    assert out.getvalue().endswith("\x1b[K")
+    renderer.close()
+
+
+def test_plain_output_keeps_the_last_frame_of_each_phase():
+    """Test that pipes and files get one line per phase and no escapes."""
+    out = io.StringIO()
+    renderer = TerminalRenderer(30, out)
+    for elapsed in (0, 5, 10):
+        renderer.draw(frame(elapsed))
+    renderer.draw(frame(3, phase=1))
+    renderer.close()
+
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "Cycle 1 of 1:"
+    assert lines[1].startswith("Breathe in... " + "█" * 10)
+    assert lines[1].endswith("100% 0:00")
+    assert lines[2].endswith(" 30% 0:07")
+    assert "\x1b" not in out.getvalue()
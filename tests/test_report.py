@@ -0,0 +1,110 @@
+import json
+from unittest.mock import patch
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.report import ReportBuilder, heat_level
+from src.deep_breath_cli.stats import StatsManager
+from tests.test_retention import make_history
+
+runner = CliRunner()
+
+
+def page_times(output_dir):
+    """Return the modification time of every month page."""
+    return {
+        path.name: path.stat().st_mtime_ns for path in (output_dir / "months").iterdir()
+    }
+
+
+def build(tmp_path, output_dir, **kwargs):
+    """Run a report build with the stats of tmp_path."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        builder = ReportBuilder(output_dir, tmp_path / ".config" / "deep-breath-cli")
+        return builder.build(**kwargs)
+
+
+def test_full_build_writes_every_month(tmp_path):
+    """Test the pages, their figures and the manifest of a first build."""
+    _, sessions = make_history(tmp_path, days=60)
+    output_dir = tmp_path / "report"
+    result = build(tmp_path, output_dir)
+
+    months = sorted({session["date"][:7] for session in sessions})
+    assert result == {"rebuilt": True, "written": months, "months": len(months)}
+    assert sorted(page_times(output_dir)) == sorted(
+        f"{month}.{fmt}" for month in months for fmt in ("html", "md")
+    )
+    index = (output_dir / "index.md").read_text()
+    assert "120 sessions, 152 minutes" in index
+    assert "| 4-7-8 | 60 | 50% |" in index
+    page = (output_dir / "months" / f"{months[-1]}.html").read_text()
+    assert 'title="2 sessions"' in page
+
+    manifest = json.loads((output_dir / "manifest.json").read_text())
+    assert sum(m["sessions"] for m in manifest["months"].values()) == 120
+
+
+def test_new_sessions_only_rewrite_their_month(tmp_path):
+    """Test that an update reads the journal, not the stats file."""
+    make_history(tmp_path, days=60)
+    output_dir = tmp_path / "report"
+    build(tmp_path, output_dir)
+    before = page_times(output_dir)
+
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        StatsManager().add_session("box", 4, 60)
+    with patch(
+        "src.deep_breath_cli.stats.StatsManager", side_effect=AssertionError
+    ) as mock_stats:
+        result = build(tmp_path, output_dir)
+    mock_stats.assert_not_called()
+
+    after = page_times(output_dir)
+    changed = sorted(name for name in after if after[name] != before[name])
+    assert result["rebuilt"] is False
+    assert changed == [f"{result['written'][0]}.html", f"{result['written'][0]}.md"]
+    assert "121 sessions" in (output_dir / "index.md").read_text()
+
+    # Nothing new: nothing rewritten
+    assert build(tmp_path, output_dir)["written"] == []
+    assert page_times(output_dir) == after
+
+
+def test_vacuum_forces_a_recount_but_no_rewrite(tmp_path):
+    """Test that a reset journal is detected and unchanged months kept."""
+    manager, _ = make_history(tmp_path, days=60)
+    output_dir = tmp_path / "report"
+    build(tmp_path, output_dir)
+    before = page_times(output_dir)
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager.vacuum(keep_days=30, granularity="month")
+
+    result = build(tmp_path, output_dir)
+    assert result["rebuilt"] is True
+    assert result["written"] == []
+    assert page_times(output_dir) == before
+
+
+def test_report_command(tmp_path):
+    """Test the CLI, with a single format and a forced full build."""
+    make_history(tmp_path, days=3)
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        result = runner.invoke(app, ["report", "-o", str(tmp_path / "r"), "-f", "md"])
+        assert result.exit_code == 0
+        assert "Rebuilt report" in result.stdout
+        assert not list((tmp_path / "r").glob("**/*.html"))
+
+        result = runner.invoke(app, ["report", "-o", str(tmp_path / "r"), "-f", "md"])
+        assert "Updated report" in result.stdout and " 0 of" in result.stdout
+
+        result = runner.invoke(app, ["report", "-o", str(tmp_path / "r"), "--full"])
+        assert "Rebuilt report" in result.stdout
+        assert (tmp_path / "r" / "index.html").exists()
+
+        result = runner.invoke(app, ["report", "-o", str(tmp_path / "r"), "-f", "pdf"])
+        assert result.exit_code == 1
+
+
+def test_heat_levels():
+    """Test the thresholds of the calendar heatmap."""
+    assert [heat_level(n) for n in (0, 1, 2, 3, 4, 5, 9)] == [0, 1, 2, 3, 3, 4, 4]
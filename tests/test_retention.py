@@ -0,0 +1,165 @@
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.fsck import StatsChecker
+from src.deep_breath_cli.merge import build_stats, summarize_file
+from src.deep_breath_cli.retention import archive_dates, merge_periods
+from src.deep_breath_cli.stats import StatsManager
+
+
+def make_history(tmp_path, days=60):
+    """Record two sessions a day, at noon, for the last N days."""
+    today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    sessions = []
+    for day in range(days):
+        start = int((today - timedelta(days=day)).timestamp())
+        for offset, pattern in ((0, "4-7-8"), (600, "box")):
+            sessions.append(
+                {
+                    "date": (today - timedelta(days=day)).strftime("%Y-%m-%d"),
+                    "start": start + offset,
+                    "end": start + offset + 76,
+                    "pattern": pattern,
+                    "cycles": 4,
+                    "duration_seconds": 76,
+                }
+            )
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+        manager.add_sessions(sessions)
+    return manager, sessions
+
+
+def test_vacuum_keeps_totals_streaks_and_dedupe(tmp_path):
+    """Test that compacted sessions keep feeding totals and streaks."""
+    manager, sessions = make_history(tmp_path)
+    before = {key: manager.data[key] for key in ("total_sessions", "patterns_used")}
+    size_before = manager.stats_file.stat().st_size
+
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        assert manager.vacuum(keep_days=30) == 60
+        reloaded = StatsManager()
+        # Archived sessions are still known to the index
+        assert reloaded.add_sessions([dict(s) for s in sessions]) == 0
+
+    assert len(reloaded.data["sessions"]) == 60
+    assert len(reloaded.data["archive"]["periods"]) == 30
+    assert reloaded.data["archive"]["indexed"] == 60
+    assert reloaded.data["retention"] == {"keep_days": 30, "granularity": "day"}
+    for key, value in before.items():
+        assert reloaded.data[key] == value
+    assert reloaded._calculate_streak() == 60
+    assert manager.stats_file.stat().st_size < size_before
+    assert manager.journal.size() == 0
+
+    checker = StatsChecker(manager.stats_file)
+    checker.scan(workers=1)
+    assert checker.find_mismatches() == []
+
+
+def test_vacuum_by_month_folds_day_records(tmp_path):
+    """Test month records, their active days, and folding older day records."""
+    manager, _ = make_history(tmp_path, days=90)
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager.vacuum(keep_days=60)
+        manager.vacuum(keep_days=30, granularity="month")
+
+    archive = manager.data["archive"]
+    assert all(len(record["period"]) == 7 for record in archive["periods"])
+    assert sum(record["sessions"] for record in archive["periods"]) == 120
+    assert len(archive_dates(archive)) == 60
+    assert manager._calculate_streak() == 90
+
+
+def test_merge_periods_sums_records():
+    """Test that records of the same period add up, and days fold into months."""
+    periods = [
+        {
+            "period": "2024-03-02",
+            "sessions": 1,
+            "duration_seconds": 76,
+            "patterns_used": {"4-7-8": 1},
+        },
+        {
+            "period": "2024-03",
+            "sessions": 2,
+            "duration_seconds": 100,
+            "patterns_used": {"box": 2},
+            "active_days": 0b101,
+        },
+    ]
+    assert merge_periods(periods, "month", before="2024-04-01") == [
+        {
+            "period": "2024-03",
+            "sessions": 3,
+            "duration_seconds": 176,
+            "patterns_used": {"box": 2, "4-7-8": 1},
+            "active_days": 0b111,
+        }
+    ]
+    assert len(merge_periods(periods + periods)) == 2
+
+
+def test_merge_and_recovery_count_the_archive(tmp_path):
+    """Test that merges and a damaged file recovery keep archived sessions."""
+    manager, _ = make_history(tmp_path)
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager.vacuum(keep_days=30)
+
+    partial = summarize_file(manager.stats_file, keep_sessions=True)
+    assert partial["total_sessions"] == 120
+    assert partial["longest_streaks"] == {"60": 1}
+    merged = build_stats(partial)
+    assert merged["total_sessions"] == 120
+    assert len(merged["sessions"]) == 60
+
+    text = manager.stats_file.read_text()
+    manager.stats_file.write_text(text[: text.rindex("{")] + "{broken")
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        recovered = StatsManager()
+    assert recovered.data["total_sessions"] == 119
+    assert recovered.data["streaks"]["longest"] == 60
+    assert recovered.data["archive"]["indexed"] == 0
+
+
+def test_merge_of_a_merge_keeps_the_archive(tmp_path):
+    """Test that a merged file with an archive can be merged again."""
+    manager, _ = make_history(tmp_path)
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager.vacuum(keep_days=30)
+    runner = CliRunner()
+    first, second = tmp_path / "first.json", tmp_path / "second.json"
+
+    for source, output in ((manager.stats_file, first), (first, second)):
+        result = runner.invoke(
+            app, ["stats", "merge", str(source), "-o", str(output), "-w", "1"]
+        )
+        assert result.exit_code == 0
+        assert "Total sessions: 120" in result.stdout
+        assert json.loads(output.read_text())["total_sessions"] == 120
+    assert summarize_file(second, keep_sessions=True)["total_sessions"] == 120
+
+
+def test_stats_vacuum_command(tmp_path):
+    """Test the vacuum command, its policy checks and the monthly chart."""
+    make_history(tmp_path)
+    runner = CliRunner()
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        result = runner.invoke(app, ["stats", "vacuum", "--keep-days", "3"])
+        assert result.exit_code == 1
+        assert "keep at least 7 days" in result.output
+
+        result = runner.invoke(app, ["stats", "vacuum", "--keep-days", "30"])
+        assert result.exit_code == 0
+        assert "Compacted 60 sessions older than 30 days" in result.output
+
+        result = runner.invoke(app, ["stats", "--by-month"])
+    assert result.exit_code == 0
+    assert "Sessions by Month" in result.output
+
+    saved = json.loads(
+        (tmp_path / ".config" / "deep-breath-cli" / "stats.json").read_text()
+    )
+    assert saved["retention"]["keep_days"] == 30
@@ -0,0 +1,138 @@
+import json
+import random
+from unittest.mock import patch
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.merge import build_stats, combine, summarize_file
+from src.deep_breath_cli.sketch import (
+    RELATIVE_ACCURACY,
+    add_to_sketch,
+    build_pattern_stats,
+    merge_pattern_stats,
+    new_sketch,
+    sketch_quantile,
+)
+from src.deep_breath_cli.stats import StatsManager
+
+runner = CliRunner()
+
+
+def make_sessions(count, pattern="box", seed=0, date="2025-08-01"):
+    """Return sessions with durations spread between 10s and an hour."""
+    rng = random.Random(seed)
+    start = 1_754_000_000
+    sessions = []
+    for i in range(count):
+        duration = int(rng.lognormvariate(5, 1)) % 3600 + 10
+        sessions.append(
+            {
+                "date": date,
+                "start": start + i * 4000,
+                "end": start + i * 4000 + duration,
+                "pattern": pattern,
+                "cycles": duration // 16,
+                "duration_seconds": duration,
+            }
+        )
+    return sessions
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    """Test that every quantile is within 1% of the exact one."""
+    values = sorted(session["duration_seconds"] for session in make_sessions(5000))
+    sketch = new_sketch()
+    for value in values:
+        add_to_sketch(sketch, value)
+
+    assert len(sketch["bins"]) < 1000
+    for q in (1, 25, 50, 90, 99, 100):
+        exact = values[round(q / 100 * (len(values) - 1))]
+        assert abs(sketch_quantile(sketch, q) - exact) <= exact * RELATIVE_ACCURACY
+    assert sketch_quantile(new_sketch(), 50) is None
+
+
+def test_merged_pattern_stats_equal_combined():
+    """Test that merging the stats of two machines equals counting once."""
+    first, second = make_sessions(300, seed=1), make_sessions(200, seed=2)
+    second += make_sessions(50, pattern="4-7-8", seed=3)
+    merged = build_pattern_stats(first)
+    merge_pattern_stats(merged, build_pattern_stats(second))
+    # Through JSON, as when read back from another machine's stats file
+    merged = json.loads(json.dumps(merged))
+
+    assert merged == json.loads(json.dumps(build_pattern_stats(first + second)))
+    assert merged["box"]["sessions"] == 500
+    assert merged["4-7-8"]["seconds"] == sum(
+        session["duration_seconds"] for session in second[200:]
+    )
+
+
+def test_pattern_stats_kept_and_migrated(tmp_path):
+    """Test the aggregates of new sessions and of files written before them."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+        manager.add_sessions(make_sessions(20))
+        manager.add_session("4-7-8", 4, 76)
+        stats = manager.data["pattern_stats"]
+        assert stats["box"]["sessions"] == 20
+        assert (
+            stats["4-7-8"]
+            == build_pattern_stats(manager.data["sessions"][-1:])["4-7-8"]
+        )
+
+        data = json.loads(manager.stats_file.read_text())
+        assert data["pattern_stats"] == json.loads(json.dumps(stats))
+        del data["pattern_stats"]
+        manager.stats_file.write_text(json.dumps(data))
+        assert StatsManager().data["pattern_stats"] == stats
+
+
+def test_merge_combines_pattern_stats(tmp_path):
+    """Test that stats merge adds up the aggregates of every file."""
+    machines = {
+        "a": make_sessions(100, seed=4),
+        "b": make_sessions(100, seed=5, date="2025-08-02"),
+    }
+    sessions = [dict(session) for batch in machines.values() for session in batch]
+    for name, batch in machines.items():
+        with patch("pathlib.Path.home", return_value=tmp_path / name):
+            StatsManager().add_sessions(batch)
+    files = sorted(tmp_path.glob("*/.config/deep-breath-cli/stats.json"))
+    partial = combine(summarize_file(files[0], True), summarize_file(files[1], True))
+
+    expected = json.loads(json.dumps(build_pattern_stats(sessions)))
+    assert json.loads(json.dumps(partial["pattern_stats"])) == expected
+    assert build_stats(partial)["pattern_stats"]["box"]["sessions"] == 200
+
+
+def test_stats_patterns_command(tmp_path):
+    """Test the per-pattern table, sorted by sessions."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        result = runner.invoke(app, ["stats", "--patterns"])
+        assert "No breathing sessions recorded yet." in result.stdout
+
+        manager = StatsManager()
+        manager.add_sessions(make_sessions(2, pattern="4-7-8"))
+        for _ in range(3):
+            manager.add_session("box", 5, 80)
+        result = runner.invoke(app, ["stats", "--patterns"])
+
+    assert result.exit_code == 0
+    lines = result.stdout.splitlines()
+    assert lines[0] == "Pattern Stats"
+    assert lines[1].split() == [
+        "Pattern",
+        "Sessions",
+        "Avg",
+        "cycles",
+        "Total",
+        "time",
+        "p50",
+        "p90",
+        "p99",
+    ]
+    box = lines[2].split()
+    assert box[:5] == ["box", "3", "5.0", "4", "min"]
+    # Durations are approximated within 1%
+    assert box[5:] == ["81s"] * 3
+    assert lines[3].split()[:2] == ["4-7-8", "2"]
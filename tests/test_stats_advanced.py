@@ -154,9 +154,19 @@ def test_export_csv():
 
         # Vérifier les appels au writer - syntaxe corrigée
         expected_calls = [
-            call(["Date", "Pattern", "Cycles", "Duration (seconds)"]),
-            call(["2025-08-06", "4-7-8", 4, 76]),
-            call(["2025-08-05", "4-4-4-4", 2, 32]),
+            call(
+                [
+                    "Date",
+                    "Pattern",
+                    "Cycles",
+                    "Duration (seconds)",
+                    "Start",
+                    "End",
+                    "Id",
+                ]
+            ),
+            call(["2025-08-06", "4-7-8", 4, 76, "", "", ""]),
+            call(["2025-08-05", "4-4-4-4", 2, 32, "", "", ""]),
         ]
         mock_writer_instance.writerow.assert_has_calls(expected_calls)
 
@@ -0,0 +1,107 @@
+import json
+from datetime import datetime
+from unittest.mock import patch
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.stats import StatsManager, build_time_rollups, fill_timestamps
+
+
+def _epoch(text):
+    return int(datetime.strptime(text, "%Y-%m-%d %H:%M").timestamp())
+
+
+def test_fill_timestamps_legacy_session():
+    """Test that a date-only session gets approximate start and end times."""
+    session = {"date": "2025-08-06", "pattern": "4-7-8", "cycles": 4}
+    session["duration_seconds"] = 76
+
+    assert fill_timestamps(session) is True
+    assert session["start"] == _epoch("2025-08-06 00:00")
+    assert session["end"] == session["start"] + 76
+    assert session["approximate"] is True
+    assert fill_timestamps(session) is False
+
+
+def test_build_time_rollups():
+    """Test hour and weekday buckets, skipping approximate hours."""
+    sessions = [
+        {"start": _epoch("2025-08-04 07:30")},  # Monday
+        {"start": _epoch("2025-08-04 07:45")},
+        {"start": _epoch("2025-08-09 22:10")},  # Saturday
+        {"start": _epoch("2025-08-10 00:00"), "approximate": True},  # Sunday
+    ]
+    rollups = build_time_rollups(sessions)
+
+    assert rollups["by_hour"][7] == 2
+    assert rollups["by_hour"][22] == 1
+    assert sum(rollups["by_hour"]) == 3
+    assert rollups["by_weekday"] == [2, 0, 0, 0, 0, 1, 1]
+
+
+def test_add_session_stores_timestamps(tmp_path):
+    """Test that sessions store epoch start and end times and feed rollups."""
+    start = _epoch("2025-08-06 09:15")
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+        manager.add_session("4-7-8", 4, 76, start, start + 80)
+
+    session = manager.data["sessions"][0]
+    assert session["date"] == "2025-08-06"
+    assert (session["start"], session["end"]) == (start, start + 80)
+    assert session["id"].startswith(f"{start}-")
+    assert manager.data["rollups"]["by_hour"][9] == 1
+    assert manager.data["rollups"]["by_weekday"][2] == 1
+
+
+def test_legacy_file_migrated_with_rollups(tmp_path):
+    """Test that an old stats file gets timestamps and rollups on load."""
+    config_dir = tmp_path / ".config" / "deep-breath-cli"
+    config_dir.mkdir(parents=True)
+    legacy = {
+        "total_sessions": 1,
+        "total_time_seconds": 76,
+        "patterns_used": {"4-7-8": 1},
+        "sessions": [
+            {
+                "date": "2025-08-06",
+                "pattern": "4-7-8",
+                "cycles": 4,
+                "duration_seconds": 76,
+            }
+        ],
+        "streaks": {"current": 0, "longest": 0},
+    }
+    (config_dir / "stats.json").write_text(json.dumps(legacy))
+
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        StatsManager()
+
+    saved = json.loads((config_dir / "stats.json").read_text())
+    assert saved["sessions"][0]["approximate"] is True
+    assert saved["rollups"]["by_weekday"][2] == 1
+    assert sum(saved["rollups"]["by_hour"]) == 0
+
+
+def test_stats_by_hour_command():
+    """Test stats command with --by-hour and --by-weekday flags."""
+    runner = CliRunner()
+
+    with patch("src.deep_breath_cli.context.StatsManager") as mock_stats_manager:
+        mock_instance = mock_stats_manager.return_value
+        mock_instance.get_hours_stats.return_value = "Hours Chart"
+        mock_instance.get_weekdays_stats.return_value = "Weekdays Chart"
+
+        result = runner.invoke(app, ["stats", "--by-hour", "--by-weekday"])
+
+    assert result.exit_code == 0
+    assert "Hours Chart" in result.stdout
+    assert "Weekdays Chart" in result.stdout
+    mock_instance.get_display_stats.assert_not_called()
+
+
+def test_get_hours_stats_empty(tmp_path):
+    """Test the hour histogram before any timed session."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+
+    assert manager.get_hours_stats() == "No sessions with a known time of day yet."
@@ -0,0 +1,156 @@
+import asyncio
+import random
+import json
+from unittest.mock import patch
+import pytest
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.stats import StatsManager
+from src.deep_breath_cli.engine import SessionEngine, SimulatedClock
+from src.deep_breath_cli.timeline import Timeline, describe_steps
+
+runner = CliRunner()
+
+PROGRESSIVE = [
+    [4, "In"],
+    {"duration": 8, "message": "Out", "ramp": 1, "until": 10},
+]
+NESTED = [
+    {"repeat": 3, "steps": [[1, "Pump"], {"duration": 0.5, "message": "Rest"}]},
+    {
+        "repeat": 2,
+        "steps": [
+            {"duration": 2, "message": "Hold", "ramp": 2},
+            {"repeat": 2, "steps": [[1.5, "Sip"]]},
+        ],
+    },
+    [6, "Exhale"],
+]
+
+
+def test_ramp_stops_at_its_limit():
+    """Test that a ramping phase grows each cycle until its limit."""
+    timeline = Timeline(PROGRESSIVE, 5)
+    outs = [phase.duration for phase in timeline.phases() if phase.message == "Out"]
+    assert outs == [8, 9, 10, 10, 10]
+    assert timeline.duration == 5 * 4 + sum(outs)
+
+
+def test_limit_without_ramp_is_ignored():
+    """Test that 'until' alone keeps the duration, and the timeline agrees."""
+    timeline = Timeline([{"duration": 2, "message": "In", "until": 8}, [3, "Out"]], 4)
+    phases = list(timeline.phases())
+    assert [phase.duration for phase in phases] == [2, 3] * 4
+    assert timeline.duration == 20
+    assert timeline.locate(7) == phases[3]
+    assert list(timeline.phases(11)) == phases[4:]
+
+
+def test_nested_repeats_are_expanded_in_order():
+    """Test phase order, indexes and ramps inside repeat blocks."""
+    timeline = Timeline(NESTED, 2)
+    phases = list(timeline.phases())
+    assert timeline.phases_per_cycle == 6 + 6 + 1
+    assert len(phases) == 2 * 13
+    assert [p.message for p in phases[:6]] == ["Pump", "Rest"] * 3
+    # The ramp follows the iterations of its own block, in every cycle
+    holds = [p.duration for p in phases if p.message == "Hold"]
+    assert holds == [2, 4, 2, 4]
+    assert [p.index for p in phases[:13]] == list(range(13))
+    assert [p.cycle for p in phases] == [0] * 13 + [1] * 13
+
+    # Phases follow each other with no gap
+    for previous, phase in zip(phases, phases[1:]):
+        assert phase.start == pytest.approx(previous.start + previous.duration)
+    assert timeline.duration == pytest.approx(phases[-1].start + phases[-1].duration)
+
+
+def test_locate_and_resume_match_the_expanded_session():
+    """Test that seeking anywhere gives the phase a full walk would."""
+    timeline = Timeline(NESTED + PROGRESSIVE, 7)
+    phases = list(timeline.phases())
+    generator = random.Random(4)
+    for _ in range(300):
+        offset = generator.uniform(0, timeline.duration)
+        expected = next(
+            i for i, p in enumerate(phases) if offset < p.start + p.duration
+        )
+        assert timeline.locate(offset) == phases[expected]
+        assert list(timeline.phases(offset)) == phases[expected:]
+    assert timeline.locate(timeline.duration) is None
+
+
+def test_long_sessions_stay_lazy():
+    """Test that a huge cycle count is neither expanded nor slow to seek."""
+    timeline = Timeline(PROGRESSIVE, 10**9)
+    assert timeline.duration == 10**9 * 14 - 3
+    phase = timeline.locate(timeline.duration - 1)
+    assert (phase.cycle, phase.message, phase.duration) == (10**9 - 1, "Out", 10)
+    assert next(timeline.phases(40)).cycle == 3
+
+
+@pytest.mark.parametrize(
+    "steps",
+    [
+        [[0, "In"]],
+        [{"duration": 4}],
+        [{"repeat": 0, "steps": [[1, "In"]]}],
+        [{"repeat": 2, "steps": []}],
+        [{"duration": 8, "message": "Out", "ramp": -1}],
+        [[4]],
+    ],
+)
+def test_invalid_steps_are_rejected(steps):
+    """Test that malformed steps raise ValueError."""
+    with pytest.raises(ValueError):
+        Timeline(steps, 1)
+
+
+def test_engine_runs_progressive_patterns():
+    """Test that the engine times ramps and can start part-way."""
+    clock = SimulatedClock()
+    engine = SessionEngine(PROGRESSIVE, 3, clock)
+    summary = asyncio.run(engine.run())
+    assert clock.now() == 12 + 8 + 9 + 10
+    assert (summary["cycles"], summary["duration_seconds"]) == (3, 39)
+
+    # Resumed in the middle of the second "Out": only the rest is counted
+    clock = SimulatedClock()
+    engine = SessionEngine(PROGRESSIVE, 3, clock, start=20)
+    assert engine.snapshot()["phase"] == 1
+    summary = asyncio.run(engine.run())
+    assert clock.now() == 39 - 20
+    assert (summary["cycles"], summary["duration_seconds"]) == (2, 19)
+
+
+def test_describe_steps():
+    """Test the descriptions used by preset listings."""
+    assert describe_steps(NESTED[:1] + PROGRESSIVE) == [
+        "3× (1s Pump, 0.5s Rest)",
+        "4s In",
+        "8s +1s each time until 10s Out",
+    ]
+
+
+def test_custom_progressive_preset_runs(tmp_path):
+    """Test listing and running a preset written by hand in presets.json."""
+    config_dir = tmp_path / ".config" / "deep-breath-cli"
+    config_dir.mkdir(parents=True)
+    (config_dir / "presets.json").write_text(json.dumps({"ladder": PROGRESSIVE}))
+    with (
+        patch("pathlib.Path.home", return_value=tmp_path),
+        patch("src.deep_breath_cli.breath.typer.confirm", return_value=True),
+        patch("src.deep_breath_cli.breath.time.sleep"),
+        patch("src.deep_breath_cli.engine.MonotonicClock", SimulatedClock),
+    ):
+        result = runner.invoke(app, ["presets"])
+        assert "8s +1s each time until 10s Out" in result.stdout
+
+        result = runner.invoke(app, ["start", "--pattern", "ladder", "--cycle", "2"])
+        assert result.exit_code == 0
+        assert StatsManager().data["sessions"][-1]["duration_seconds"] == 25
+
+        (config_dir / "presets.json").write_text(json.dumps({"bad": [[-1, "In"]]}))
+        result = runner.invoke(app, ["start", "--pattern", "bad"])
+        assert result.exit_code == 1
+        assert "Error in pattern 'bad'" in result.stdout
@@ -0,0 +1,142 @@
+from datetime import datetime
+from unittest.mock import patch
+from typer.testing import CliRunner
+from src.deep_breath_cli.breath import app
+from src.deep_breath_cli.journal import JournalTail, SessionJournal
+from src.deep_breath_cli.stats import StatsManager
+from src.deep_breath_cli.watch import StatsWatcher
+
+
+def make_sessions(count):
+    """Return sessions on consecutive minutes of the same day."""
+    start = 1_754_000_000
+    return [
+        {
+            "date": datetime.fromtimestamp(start).strftime("%Y-%m-%d"),
+            "start": start + i * 60,
+            "end": start + i * 60 + 32,
+            "pattern": "4-4-4-4",
+            "cycles": 2,
+            "duration_seconds": 32,
+        }
+        for i in range(count)
+    ]
+
+
+def test_journal_tail_reads_only_appended_bytes(tmp_path):
+    """Test that the tail returns new sessions once and keeps partial lines."""
+    journal_file = tmp_path / "sessions.log"
+    journal = SessionJournal(journal_file)
+    journal.append([{"id": "a"}])
+
+    tail = JournalTail(journal_file, journal.size())
+    assert tail.poll() == []
+
+    journal.append([{"id": "b"}, {"id": "c"}])
+    with open(journal_file, "a") as f:
+        f.write('{"id": "d"')  # a writer halfway through a line
+    assert tail.poll() == [{"id": "b"}, {"id": "c"}]
+
+    with open(journal_file, "a") as f:
+        f.write("}\n")
+    assert tail.poll() == [{"id": "d"}]
+    assert tail.poll() == []
+
+
+def test_journal_tail_detects_truncation(tmp_path):
+    """Test that a shrinking journal asks for a full reload."""
+    journal_file = tmp_path / "sessions.log"
+    SessionJournal(journal_file).append([{"id": "a"}, {"id": "b"}])
+    tail = JournalTail(journal_file, journal_file.stat().st_size)
+
+    journal_file.write_text("")
+    assert tail.poll() is None
+
+
+def test_journal_tail_detects_a_journal_started_over(tmp_path):
+    """Test that a journal reset and grown past the offset asks for a reload."""
+    journal_file = tmp_path / "sessions.log"
+    journal = SessionJournal(journal_file, max_size=50)
+    journal.append([{"id": "a"}, {"id": "b"}, {"id": "c"}])
+    tail = JournalTail(journal_file, journal.size())
+
+    journal.append([{"id": "d"}, {"id": "e"}])
+    journal.append([{"id": "f"}, {"id": "g"}])
+    assert [line[8] for line in journal_file.read_text().splitlines()] == list("defg")
+    assert tail.poll() is None
+    assert tail.poll() == []
+
+
+def test_journal_stays_bounded(tmp_path):
+    """Test that many saves never grow the journal past its limit."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+        manager.journal.max_size = 1000
+        for _ in range(50):
+            manager.add_session("4-7-8", 4, 76)
+            assert manager.journal.size() <= 1000
+        manager.add_sessions(make_sessions(40))
+
+    assert manager.journal.size() == 0
+    assert manager.data["total_sessions"] == 90
+
+
+def test_watcher_picks_up_sessions_from_other_managers(tmp_path):
+    """Test that sessions added elsewhere update totals, streak and chart data."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        StatsManager().add_session("4-7-8", 4, 76)
+        watcher = StatsWatcher()
+        assert watcher.poll() is False
+
+        other_terminal = StatsManager()
+        other_terminal.add_session("4-4-4-4", 2, 32)
+        other_terminal.add_session("4-7-8", 1, 19)
+
+        with patch.object(StatsManager, "_load_stats") as mock_load:
+            assert watcher.poll() is True
+            mock_load.assert_not_called()
+
+    data = watcher.stats_manager.data
+    today = datetime.now().strftime("%Y-%m-%d")
+    assert data["total_sessions"] == 3
+    assert data["total_time_seconds"] == 127
+    assert data["patterns_used"]["4-4-4-4"] == 1
+    assert data["streaks"]["current"] == 1
+    assert watcher.daily[today] == 3
+
+
+def test_watcher_reloads_when_the_journal_starts_over(tmp_path):
+    """Test that the dashboard stays right across a journal reset."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        StatsManager().add_session("4-7-8", 4, 76)
+        watcher = StatsWatcher()
+
+        other_terminal = StatsManager()
+        other_terminal.journal.max_size = other_terminal.journal.size() + 300
+        for _ in range(5):
+            other_terminal.add_session("4-4-4-4", 2, 32)
+        assert watcher.poll() is True
+
+    assert watcher.stats_manager.data["total_sessions"] == 6
+    assert watcher.stats_manager.data["patterns_used"]["4-4-4-4"] == 5
+
+
+def test_watcher_skips_sessions_already_loaded(tmp_path):
+    """Test that a session both in stats.json and the journal counts once."""
+    with patch("pathlib.Path.home", return_value=tmp_path):
+        manager = StatsManager()
+        manager.add_session("4-7-8", 4, 76)
+        watcher = StatsWatcher()
+
+    assert watcher.apply(list(manager.data["sessions"])) == 0
+    assert watcher.stats_manager.data["total_sessions"] == 1
+
+
+def test_stats_watch_command():
+    """Test that stats --watch starts the dashboard loop."""
+    runner = CliRunner()
+    with patch("src.deep_breath_cli.breath.watch_stats") as mock_watch:
+        result = runner.invoke(app, ["stats", "--watch", "--interval", "0.5"])
+
+    assert result.exit_code == 0
+    mock_watch.assert_called_once_with(0.5)